@@ -1,2 +1,54 @@
-from . import structures  # NOQA: export module
-from .client import Aecg100Client  # NOQA: export class
+"""Python client of the AECG100 SDK.
+
+  The modules and classes below are imported on their first use, so
+  importing the package does not load ctypes structures, multiprocessing or
+  the SDK library for tools which never touch a device.
+"""
+import importlib
+
+# typing.TYPE_CHECKING without importing typing, which is most of the import
+# time of the package; type checkers take it as True.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+  from . import container  # NOQA: export module
+  from . import farm  # NOQA: export module
+  from . import latency  # NOQA: export module
+  from . import output  # NOQA: export module
+  from . import playlist  # NOQA: export module
+  from . import presets  # NOQA: export module
+  from . import rawfile  # NOQA: export module
+  from . import recording  # NOQA: export module
+  from . import resample  # NOQA: export module
+  from . import scan  # NOQA: export module
+  from . import simulator  # NOQA: export module
+  from . import standalone  # NOQA: export module
+  from . import stats  # NOQA: export module
+  from . import structures  # NOQA: export module
+  from .base import bundled_library  # NOQA: export function
+  from .client import Aecg100Client  # NOQA: export class
+
+_MODULES = frozenset([
+    'container', 'farm', 'latency', 'output', 'playlist', 'presets', 'rawfile', 'recording', 'resample', 'scan',
+    'simulator', 'standalone', 'stats', 'structures'
+])
+# The exported names of the submodules, by the submodule.
+_NAMES = {
+    'Aecg100Client': 'client',
+    'bundled_library': 'base',
+}
+
+__all__ = sorted([*_MODULES, *_NAMES])
+
+
+def __getattr__(name: str) -> object:
+  if name in _MODULES:
+    return importlib.import_module(f'.{name}', __name__)
+  if name in _NAMES:
+    value = getattr(importlib.import_module(f'.{_NAMES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+  raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> list:
+  return sorted({*globals(), *__all__})
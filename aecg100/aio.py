@@ -0,0 +1,208 @@
+"""Asyncio client of the AECG100 device.
+
+  Every SDK call of the wrapped ``Aecg100Client`` runs on one dedicated
+  executor thread, so calls stay serialized as the SDK expects while the event
+  loop keeps running. Sampling data and output signals are delivered through
+  ``async for`` iterators.
+"""
+import asyncio
+import collections
+import concurrent.futures
+import functools
+
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Optional, Tuple, Union
+
+from aecg100 import streaming, structures
+from aecg100 import scan as frequency_scan
+from aecg100.client import Aecg100Client
+
+if TYPE_CHECKING:
+  from aecg100 import simulator
+
+
+def _sdk_call(method: Callable[..., Any]) -> Callable[..., Any]:
+  """Wraps a client method into a coroutine running it on the SDK thread.
+
+  The coroutine keeps the name, docstring and signature of the method.
+  """
+
+  @functools.wraps(method)
+  async def call(self: 'AsyncAecg100Client', *args: Any, **kwargs: Any) -> Any:
+    return await self.run(method, *args, **kwargs)
+
+  return call
+
+
+class OutputSignals:
+  """Delivers OutputSignalCallback samples to an ``async for`` loop.
+
+  Pass ``callback`` as the callback of the raw data playback; the iteration
+  yields (time, ac, dc) tuples and ends when the SDK reports the end of the
+  output. The SDK thread never waits for the loop: once ``maxsize`` samples
+  are pending, newer samples are dropped and counted in ``dropped_samples``,
+  while the end of the output is always delivered.
+
+  Attributes:
+    maxsize: the maximum number of samples pending.
+    dropped_samples: the number of samples dropped as the queue was full.
+  """
+
+  def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 1 << 16):
+    if maxsize <= 0:
+      raise ValueError('the maximum size must be positive')
+    self.maxsize = maxsize
+    self.dropped_samples = 0
+    self._loop = loop
+    self._samples: Deque[Tuple[float, int, int]] = collections.deque()
+    self._wakeup = asyncio.Event()
+    self._notified = False
+    self._finished = False
+    self.callback = structures.OutputSignalCallback(self._on_output)
+
+  def _on_output(self, time: float, ac: int, dc: int) -> None:
+    # Called by the SDK thread; the loop is only woken up once per batch.
+    if len(self._samples) >= self.maxsize and ac != streaming.OUTPUT_END:
+      self.dropped_samples += 1
+      return
+    self._samples.append((time, ac, dc))
+    if not self._notified:
+      self._notified = True
+      self._loop.call_soon_threadsafe(self._wakeup.set)
+
+  def __aiter__(self) -> AsyncIterator[Tuple[float, int, int]]:
+    return self._iterate()
+
+  async def _iterate(self) -> AsyncIterator[Tuple[float, int, int]]:
+    while not self._finished:
+      await self._wakeup.wait()
+      self._wakeup.clear()
+      self._notified = False
+      while self._samples:
+        sample = self._samples.popleft()
+        if sample[1] == streaming.OUTPUT_END:
+          self._finished = True
+          break
+        yield sample
+
+
+class AsyncAecg100Client:
+  """The asyncio client to communicate the AECG100 device.
+
+  Attributes:
+    client: the wrapped blocking client, only to be used through ``run``.
+  """
+
+  def __init__(self,
+               sdk_path: Union[None, str, 'simulator.SimulatedSdk'] = None,
+               client: Optional[Aecg100Client] = None):
+    """Initiates the client instance.
+
+    Args:
+      sdk_path: the fullpath of the sdk dynamic library, None for the library
+        bundled for this platform, or the simulated SDK as accepted by
+        ``Aecg100Client``.
+      client: the blocking client to wrap instead of creating one.
+    """
+    self.client = client if client is not None else Aecg100Client(sdk_path)
+    self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='aecg100')
+
+  async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Runs ``func(client, *args, **kwargs)`` on the SDK thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(self._executor, functools.partial(func, self.client, *args, **kwargs))
+
+  @property
+  def is_connected(self) -> bool:
+    return self.client.is_connected
+
+  async def connect(self, port: Optional[int] = -1, timeout: Optional[float] = 15) -> None:
+    await self.run(Aecg100Client.connect, port, timeout)
+
+  async def disconnect(self) -> None:
+    await self.run(Aecg100Client.disconnect)
+
+  async def stop(self) -> None:
+    await self.run(Aecg100Client.stop)
+
+  async def close(self) -> None:
+    """Disconnects the device if needed and shuts down the SDK thread."""
+    if self.client.is_initialized:
+      await self.disconnect()
+    self._executor.shutdown(wait=False)
+
+  async def __aenter__(self) -> 'AsyncAecg100Client':
+    return self
+
+  async def __aexit__(self, *exc_info: Any) -> None:
+    await self.close()
+
+  play_ecg_waveform = _sdk_call(Aecg100Client.play_ecg_waveform)
+  play_ecg_rawdata = _sdk_call(Aecg100Client.play_ecg_rawdata)
+  play_ecg_stream = _sdk_call(Aecg100Client.play_ecg_stream)
+  play_ppg_waveform = _sdk_call(Aecg100Client.play_ppg_waveform)
+  play_ppg_rawdata = _sdk_call(Aecg100Client.play_ppg_rawdata)
+  play_ppg_stream = _sdk_call(Aecg100Client.play_ppg_stream)
+  play_ecg_ppg_waveform = _sdk_call(Aecg100Client.play_ecg_ppg_waveform)
+  play_rawdata = _sdk_call(Aecg100Client.play_rawdata)
+  scan_ecg_frequency = _sdk_call(Aecg100Client.scan_ecg_frequency)
+  scan_ppg_frequency = _sdk_call(Aecg100Client.scan_ppg_frequency)
+  set_electrode = _sdk_call(Aecg100Client.set_electrode)
+  set_dc_offset = _sdk_call(Aecg100Client.set_dc_offset)
+  enable_impedance = _sdk_call(Aecg100Client.enable_impedance)
+  enable_pacing = _sdk_call(Aecg100Client.enable_pacing)
+  enable_respiration = _sdk_call(Aecg100Client.enable_respiration)
+  read_standalone = _sdk_call(Aecg100Client.read_standalone)
+  write_standalone = _sdk_call(Aecg100Client.write_standalone)
+  apply_standalone = _sdk_call(Aecg100Client.apply_standalone)
+  start_sampling = _sdk_call(Aecg100Client.start_sampling)
+
+  async def stop_sampling(self) -> None:
+    await self.run(Aecg100Client.stop_sampling)
+
+  async def wait_stream(self, stream: streaming.RawStream, timeout: Optional[float] = None) -> bool:
+    """Waits for a raw data stream without blocking the SDK thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, stream.wait, timeout)
+
+  async def wait_scan(self, scan: frequency_scan.FrequencyScan, timeout: Optional[float] = None) -> bool:
+    """Waits for a frequency scan without blocking the SDK thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, scan.wait, timeout)
+
+  def output_signals(self, maxsize: int = 1 << 16) -> OutputSignals:
+    """Returns an ``async for`` source whose callback is passed to playback.
+
+    Args:
+      maxsize: the maximum number of samples pending before newer ones are
+        dropped.
+    """
+    return OutputSignals(asyncio.get_running_loop(), maxsize)
+
+  async def sampling_batches(self, mode: structures.PPGSampling) -> AsyncIterator[Tuple[Any, Any]]:
+    """Yields (data, number) NumPy batches of a sampling mode.
+
+    The loop is woken up by the SDK thread when new pairs arrive, and the
+    iteration ends when the sampling is stopped or restarted.
+
+    Args:
+      mode: the started sampling mode.
+    """
+    capture = self.client.sampling_capture
+    if capture is None or mode not in capture.rings:
+      raise RuntimeError(f'sampling {structures.PPGSampling(mode).name} is not started')
+
+    ring = capture[mode]
+    wakeup = asyncio.Event()
+    ring.wakeup = functools.partial(asyncio.get_running_loop().call_soon_threadsafe, wakeup.set)
+    try:
+      while True:
+        wakeup.clear()
+        closed = ring.closed
+        if ring.available:
+          yield ring.read()
+        elif closed:
+          return
+        else:
+          await wakeup.wait()
+    finally:
+      ring.wakeup = None
@@ -1,25 +1,128 @@
 import ctypes
 import logging
+import os
+import platform
+import threading
 import time
 
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
 
-from aecg100 import structures
+from aecg100 import buffers, output, prototypes, streaming, structures
+
+if TYPE_CHECKING:
+  from aecg100 import simulator
 
 logger = logging.getLogger('aecg100')
 
+# The fixed delay after WTQFree() when no disconnection event is reported.
+_DISCONNECT_DELAY = 1.0
+
+
+# The bundled SDK library of each platform.machine().
+_BUNDLED_LIBRARIES = {
+    'aarch64': 'libaecgrpix64.so',
+    'armv7l': 'libaecgrpix86.so',
+    'x86_64': 'libaecgx64.so',
+    'i386': 'libaecgx86.so',
+    'i686': 'libaecgx86.so',
+}
+
+# The environment variable overriding the bundled SDK library.
+SDK_PATH_VARIABLE = 'AECG100_SDK'
+
+# The argument types ctypes converts from a Python int by default.
+_INTEGER_ARGTYPES = frozenset([ctypes.c_bool, ctypes.c_int, ctypes.c_uint, ctypes.c_ubyte, ctypes.c_ushort])
+
+
+def bundled_library() -> str:
+  """Returns the path of the SDK library of this platform.
+
+  ``$AECG100_SDK`` is used if it is set. Otherwise the library of
+  ``platform.machine()`` is looked for in the ``sdk`` directory of the
+  installed package data, then in the ``sdk`` directory of a source checkout.
+
+  Raises:
+    RuntimeError: there is no bundled library for this platform.
+  """
+  path = os.environ.get(SDK_PATH_VARIABLE)
+  if path:
+    return path
+
+  machine = platform.machine()
+  name = _BUNDLED_LIBRARIES.get(machine)
+  if name is None:
+    raise RuntimeError(f'there is no bundled AECG100 SDK library for {machine}')
+  package = os.path.dirname(os.path.abspath(__file__))
+  candidates = [os.path.join(package, 'sdk', name), os.path.join(os.path.dirname(package), 'sdk', name)]
+  for candidate in candidates:
+    if os.path.isfile(candidate):
+      return candidate
+  raise RuntimeError(f'the AECG100 SDK library is not found in {candidates}')
+
+
+class _SdkLibrary:
+  """The SDK dynamic library, loaded on the first function call.
+
+  Each function is looked up and given its prototype from ``prototypes`` on
+  its first use, then stored as an attribute so later calls do not go
+  through ``__getattr__``. Arguments of the wrong type raise
+  ``ctypes.ArgumentError`` instead of reaching the SDK.
+
+  Functions taking only integer arguments, e.g. WTQConnect() or
+  WTQDeviceSetElectrode(), get their restype but no argtypes: ctypes converts
+  a Python int the same way by default, while checking argtypes makes such a
+  call nearly twice as slow. The trade-off is that a non-integer argument of
+  these functions, e.g. a float, is no longer rejected; the client methods
+  convert their arguments before the call.
+  """
+
+  def __init__(self, path: str):
+    self._path = path
+    self._cdll: Optional[ctypes.CDLL] = None
+    self._lock = threading.Lock()
+
+  @property
+  def cdll(self) -> ctypes.CDLL:
+    if self._cdll is None:
+      with self._lock:
+        if self._cdll is None:
+          self._cdll = ctypes.CDLL(self._path)
+          logger.info('loaded the AECG100 SDK %s', self._path)
+    return self._cdll
+
+  def __getattr__(self, name: str) -> Any:
+    if name.startswith('_'):
+      raise AttributeError(name)
+    function = getattr(self.cdll, name)
+    prototype = prototypes.PROTOTYPES.get(name)
+    if prototype is not None:
+      function.restype, argtypes = prototype
+      if not _INTEGER_ARGTYPES.issuperset(argtypes):
+        function.argtypes = argtypes
+    setattr(self, name, function)
+    return function
+
+
+def _load_cdll(sdk_path: Union[None, str, 'simulator.SimulatedSdk']) -> Union[_SdkLibrary, 'simulator.SimulatedSdk']:
+  """Returns the SDK dynamic library, or the simulated SDK.
+
+  The library is only loaded by the first SDK call.
+
+  Args:
+    sdk_path: the fullpath of the library, None for the bundled library of
+      this platform, ``simulator.SDK_NAME`` for a real time simulated SDK, or
+      a ``simulator.SimulatedSdk`` instance.
+  """
+  if not sdk_path:
+    return _SdkLibrary(bundled_library())
+  # The simulator is only imported when it may be selected.
+  from aecg100 import simulator
 
-def _load_cdll(sdk_path: str) -> ctypes.CDLL:
-  """Loads SDK dynamic library."""
-  handle = ctypes.cdll.LoadLibrary(sdk_path)
-  handle.WTQConnect.restype = ctypes.c_bool
-  handle.WTQGetDeviceInformation.restype = ctypes.c_bool
-  handle.WTQGetHWInformation.restype = ctypes.c_bool
-  handle.WTQGetPPGDeviceInformation.restype = ctypes.c_bool
-  handle.WTQGetPPGHWInformation.restype = ctypes.c_bool
-  handle.WTQGetSerialNumber.restype = ctypes.c_char_p
-  handle.WTQGetPPGSerialNumber.restype = ctypes.c_char_p
-  return handle
+  if isinstance(sdk_path, simulator.SimulatedSdk):
+    return sdk_path
+  if sdk_path == simulator.SDK_NAME:
+    return simulator.SimulatedSdk()
+  return _SdkLibrary(sdk_path)
 
 
 class _Aecg100Base:
@@ -28,36 +131,124 @@ class _Aecg100Base:
   Attributes:
     is_connected: indicates the device is connected.
     handle: the device handle object to access the device.
+    buffer_pool: the pool of sample buffers used by raw data playback.
+    output_state: the output configuration last set by the client.
     module_info: the main module info.
     ppg_module_info: the PPG module info.
     device_info: the main device info.
     ppg_device_info the ppg device info.
+
+  The info properties are read from the device once per connection and
+  cached; the cache is dropped when the device is connected or disconnected,
+  or when the SDK reports a connection event.
   """
 
-  def __init__(self, sdk_path: str):
+  def __init__(self, sdk_path: Union[None, str, 'simulator.SimulatedSdk'] = None):
     """Initiates the client instance.
 
     Args:
-      sdk_path: the fullpath of the sdk dynamic library.
+      sdk_path: the fullpath of the sdk dynamic library, None for the library
+        bundled for this platform, or the simulated SDK as accepted by
+        ``_load_cdll``.
     """
     self._handle = _load_cdll(sdk_path)
     self._is_connected = False
+    # Whether the SDK is initialized, until WTQFree() even if the device is
+    # disconnected meanwhile.
+    self._is_initialized = False
+    self._buffer_pool = buffers.BufferPool()
+    # Objects the SDK reads while outputting, e.g. raw data and callbacks.
+    self._output_objects = []
+    self._output_state = output.OutputState()
+    self._sampling = None
+    self._connected_event = threading.Event()
+    self._disconnected_event = threading.Event()
+    # Whether the SDK reports connection events through WTQInit().
+    self._has_connection_events = False
+    self._connected_callback = structures.ConnectedCallback(self._on_connection)
+    # The info read from the device, replaced by a new dict when invalidated.
+    self._info_cache: Dict[str, Dict[str, Any]] = {}
 
   @property
   def is_connected(self):
     return self._is_connected
 
+  @property
+  def is_initialized(self) -> bool:
+    """Whether disconnect() has to free the SDK, even if the device is gone."""
+    return self._is_initialized
+
   @property
   def handle(self):
     if not self.is_connected:
       raise RuntimeError('device is not connected')
     return self._handle
 
+  @property
+  def buffer_pool(self) -> buffers.BufferPool:
+    return self._buffer_pool
+
+  @property
+  def output_state(self) -> output.OutputState:
+    return self._output_state
+
+  def invalidate_output_state(self) -> None:
+    """Forgets the output configuration, e.g. after the device was reset.
+
+    The next setting and waveform calls all reach the device.
+    """
+    self._output_state = output.OutputState.unknown()
+
+  def _hold_output(self, *objects: Any) -> None:
+    """Keeps the objects of the current output alive.
+
+    The objects of the previous output are released, which must only be done
+    after the SDK has switched to the new output: pooled sample buffers are
+    given back to the pool and objects with a ``close`` method, such as raw
+    data streams, are closed.
+    """
+    previous = self._output_objects
+    self._output_objects = list(objects)
+    self._output_state = self._output_state.without_output()
+    for obj in previous:
+      if obj in self._output_objects:
+        continue
+
+      close = getattr(obj, 'close', None)
+      if close is not None:
+        close()
+      for samples in getattr(obj, '_pooled', ()):
+        self._buffer_pool.release(samples)
+
+  def _on_connection(self, connected: bool) -> None:
+    """Handles the SDK ConnectedCallback, called by the SDK thread."""
+    self._info_cache = {}
+    # A device connected again has the default output configuration.
+    self._output_state = output.OutputState() if connected else output.OutputState.unknown()
+    if connected:
+      self._disconnected_event.clear()
+      self._connected_event.set()
+    else:
+      # The device is gone, e.g. unplugged; the SDK is freed by disconnect()
+      # or the next connect().
+      self._is_connected = False
+      self._connected_event.clear()
+      self._disconnected_event.set()
+    logging.info('AECG100 reports %s.', 'connection' if connected else 'disconnection')
+
   def connect(self,
               port: Optional[int] = -1,
               timeout: Optional[float] = 15) -> None:
     """Connects to the device.
 
+    The SDK only reports connection events to the callback of WTQInit(),
+    which has no port argument. So an auto-selected port, the default, is
+    connected through WTQInit(): its connection event is waited for, a later
+    disconnection, e.g. an unplugged device, clears ``is_connected``, and
+    disconnect() waits for the disconnection event instead of a fixed delay.
+    A given port is connected through WTQConnect() without any event, so
+    disconnect() keeps the fixed delay of 1 second for it.
+
     Args:
       port: ttyACM port number, -1 means the port is auto-selected
       timeout: the number of seconds to connect
@@ -67,44 +258,113 @@ class _Aecg100Base:
     if self.is_connected:
       logging.warning('AECG100 is already connected.')
       return
+    if self._is_initialized:
+      # The device reported its disconnection since the last connect().
+      self._free()
 
-    if not self._handle.WTQConnect(port, timeout * 1000):
+    self._connected_event.clear()
+    self._disconnected_event.clear()
+    self._info_cache = {}
+    if port == -1:
+      connected = self._handle.WTQInit(self._connected_callback) and self._connected_event.wait(timeout)
+      self._has_connection_events = connected
+    else:
+      connected = self._handle.WTQConnect(port, -1 if timeout is None else int(timeout * 1000))
+      self._has_connection_events = False
+
+    if not connected:
       self._handle.WTQFree()
       raise RuntimeError('Failed to connect to the device')
 
+    self._is_initialized = True
     self._is_connected = True
+    self._output_state = output.OutputState()
 
     logging.info('AECG100 is connected.')
 
   def disconnect(self) -> None:
-    """Disconnects from the device."""
-    if not self.is_connected:
+    """Disconnects from the device.
+
+    The SDK is also freed if the device already reported its disconnection.
+    """
+    if not self._is_initialized:
       logging.warning('AECG100 is not connected.')
       return
 
-    self.stop()
+    if self.is_connected:
+      self.stop()
+      if self._sampling is not None:
+        self.stop_sampling()
+    self._free()
+    logging.info('AECG100 is disconnected.')
+
+  def _free(self) -> None:
+    """Frees the SDK and releases what the output and sampling held."""
     self._handle.WTQFree()
-    # Uses workaround to sleep 1s here due to the limitation of AECG100 SDK.
-    # We currently do not have better way to handle the disconnect() callback
-    # function since the AECG100 SDK does not support blocking on disconnect()
+    # Only left after the device reported its disconnection; WTQFree() has
+    # stopped the output and the sampling.
+    if self._sampling is not None:
+      self._sampling.close()
+      self._sampling = None
+    self._hold_output()
     # There is a problem observed when disconnect() and re-connect() is very
-    # close in terms of invoked time. Thus here I experimented a workaround
-    # and figured out that sleep 1s is enough to keep the re-connect() safe.
-    # For reference, I have tested 100 times disconnect() re-connect() and
-    # this workaround 100% pass on my local workstation.
-    time.sleep(1)
+    # close in terms of invoked time. When the connection callback is
+    # registered the disconnection event is waited for. Otherwise, the
+    # workaround is to sleep 1s, which passed 100 times disconnect()
+    # re-connect() on a local workstation; waiting for an event which never
+    # comes ends up with the same delay.
+    if self._has_connection_events:
+      if not self._disconnected_event.wait(_DISCONNECT_DELAY):
+        logging.warning('AECG100 reports no disconnection in %.1f seconds.', _DISCONNECT_DELAY)
+    else:
+      time.sleep(_DISCONNECT_DELAY)
+    self._is_initialized = False
     self._is_connected = False
-    logging.info('AECG100 is disconnected.')
+    self._info_cache = {}
 
   def stop(self) -> None:
-    """Stops output waveform."""
-    self.handle.WTQStopOutputWaveform()
+    """Stops output waveform.
+
+    The raw data player reads the samples until WTQStopPlayRawData(), so it
+    is called, after the streams stopped feeding the player, before the
+    buffers of a raw data output are given back to the pool.
+    """
+    handle = self.handle
+    raw_output = False
+    for obj in self._output_objects:
+      if isinstance(obj, streaming.RawStream):
+        obj.stop()
+      raw_output = raw_output or isinstance(obj, (structures.RawData, streaming.RawStream))
+    if raw_output:
+      handle.WTQStopPlayRawData()
+    handle.WTQStopOutputWaveform()
+    self._hold_output()
     logging.info('AECG100 stopped output waveform.')
 
-  @property
-  def module_info(self) -> Dict[str, str]:
+  def _cached_info(self, name: str, read: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Returns a copy of the cached info, read from the device if missing."""
+    cache = self._info_cache
+    info = cache.get(name)
+    if info is None:
+      info = read()
+      # Stored into the dict read from, so info read while the cache was
+      # invalidated is dropped with the old dict.
+      cache[name] = info
+    return dict(info)
+
+  def refresh_info(self) -> Dict[str, Dict[str, Any]]:
+    """Reads the device and module info again.
+
+    Returns:
+      the module_info, ppg_module_info, device_info and ppg_device_info by
+      their names.
+    """
+    self._info_cache = {}
+    return {name: getattr(self, name) for name in ('module_info', 'ppg_module_info', 'device_info', 'ppg_device_info')}
+
+  def _read_module_info(self) -> Dict[str, str]:
     info = structures.HWInformation()
-    self.handle.WTQGetHWInformation(ctypes.pointer(info))
+    self.handle.WTQGetHWInformation(info)
 
     return {
         'serial': self.handle.WTQGetSerialNumber().decode('ascii'),
@@ -112,10 +372,9 @@ class _Aecg100Base:
         'hardware': f'{info.pcb_version}.{info.hw_version}'
     }
 
-  @property
-  def ppg_module_info(self) -> Dict[str, str]:
+  def _read_ppg_module_info(self) -> Dict[str, str]:
     info = structures.HWInformation()
-    self.handle.WTQGetPPGHWInformation(ctypes.pointer(info))
+    self.handle.WTQGetPPGHWInformation(info)
 
     return {
         'serial': self.handle.WTQGetPPGSerialNumber().decode('ascii'),
@@ -123,14 +382,28 @@ class _Aecg100Base:
         'hardware': f'{info.pcb_version}.{info.hw_version}'
     }
 
-  @property
-  def device_info(self) -> Dict[str, Any]:
+  def _read_device_info(self) -> Dict[str, Any]:
     info = structures.ModelInformation()
-    self.handle.WTQGetDeviceInformation(ctypes.pointer(info))
+    self.handle.WTQGetDeviceInformation(info)
     return info.dump()
 
-  @property
-  def ppg_device_info(self) -> Dict[str, Any]:
+  def _read_ppg_device_info(self) -> Dict[str, Any]:
     info = structures.ModelInformation()
-    self.handle.WTQGetPPGDeviceInformation(ctypes.pointer(info))
+    self.handle.WTQGetPPGDeviceInformation(info)
     return info.dump()
+
+  @property
+  def module_info(self) -> Dict[str, str]:
+    return self._cached_info('module_info', self._read_module_info)
+
+  @property
+  def ppg_module_info(self) -> Dict[str, str]:
+    return self._cached_info('ppg_module_info', self._read_ppg_module_info)
+
+  @property
+  def device_info(self) -> Dict[str, Any]:
+    return self._cached_info('device_info', self._read_device_info)
+
+  @property
+  def ppg_device_info(self) -> Dict[str, Any]:
+    return self._cached_info('ppg_device_info', self._read_ppg_device_info)
@@ -0,0 +1,172 @@
+"""Sample buffer helpers for handing waveform data to the SDK."""
+import ctypes
+import sys
+import threading
+
+from typing import Any, List, Optional, Tuple
+
+# Buffer-protocol formats which are laid out exactly like a C double array.
+_DOUBLE_FORMATS = ('d', '@d', '=d', '<d' if sys.byteorder == 'little' else '>d')
+
+
+def import_numpy(feature: str) -> Any:
+  """Returns the NumPy module, which is an optional dependency.
+
+  Args:
+    feature: the module or function needing NumPy, named in the error.
+  Raises:
+    ImportError: NumPy is not installed.
+  """
+  try:
+    import numpy
+  except ImportError as e:
+    raise ImportError(f'{feature} requires NumPy, install it with "pip install aecg100[numpy]"') from e
+  return numpy
+
+
+def _readonly_address(data: Any) -> int:
+  """Returns the data address of a read-only array, or 0 if it is unknown."""
+  interface = getattr(data, '__array_interface__', None)
+  if interface is None:
+    return 0
+  return interface['data'][0]
+
+
+class BufferPool:
+  """A pool of preallocated, aligned double buffers.
+
+  Buffers handed out by ``acquire`` stay valid until they are given back with
+  ``release``; the memory is then reused by later ``acquire`` calls instead of
+  being freed, so repeated playback does not allocate large arrays.
+  """
+
+  def __init__(self, alignment: int = 64, max_free: int = 8, min_capacity: int = 1024):
+    """Initiates the pool.
+
+    Args:
+      alignment: the byte alignment of every buffer, a power of two.
+      max_free: the maximum number of released blocks kept for reuse.
+      min_capacity: the minimum number of samples of an allocated block.
+    """
+    if alignment <= 0 or alignment & (alignment - 1):
+      raise ValueError('the alignment must be a power of two')
+
+    self._alignment = alignment
+    self._max_free = max_free
+    self._min_capacity = min_capacity
+    self._free: List[bytearray] = []
+    self._lock = threading.Lock()
+
+  def _capacity(self, block: bytearray) -> int:
+    return (len(block) - self._alignment) // ctypes.sizeof(ctypes.c_double)
+
+  def _allocate(self, size: int) -> bytearray:
+    capacity = max(self._min_capacity, 1 << max(size - 1, 0).bit_length())
+    return bytearray(capacity * ctypes.sizeof(ctypes.c_double) + self._alignment)
+
+  def preallocate(self, size: int, count: int = 1) -> None:
+    """Allocates ``count`` free blocks holding at least ``size`` samples."""
+    with self._lock:
+      for _ in range(count):
+        self._free.append(self._allocate(size))
+      del self._free[:max(len(self._free) - self._max_free, 0)]
+
+  def acquire(self, size: int) -> ctypes.Array:
+    """Returns an aligned ``ctypes.c_double`` array of ``size`` samples.
+
+    The content of the array is undefined.
+    """
+    with self._lock:
+      fits = [block for block in self._free if self._capacity(block) >= size]
+      if fits:
+        block = min(fits, key=len)
+        self._free.remove(block)
+      else:
+        block = self._allocate(size)
+
+    address = ctypes.addressof(ctypes.c_char.from_buffer(block))
+    offset = -address % self._alignment
+    samples = (ctypes.c_double * size).from_buffer(block, offset)
+    samples._pool_block = block
+    return samples
+
+  def release(self, samples: ctypes.Array) -> None:
+    """Gives an array returned by ``acquire`` back to the pool.
+
+    The array must not be accessed anymore, neither by Python nor by the SDK.
+    """
+    block = getattr(samples, '_pool_block', None)
+    if block is None:
+      raise ValueError('the array is not allocated by the pool')
+
+    del samples._pool_block
+    with self._lock:
+      if len(self._free) < self._max_free:
+        self._free.append(block)
+
+  @property
+  def free_blocks(self) -> int:
+    return len(self._free)
+
+
+def as_double_array(data: Any, pool: Optional[BufferPool] = None) -> Tuple[ctypes.Array, bool]:
+  """Returns a ``ctypes.c_double`` array holding the samples of ``data``.
+
+  C-contiguous float64 buffers, such as NumPy arrays, ``memoryview`` and
+  ``array('d')`` objects, are shared with the returned array without copying.
+  Any other input is converted once into a newly allocated array, or into an
+  array acquired from ``pool`` which the caller has to release. Nothing is
+  logged; the caller reports the copy, e.g. as the result of a playback.
+
+  Args:
+    data: the samples, either a buffer-protocol object or a sequence of numbers.
+    pool: the pool to take the array from when the samples have to be copied.
+  Returns:
+    the ctypes array and whether the samples were copied.
+  """
+  try:
+    view = memoryview(data)
+  except TypeError:
+    view = None
+
+  if view is not None and view.format in _DOUBLE_FORMATS and view.c_contiguous:
+    array_type = ctypes.c_double * (view.nbytes // ctypes.sizeof(ctypes.c_double))
+    if not view.readonly:
+      return array_type.from_buffer(view), False
+
+    address = _readonly_address(data)
+    if address:
+      samples = array_type.from_address(address)
+      # from_address() does not track the owner, keep it alive explicitly.
+      samples._owner = data
+      return samples, False
+
+  if view is not None:
+    # Casting through NumPy avoids unpacking every sample into a Python float.
+    return _convert_buffer(data, view, pool), True
+
+  samples = _new_array(len(data), pool)
+  samples[:] = data
+  return samples, True
+
+
+def _new_array(size: int, pool: Optional[BufferPool]) -> ctypes.Array:
+  if pool is None:
+    return (ctypes.c_double * size)()
+  return pool.acquire(size)
+
+
+def _convert_buffer(data: Any, view: memoryview, pool: Optional[BufferPool]) -> ctypes.Array:
+  """Copies a non float64 or non-contiguous buffer into a double array."""
+  try:
+    import numpy
+  except ImportError:
+    values = memoryview(view.tobytes()).cast(view.format).tolist()
+    samples = _new_array(len(values), pool)
+    samples[:] = values
+    return samples
+
+  source = numpy.asarray(data).ravel()
+  samples = _new_array(source.size, pool)
+  numpy.copyto(numpy.frombuffer(samples, dtype=numpy.float64), source, casting='unsafe')
+  return samples
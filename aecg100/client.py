@@ -1,7 +1,9 @@
 from .base import _Aecg100Base
-from .modules import _EcgModule, _PpgModule, _PwttModule
+from .modules import (_EcgModule, _PpgModule, _PwttModule, _RawModule, _SamplingModule, _SignalModule,
+                      _StandaloneModule)
 
 
-class Aecg100Client(_Aecg100Base, _EcgModule, _PpgModule, _PwttModule):
+class Aecg100Client(_Aecg100Base, _EcgModule, _PpgModule, _PwttModule, _RawModule, _SamplingModule,
+                    _SignalModule, _StandaloneModule):
   """The client to communicate the AECG100 device."""
   pass
@@ -0,0 +1,457 @@
+"""Indexed multi-channel container of raw data.
+
+  The container holds the AC and DC samples of several channels in fixed-size
+  blocks of float64 samples, optionally compressed, followed by the channel
+  metadata and a block index. Seeking to a time offset is a lookup in the
+  index, so a recording can be played from its 300th minute without reading
+  what precedes it:
+
+    with container.ContainerWriter(path, 1000, [container.Channel('ECG')]) as writer:
+      writer.write([(ac, dc)])
+
+    with container.ContainerReader(path) as reader:
+      client.play_ecg_stream(reader.sample_rate, reader.chunks(0, start=18000))
+
+  File layout, all numbers little-endian:
+
+    header    magic, sample rate, channels, block size, samples, compression,
+              metadata offset and length, index offset, block count
+    blocks    per block, the (channels, 2, samples) float64 AC and DC rows,
+              compressed with zlib if requested, at 64-byte boundaries
+    metadata  JSON of the channels and of user key/value pairs
+    index     (offset, stored length) of every block
+
+  Uncompressed blocks are mapped into memory and passed to the raw playback
+  APIs without copying.
+"""
+import array
+import ctypes
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from aecg100 import rawfile, streaming
+
+logger = logging.getLogger('aecg100')
+
+SUFFIX = '.aecg'
+
+# The block compressions.
+NONE = 0
+ZLIB = 1
+
+_MAGIC = b'AECGCTR\x01'
+# magic, sample rate, channels, block size, samples, compression, metadata
+# offset, metadata length, index offset, block count
+_HEADER = struct.Struct('<8sdiiqiqqqq')
+_INDEX_ENTRY = struct.Struct('<qq')
+# The blocks start at cache line boundaries so they are aligned when mapped.
+_ALIGNMENT = 64
+_ITEM_SIZE = 8
+
+
+def _align(offset: int) -> int:
+  return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _little_endian(samples: array.array) -> array.array:
+  if sys.byteorder != 'little':
+    samples = array.array('d', samples)
+    samples.byteswap()
+  return samples
+
+
+class Channel(NamedTuple):
+  """The metadata of a channel.
+
+  Attributes:
+    name: the name of the channel, e.g. ``ECG`` or ``PPG1``.
+    unit: the unit of the samples.
+    signal_type: the signal type, as in the raw data text format.
+  """
+  name: str
+  unit: str = 'uV'
+  signal_type: str = 'ECG'
+
+
+class ContainerWriter:
+  """Writes samples into a container file block by block.
+
+  Only the pending block is kept in memory. The file is written next to
+  ``path`` and moved into place by ``close``, so readers never see a partial
+  container.
+  """
+
+  def __init__(self,
+               path: str,
+               sample_rate: float,
+               channels: Sequence[Channel],
+               block_size: int = 65536,
+               compression: int = NONE,
+               level: int = 6,
+               metadata: Optional[Dict[str, str]] = None):
+    """Initiates the writer.
+
+    Args:
+      path: the path of the container file.
+      sample_rate: the sampling frequency in Hz.
+      channels: the metadata of each channel.
+      block_size: the number of samples per channel in a block.
+      compression: ``NONE`` or ``ZLIB``.
+      level: the zlib compression level.
+      metadata: user key/value pairs, e.g. the subject of a recording.
+    """
+    if sample_rate <= 0:
+      raise ValueError('the sample rate must be positive')
+    if block_size <= 0:
+      raise ValueError('the block size must be positive')
+    if not channels:
+      raise ValueError('a container holds at least one channel')
+    if compression not in (NONE, ZLIB):
+      raise ValueError(f'unknown compression {compression}')
+
+    self.path = path
+    self.sample_rate = sample_rate
+    self.channels = [Channel(*channel) for channel in channels]
+    self.block_size = block_size
+    self.compression = compression
+    self.size = 0
+    self._level = level
+    self._metadata = dict(metadata or {})
+    self._pending = [(array.array('d'), array.array('d')) for _ in self.channels]
+    self._index: List[Tuple[int, int]] = []
+    self._temp = f'{path}.{os.getpid()}.tmp'
+    self._fp = open(self._temp, 'wb')
+    self._fp.write(b'\0' * _align(_HEADER.size))
+
+  @staticmethod
+  def _extend(pending: array.array, samples: Any) -> None:
+    try:
+      view = memoryview(samples)
+    except TypeError:
+      view = None
+    if view is not None and view.format == 'd' and view.c_contiguous:
+      pending.frombytes(view.cast('B'))
+    else:
+      pending.extend(map(float, samples))
+
+  def write(self, samples: Sequence[Tuple[Any, Any]]) -> None:
+    """Appends samples to the channels.
+
+    Args:
+      samples: one (ac, dc) pair of equal length per channel, e.g. a
+        (channels, 2, samples) NumPy array.
+    """
+    if self._fp is None:
+      raise ValueError('the container is closed')
+    if len(samples) != len(self.channels):
+      raise ValueError(f'expects samples of {len(self.channels)} channels but got {len(samples)}')
+
+    start = len(self._pending[0][0])
+    try:
+      for (ac, dc), (ac_pending, dc_pending) in zip(samples, self._pending):
+        self._extend(ac_pending, ac)
+        self._extend(dc_pending, dc)
+        if len(ac_pending) != len(dc_pending) or len(ac_pending) != len(self._pending[0][0]):
+          raise ValueError('the channels and their AC and DC data have different lengths')
+    except Exception:
+      for ac_pending, dc_pending in self._pending:
+        del ac_pending[start:]
+        del dc_pending[start:]
+      raise
+
+    pending = len(self._pending[0][0])
+    offset = 0
+    while pending - offset >= self.block_size:
+      self._write_block(offset, offset + self.block_size)
+      offset += self.block_size
+    if offset:
+      for ac_pending, dc_pending in self._pending:
+        del ac_pending[:offset]
+        del dc_pending[:offset]
+
+  def _write_block(self, start: int, stop: int) -> None:
+    block = array.array('d')
+    for ac_pending, dc_pending in self._pending:
+      block.extend(ac_pending[start:stop])
+      block.extend(dc_pending[start:stop])
+    data = _little_endian(block).tobytes()
+    if self.compression == ZLIB:
+      data = zlib.compress(data, self._level)
+
+    offset = _align(self._fp.tell())
+    self._fp.seek(offset)
+    self._fp.write(data)
+    self._index.append((offset, len(data)))
+    self.size += stop - start
+
+  def close(self) -> None:
+    """Writes the last block, the metadata and the index."""
+    if self._fp is None:
+      return
+    try:
+      pending = len(self._pending[0][0])
+      if pending:
+        self._write_block(0, pending)
+      self._pending = []
+
+      metadata = json.dumps({
+          'channels': [channel._asdict() for channel in self.channels],
+          'metadata': self._metadata,
+      }).encode()
+      metadata_offset = self._fp.tell()
+      self._fp.write(metadata)
+      index_offset = _align(self._fp.tell())
+      self._fp.seek(index_offset)
+      for entry in self._index:
+        self._fp.write(_INDEX_ENTRY.pack(*entry))
+      # Extends the file to the index offset when there is no block.
+      self._fp.truncate()
+
+      self._fp.seek(0)
+      self._fp.write(
+          _HEADER.pack(_MAGIC, self.sample_rate, len(self.channels), self.block_size, self.size, self.compression,
+                       metadata_offset, len(metadata), index_offset, len(self._index)))
+      self._fp.close()
+      os.replace(self._temp, self.path)
+    except BaseException:
+      self._discard()
+      raise
+    self._fp = None
+    logger.info('wrote %d samples of %d channels in %d blocks into %s', self.size, len(self.channels),
+                len(self._index), self.path)
+
+  def _discard(self) -> None:
+    if self._fp is not None:
+      self._fp.close()
+      self._fp = None
+      try:
+        os.remove(self._temp)
+      except OSError:
+        pass
+
+  def __enter__(self) -> 'ContainerWriter':
+    return self
+
+  def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+    if exc_type is None:
+      self.close()
+    else:
+      self._discard()
+
+
+class ContainerReader:
+  """Reads a container file mapped into memory.
+
+  Attributes:
+    path: the path of the container file.
+    sample_rate: the sampling frequency in Hz.
+    channels: the metadata of each channel.
+    metadata: the user key/value pairs.
+    block_size: the number of samples per channel in a block.
+    compression: ``NONE`` or ``ZLIB``.
+    size: the number of samples of each channel.
+  """
+
+  def __init__(self, path: str):
+    self.path = path
+    with open(path, 'rb') as fp:
+      # Copy-on-write keeps the mapping writable for ctypes without touching
+      # the file, so the blocks can be handed to the SDK without copying.
+      self._mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+      self._parse()
+    except (ValueError, struct.error) as e:
+      self._mapping.close()
+      raise ValueError(f'{path}: {e}') from None
+    self._lock = threading.Lock()
+    self._cached: Optional[Tuple[int, memoryview]] = None
+
+  def _parse(self) -> None:
+    if len(self._mapping) < _HEADER.size:
+      raise ValueError('truncated container')
+    (magic, self.sample_rate, channels, self.block_size, self.size, self.compression, metadata_offset,
+     metadata_size, index_offset, blocks) = _HEADER.unpack_from(self._mapping)
+    if magic != _MAGIC:
+      raise ValueError('not a raw data container')
+    if self.compression not in (NONE, ZLIB):
+      raise ValueError(f'unknown compression {self.compression}')
+    if self.block_size <= 0 or channels <= 0:
+      raise ValueError('invalid header')
+    if index_offset + blocks * _INDEX_ENTRY.size > len(self._mapping) or blocks != self.blocks:
+      raise ValueError('truncated container')
+
+    metadata = json.loads(bytes(self._mapping[metadata_offset:metadata_offset + metadata_size]))
+    self.channels = [Channel(**channel) for channel in metadata['channels']]
+    self.metadata: Dict[str, str] = metadata['metadata']
+    if len(self.channels) != channels:
+      raise ValueError('the channel metadata does not match the header')
+    self._index = [_INDEX_ENTRY.unpack_from(self._mapping, index_offset + i * _INDEX_ENTRY.size)
+                   for i in range(blocks)]
+
+  @property
+  def blocks(self) -> int:
+    return -(-self.size // self.block_size)
+
+  @property
+  def duration(self) -> float:
+    return self.size / self.sample_rate
+
+  def block_length(self, index: int) -> int:
+    """The number of samples per channel of a block."""
+    return min(self.block_size, self.size - index * self.block_size)
+
+  def block(self, index: int) -> memoryview:
+    """Returns the (channels, 2, samples) float64 AC and DC data of a block.
+
+    Uncompressed blocks are views of the mapped file, which keep the file
+    mapped as long as they are used; they can be passed to ``play_rawdata``
+    as is.
+    """
+    if not 0 <= index < self.blocks:
+      raise IndexError(f'block {index} is out of range')
+    length = self.block_length(index)
+    shape = (len(self.channels), 2, length)
+    offset, stored = self._index[index]
+    if self.compression == NONE and sys.byteorder == 'little':
+      return memoryview(self._mapping)[offset:offset + stored].cast('d', shape)
+
+    cached = self._cached
+    if cached is not None and cached[0] == index:
+      return cached[1]
+    data = self._mapping[offset:offset + stored]
+    if self.compression == ZLIB:
+      data = zlib.decompress(data)
+    samples = array.array('d')
+    samples.frombytes(data)
+    samples = _little_endian(samples)
+    if len(samples) != len(self.channels) * 2 * length:
+      raise ValueError(f'{self.path}: block {index} is corrupted')
+    view = memoryview(samples).cast('B').cast('d', shape)
+    with self._lock:
+      self._cached = (index, view)
+    return view
+
+  def sample_index(self, time: float) -> int:
+    """Returns the index of the sample at ``time`` seconds."""
+    return min(max(int(round(time * self.sample_rate)), 0), self.size)
+
+  def _range(self, start: float, stop: Optional[float]) -> Tuple[int, int]:
+    first = self.sample_index(start)
+    last = self.size if stop is None else self.sample_index(stop)
+    return first, max(first, last)
+
+  def _rows(self, index: int, first: int, last: int) -> Iterator[memoryview]:
+    """Yields the flat AC and DC rows of each channel of a block range."""
+    length = self.block_length(index)
+    flat = self.block(index).cast('B').cast('d')
+    for row in range(2 * len(self.channels)):
+      yield flat[row * length + first:row * length + last]
+
+  def read(self, start: float = 0, stop: Optional[float] = None) -> memoryview:
+    """Returns the (channels, 2, samples) data between two times in seconds.
+
+    A range of exactly one block is not copied, see ``block``; otherwise
+    the samples are copied into a new buffer. An empty range gives an empty
+    (channels, 2, 0) view.
+    """
+    first, last = self._range(start, stop)
+    if last == first:
+      # memoryview.cast() does not allow a zero in the shape.
+      return memoryview((ctypes.c_double * 0 * 2 * len(self.channels))())
+    index = first // self.block_size
+    if last - first == self.block_length(index) and first % self.block_size == 0:
+      return self.block(index)
+
+    rows = [array.array('d') for _ in range(2 * len(self.channels))]
+    for index, begin, end in self._spans(first, last):
+      for samples, row in zip(rows, self._rows(index, begin, end)):
+        samples.frombytes(row.cast('B'))
+    samples = array.array('d')
+    for row in rows:
+      samples.extend(row)
+    return memoryview(samples).cast('B').cast('d', (len(self.channels), 2, last - first))
+
+  def _spans(self, first: int, last: int) -> Iterator[Tuple[int, int, int]]:
+    """Yields (block, start, stop) of the sample range in each block."""
+    while first < last:
+      index = first // self.block_size
+      begin = first - index * self.block_size
+      end = min(self.block_length(index), last - index * self.block_size)
+      yield index, begin, end
+      first += end - begin
+
+  def chunks(self, channel: int = 0, start: float = 0, stop: Optional[float] = None) -> Iterator[streaming.Chunk]:
+    """Yields the (ac, dc) samples of a channel block by block.
+
+    The chunks are views of the blocks, e.g. for ``play_ecg_stream`` or
+    ``play_ppg_stream``; only the blocks from ``start`` are read.
+
+    Args:
+      channel: the index of the channel.
+      start: the time of the first sample in seconds.
+      stop: the time after the last sample in seconds, the end by default.
+    """
+    if not 0 <= channel < len(self.channels):
+      raise IndexError(f'channel {channel} is out of range')
+    first, last = self._range(start, stop)
+    for index, begin, end in self._spans(first, last):
+      length = self.block_length(index)
+      flat = self.block(index).cast('B').cast('d')
+      ac = 2 * channel * length
+      yield flat[ac + begin:ac + end], flat[ac + length + begin:ac + length + end]
+
+  def frames(self, start: float = 0, stop: Optional[float] = None) -> Iterator[memoryview]:
+    """Yields the (channels, 2, samples) data block by block."""
+    first, last = self._range(start, stop)
+    for index, begin, end in self._spans(first, last):
+      if begin == 0 and end == self.block_length(index):
+        yield self.block(index)
+      else:
+        offset = index * self.block_size
+        yield self.read((offset + begin) / self.sample_rate, (offset + end) / self.sample_rate)
+
+  def close(self) -> None:
+    """Unmaps the file, or leaves it to the views of its blocks still in use."""
+    self._cached = None
+    try:
+      self._mapping.close()
+    except BufferError:
+      # The mapping is unmapped once the last view of it is released.
+      pass
+
+  def __enter__(self) -> 'ContainerReader':
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
+
+  def __len__(self) -> int:
+    return self.size
+
+
+def from_rawfile(raw: rawfile.RawFile, path: str, **kwargs: Any) -> None:
+  """Writes the samples of a raw data text file into a container.
+
+  The text format has no DC data, so the DC rows are zeros.
+
+  Args:
+    raw: the samples, see ``rawfile.load``.
+    path: the path of the container file.
+    kwargs: the arguments of ``ContainerWriter``.
+  """
+  names = ['ECG'] if raw.channels == 1 else [f'channel{index}' for index in range(raw.channels)]
+  channels = [Channel(name, signal_type=raw.signal_type) for name in names]
+  with ContainerWriter(path, raw.sample_rate, channels, **kwargs) as writer:
+    step = writer.block_size
+    zeros = array.array('d', bytes(step * _ITEM_SIZE))
+    for offset in range(0, raw.size, step):
+      length = min(step, raw.size - offset)
+      writer.write([(raw.channel(index)[offset:offset + length], zeros[:length]) for index in range(raw.channels)])
@@ -0,0 +1,368 @@
+"""Driving many AECG100 devices from one process.
+
+  The SDK keeps global state in the shared library, so a process can only
+  drive one device. The farm starts one worker process per device port; each
+  worker owns an ``Aecg100Client`` connected to its port and runs the calls
+  of a ``DeviceProxy``. Sample buffers in the arguments, e.g. raw data
+  arrays, are passed through shared memory instead of being pickled.
+
+  Arguments and results are otherwise pickled, so callbacks cannot be passed
+  and the objects returned by the stream and sampling methods stay in the
+  worker, None being returned instead.
+"""
+import functools
+import logging
+import math
+import multiprocessing
+import pickle
+import struct
+import threading
+
+from multiprocessing import connection, shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aecg100.client import Aecg100Client
+
+logger = logging.getLogger('aecg100')
+
+# The seconds to wait for a worker to exit before it is terminated.
+_JOIN_TIMEOUT = 5.0
+
+# The buffer formats which can be shared, others are pickled.
+_SHAREABLE_FORMATS = frozenset('bBhHiIlLqQfd')
+
+
+class _SharedBuffer:
+  """Describes a buffer copied into shared memory."""
+
+  def __init__(self, name: str, format: str, shape: Tuple[int, ...]):
+    self.name = name
+    self.format = format
+    self.shape = shape
+
+
+def _is_shareable(value: Any) -> bool:
+  if isinstance(value, (bytes, bytearray, str)):
+    return False
+  try:
+    return memoryview(value).format in _SHAREABLE_FORMATS
+  except TypeError:
+    return False
+
+
+def _rebuild(value: Any, items: Iterable[Any]) -> Any:
+  """Builds a list or tuple like ``value``, named tuples included."""
+  if isinstance(value, tuple) and hasattr(value, '_make'):
+    return value._make(items)
+  return type(value)(items)
+
+
+def _share(value: Any, shared: List[shared_memory.SharedMemory]) -> Any:
+  """Replaces the buffers in the arguments by shared memory descriptors."""
+  if isinstance(value, (list, tuple)) and any(_is_shareable(item) for item in value):
+    return _rebuild(value, (_share(item, shared) for item in value))
+  if not _is_shareable(value):
+    return value
+
+  view = memoryview(value)
+  block = shared_memory.SharedMemory(create=True, size=max(view.nbytes, 1))
+  shared.append(block)
+  if view.c_contiguous:
+    block.buf[:view.nbytes] = view.cast('B')
+  else:
+    block.buf[:view.nbytes] = view.tobytes()
+  return _SharedBuffer(block.name, view.format, view.shape)
+
+
+class _Worker:
+  """The client of a worker process and the shared memory it reads."""
+
+  def __init__(self, sdk_path: Optional[str]):
+    self.client = Aecg100Client(sdk_path)
+    self._attached: List[shared_memory.SharedMemory] = []
+
+  def _unshare(self, value: Any, attached: List[shared_memory.SharedMemory]) -> Any:
+    if isinstance(value, (list, tuple)):
+      return _rebuild(value, (self._unshare(item, attached) for item in value))
+    if not isinstance(value, _SharedBuffer):
+      return value
+
+    # The workers share the resource tracker of the parent, which unlinks
+    # the block once the call returned; the mapping stays valid.
+    block = shared_memory.SharedMemory(value.name)
+    attached.append(block)
+    nbytes = math.prod(value.shape) * struct.calcsize(value.format)
+    return block.buf[:nbytes].cast(value.format, value.shape)
+
+  def _release(self) -> None:
+    # The blocks of previous outputs are closed once nothing refers to them.
+    in_use = []
+    for block in self._attached:
+      try:
+        block.close()
+      except BufferError:
+        in_use.append(block)
+    self._attached = in_use
+
+  def call(self, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+    attached = []
+    args = self._unshare(args, attached)
+    kwargs = {key: self._unshare(value, attached) for key, value in kwargs.items()}
+    try:
+      return getattr(self.client, name)(*args, **kwargs)
+    finally:
+      del args, kwargs
+      self._release()
+      self._attached.extend(attached)
+
+
+def _reply(conn: connection.Connection, result: Any) -> None:
+  try:
+    conn.send(('ok', result))
+  except (pickle.PicklingError, TypeError, AttributeError):
+    logger.info('the %s result stays in the worker', type(result).__name__)
+    conn.send(('ok', None))
+
+
+def _run_worker(sdk_path: Optional[str], port: int, timeout: float, conn: connection.Connection) -> None:
+  """The main function of a worker process."""
+  try:
+    worker = _Worker(sdk_path)
+    worker.client.connect(port, timeout)
+  except Exception as e:
+    conn.send(('error', e))
+    return
+  conn.send(('ok', None))
+
+  try:
+    while True:
+      try:
+        message = conn.recv()
+      except EOFError:
+        break
+      if message is None:
+        break
+
+      command, name, args, kwargs = message
+      try:
+        if command == 'getattr':
+          result = getattr(worker.client, name)
+        else:
+          result = worker.call(name, args, kwargs)
+      except Exception as e:
+        try:
+          conn.send(('error', e))
+        except Exception:
+          conn.send(('error', RuntimeError(repr(e))))
+      else:
+        _reply(conn, result)
+  finally:
+    if worker.client.is_initialized:
+      worker.client.disconnect()
+
+
+class DeviceProxy:
+  """Runs the ``Aecg100Client`` API in the worker process of a device.
+
+  Methods and properties of the client are forwarded, e.g.
+  ``proxy.play_ecg_waveform(waveform)`` or ``proxy.module_info``. Calls of a
+  proxy are serialized and can be made from any thread.
+
+  Attributes:
+    port: the ttyACM port number of the device.
+  """
+
+  def __init__(self, port: int, process: multiprocessing.Process, conn: connection.Connection):
+    self.port = port
+    self._process = process
+    self._conn = conn
+    self._lock = threading.Lock()
+
+  def _send(self, command: str, name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+    if self._conn.closed:
+      raise RuntimeError(f'the worker of port {self.port} is closed')
+    self._conn.send((command, name, args, kwargs))
+
+  def _receive(self) -> Any:
+    try:
+      status, result = self._conn.recv()
+    except EOFError:
+      raise RuntimeError(f'the worker of port {self.port} exited') from None
+    if status == 'error':
+      raise result
+    return result
+
+  def _request(self,
+               command: str,
+               name: str,
+               args: Tuple[Any, ...] = (),
+               kwargs: Optional[Dict[str, Any]] = None) -> Any:
+    shared = []
+    try:
+      args = _share(args, shared)
+      kwargs = {key: _share(value, shared) for key, value in (kwargs or {}).items()}
+      with self._lock:
+        self._send(command, name, args, kwargs)
+        return self._receive()
+    finally:
+      # The worker has attached the blocks once it replied.
+      for block in shared:
+        block.close()
+        block.unlink()
+
+  def call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+    """Calls a client method in the worker."""
+    return self._request('call', name, args, kwargs)
+
+  def __getattr__(self, name: str) -> Any:
+    attr = getattr(Aecg100Client, name, None)
+    if name.startswith('_') or attr is None:
+      raise AttributeError(name)
+    if isinstance(attr, property):
+      return self._request('getattr', name)
+    return functools.partial(self.call, name)
+
+  def close(self) -> None:
+    """Disconnects the device and stops the worker process."""
+    self._request_exit()
+    self._join()
+
+  def _request_exit(self) -> None:
+    """Asks the worker to disconnect and exit, without waiting for it."""
+    if not self._conn.closed:
+      with self._lock:
+        try:
+          self._conn.send(None)
+        except (BrokenPipeError, OSError):
+          pass
+        self._conn.close()
+
+  def _join(self) -> None:
+    self._process.join(_JOIN_TIMEOUT)
+    if self._process.is_alive():
+      logger.warning('the worker of port %d did not exit, terminating it', self.port)
+      self._process.terminate()
+      self._process.join()
+
+
+class DeviceFarm:
+  """One worker process per AECG100 device.
+
+  Usage:
+    with DeviceFarm(sdk_path, ports=[0, 1, 2]) as farm:
+      farm.broadcast('play_ecg_waveform', waveform)
+      farm[1].stop()
+  """
+
+  def __init__(self, sdk_path: Optional[str], ports: Iterable[int], timeout: float = 15, context: Optional[Any] = None):
+    """Initiates the farm, the workers are started by ``start``.
+
+    Args:
+      sdk_path: the fullpath of the sdk dynamic library, None for the bundled
+        library.
+      ports: the ttyACM port numbers of the devices.
+      timeout: the number of seconds to connect each device.
+      context: the multiprocessing context, spawn by default.
+    """
+    self._sdk_path = sdk_path
+    self._ports = list(ports)
+    self._timeout = timeout
+    self._context = context or multiprocessing.get_context('spawn')
+    self._proxies: Dict[int, DeviceProxy] = {}
+
+  def start(self) -> None:
+    """Starts the workers and waits until all devices are connected.
+
+    Raises:
+      RuntimeError: a device failed to connect, all workers are stopped.
+    """
+    for port in self._ports:
+      parent_conn, child_conn = self._context.Pipe()
+      process = self._context.Process(
+          target=_run_worker,
+          args=(self._sdk_path, port, self._timeout, child_conn),
+          name=f'aecg100-port{port}',
+          daemon=True)
+      process.start()
+      child_conn.close()
+      self._proxies[port] = DeviceProxy(port, process, parent_conn)
+
+    errors = []
+    for port, proxy in self._proxies.items():
+      try:
+        proxy._receive()
+      except Exception as e:
+        errors.append(f'port {port}: {e}')
+    if errors:
+      self.close()
+      raise RuntimeError('Failed to connect to the devices: ' + ', '.join(errors))
+
+  def __enter__(self) -> 'DeviceFarm':
+    self.start()
+    return self
+
+  def __exit__(self, *exc_info: Any) -> None:
+    self.close()
+
+  def __getitem__(self, port: int) -> DeviceProxy:
+    return self._proxies[port]
+
+  def __iter__(self) -> Iterator[DeviceProxy]:
+    return iter(self._proxies.values())
+
+  def __len__(self) -> int:
+    return len(self._proxies)
+
+  def broadcast(self, name: str, *args: Any, **kwargs: Any) -> List[Any]:
+    """Calls a client method on all devices at once.
+
+    The buffers in the arguments are shared once for all workers, and the
+    calls run in parallel.
+
+    Returns:
+      the results in the order of the ports.
+    Raises:
+      the first error raised by a worker, after all of them replied.
+    """
+    shared = []
+    proxies = list(self._proxies.values())
+    try:
+      args = _share(args, shared)
+      kwargs = {key: _share(value, shared) for key, value in kwargs.items()}
+      for proxy in proxies:
+        proxy._lock.acquire()
+      try:
+        for proxy in proxies:
+          proxy._send('call', name, args, kwargs)
+        results = []
+        errors = []
+        for proxy in proxies:
+          try:
+            results.append(proxy._receive())
+          except Exception as e:
+            results.append(None)
+            errors.append(e)
+      finally:
+        for proxy in proxies:
+          proxy._lock.release()
+    finally:
+      for block in shared:
+        block.close()
+        block.unlink()
+
+    if errors:
+      raise errors[0]
+    return results
+
+  def close(self) -> None:
+    """Disconnects the devices and stops the workers.
+
+    All workers are asked to exit first, so the devices disconnect in
+    parallel and closing takes about as long as one disconnection, e.g. the
+    fixed delay of a given port, whatever the number of devices.
+    """
+    for proxy in self._proxies.values():
+      proxy._request_exit()
+    for proxy in self._proxies.values():
+      proxy._join()
+    self._proxies.clear()
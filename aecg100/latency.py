@@ -0,0 +1,246 @@
+"""Closed-loop latency of a device under test.
+
+  A known waveform is output and captured back, e.g. through PD sampling or
+  an external acquisition. ``measure_latency`` compares the emitted and the
+  captured signals:
+
+    recorder = recording.OutputRecorder()
+    client.play_ppg_rawdata(channel, 1000, ac, dc, sync_pulse, False, recorder)
+    capture = client.start_sampling(structures.PPGSampling.Channel1PD)
+    ...
+    result = latency.measure_latency(latency.recorded_signal(recorder), capture[mode].read_samples(), 1000,
+                                     captured_rate=500)
+
+  The delay is the peak of their cross-correlation, computed with FFTs over
+  blocks of the emitted signal, located between samples by a parabola
+  through the peak and refined by the phase of the cross-spectrum; the gain,
+  offset and residual error are those of the least squares fit of the
+  aligned captured signal by the emitted one.
+"""
+from typing import Any, NamedTuple, Optional
+
+from aecg100 import buffers, recording, resample
+
+numpy = buffers.import_numpy('aecg100.latency')
+
+# The number of samples transformed by one batch of FFTs.
+_BATCH_SAMPLES = 1 << 22
+
+# The number of samples of the blocks whose cross-spectrum refines the delay.
+_SPECTRUM_SIZE = 4096
+
+
+class LatencyResult(NamedTuple):
+  """The comparison of a captured signal with the emitted one.
+
+  The captured signal is modelled as ``gain * emitted(t - delay) + offset``
+  plus an error whose RMS is ``residual``.
+
+  Attributes:
+    delay: the delay of the captured signal in seconds.
+    gain: the gain from the emitted to the captured signal.
+    offset: the offset of the captured signal, in its unit.
+    residual: the RMS of the error of the model, in the unit of the captured
+      signal.
+    correlation: the correlation coefficient of the aligned signals.
+    samples: the number of aligned samples the fit is computed over.
+  """
+  delay: float
+  gain: float
+  offset: float
+  residual: float
+  correlation: float
+  samples: int
+
+
+def recorded_signal(recorder: recording.OutputRecorder, dc: bool = False) -> numpy.ndarray:
+  """Returns the AC, or DC, samples recorded by an output recorder.
+
+  The blocks are read until the output is finished and released.
+  """
+  parts = []
+  for block in recorder:
+    _, ac_samples, dc_samples = block.arrays()
+    parts.append(numpy.array(dc_samples if dc else ac_samples, dtype=numpy.float64))
+    block.release()
+  return numpy.concatenate(parts) if parts else numpy.empty(0)
+
+
+def _fft_size(size: int) -> int:
+  return 1 << max(size - 1, 0).bit_length()
+
+
+def cross_correlation(emitted: numpy.ndarray, captured: numpy.ndarray, max_lag: int,
+                      block_size: int = 1 << 16) -> numpy.ndarray:
+  """Returns the cross-correlation of two signals for lags up to ``max_lag``.
+
+  ``r[max_lag + k]`` is the sum of ``emitted[n] * captured[n + k]``, the
+  samples out of the captured signal counting as zeros. The emitted signal
+  is cut into blocks, each correlated with the captured samples it can reach
+  by one FFT; the blocks are transformed in 2-D batches.
+
+  Args:
+    emitted: the reference signal.
+    captured: the delayed signal.
+    max_lag: the largest lag, in samples, in both directions.
+    block_size: the number of emitted samples per block.
+  """
+  if max_lag < 0 or block_size <= 0:
+    raise ValueError('the maximum lag must not be negative and the block size must be positive')
+  emitted = numpy.asarray(emitted, dtype=numpy.float64)
+  captured = numpy.asarray(captured, dtype=numpy.float64)
+  blocks = -(-emitted.size // block_size)
+  span = block_size + 2 * max_lag
+  fft_size = _fft_size(span)
+  # The captured samples reachable from block i start at i * block_size in
+  # the padded signal.
+  padded = numpy.zeros(blocks * block_size + 2 * max_lag)
+  padded[max_lag:max_lag + min(captured.size, padded.size - max_lag)] = captured[:padded.size - max_lag]
+  emitted_blocks = numpy.zeros(blocks * block_size)
+  emitted_blocks[:emitted.size] = emitted
+  emitted_blocks = emitted_blocks.reshape(blocks, block_size)
+  segments = numpy.lib.stride_tricks.sliding_window_view(padded, span)[::block_size]
+
+  result = numpy.zeros(2 * max_lag + 1)
+  batch = max(1, _BATCH_SAMPLES // fft_size)
+  for start in range(0, blocks, batch):
+    spectrum = numpy.fft.rfft(segments[start:start + batch], fft_size)
+    spectrum *= numpy.conj(numpy.fft.rfft(emitted_blocks[start:start + batch], fft_size))
+    result += numpy.fft.irfft(spectrum, fft_size)[:, :2 * max_lag + 1].sum(axis=0)
+  return result
+
+
+def _peak_offset(r: numpy.ndarray, index: int) -> float:
+  """Returns the offset of the parabola vertex through the peak, in (-0.5, 0.5)."""
+  if index == 0 or index == r.size - 1:
+    return 0.0
+  left, center, right = r[index - 1], r[index], r[index + 1]
+  curvature = left - 2 * center + right
+  if curvature >= 0:
+    return 0.0
+  return 0.5 * (left - right) / curvature
+
+
+def _refine_lag(emitted: numpy.ndarray, captured: numpy.ndarray, lag: float, inverted: bool) -> float:
+  """Refines a lag from the slope of the phase of the cross-spectrum.
+
+  The signals are aligned by the nearest whole lag and cut into half
+  overlapping Hann windowed blocks, whose cross-spectra are summed; the
+  phase left by the fractional lag is linear in the frequency, and its
+  least squares slope weighted by the magnitude gives the fractional lag
+  without the bias of the parabola fitted on the correlation peak.
+  """
+  shift = int(round(lag))
+  first = max(0, -shift)
+  last = min(emitted.size, captured.size - shift)
+  size = min(_SPECTRUM_SIZE, _fft_size(last - first + 1) // 2)
+  if size < 16:
+    return lag
+
+  window = numpy.hanning(size)
+  x = numpy.lib.stride_tricks.sliding_window_view(emitted[first:last], size)[::size // 2]
+  y = numpy.lib.stride_tricks.sliding_window_view(captured[first + shift:last + shift], size)[::size // 2]
+  spectrum = numpy.zeros(size // 2 + 1, dtype=numpy.complex128)
+  batch = max(1, _BATCH_SAMPLES // size)
+  for start in range(0, len(x), batch):
+    spectrum += (numpy.fft.rfft(y[start:start + batch] * window) *
+                 numpy.conj(numpy.fft.rfft(x[start:start + batch] * window))).sum(axis=0)
+
+  frequencies = numpy.fft.rfftfreq(size)
+  # The phase of the estimated lag is removed first, so what is left is far
+  # from wrapping around.
+  spectrum *= numpy.exp(2j * numpy.pi * frequencies * (lag - shift))
+  if inverted:
+    spectrum = -spectrum
+  weights = numpy.abs(spectrum)
+  denominator = 2 * numpy.pi * numpy.sum(weights * frequencies * frequencies)
+  if denominator <= 0:
+    return lag
+  return lag - float(numpy.sum(weights * frequencies * numpy.angle(spectrum)) / denominator)
+
+
+def _cubic_weights(fraction: float) -> numpy.ndarray:
+  """Returns the weights of the 4 samples around a fraction, Keys' cubic convolution."""
+  t = fraction
+  return numpy.array([(-t**3 + 2 * t**2 - t) / 2, (3 * t**3 - 5 * t**2 + 2) / 2, (-3 * t**3 + 4 * t**2 + t) / 2,
+                      (t**3 - t**2) / 2])
+
+
+def measure_latency(emitted: Any,
+                    captured: Any,
+                    sample_rate: float,
+                    captured_rate: Optional[float] = None,
+                    max_delay: float = 1.0,
+                    block_size: int = 1 << 16) -> LatencyResult:
+  """Measures the delay, gain, offset and residual of a captured signal.
+
+  Args:
+    emitted: the samples output to the device under test.
+    captured: the samples captured back, starting at the same time as the
+      emitted ones.
+    sample_rate: the sampling frequency of the emitted samples in Hz.
+    captured_rate: the sampling frequency of the captured samples in Hz,
+      which are resampled to ``sample_rate`` if it differs.
+    max_delay: the largest delay in seconds looked for, in both directions;
+      it must be under the period of a periodic waveform, whose delay is
+      only known modulo the period.
+    block_size: the number of samples processed per block.
+  Returns:
+    the measurement.
+  Raises:
+    ValueError: a signal is constant or the signals do not overlap.
+  """
+  emitted = numpy.asarray(emitted, dtype=numpy.float64)
+  captured = numpy.asarray(captured, dtype=numpy.float64)
+  if captured_rate is not None and captured_rate != sample_rate:
+    captured = resample.resample(captured, captured_rate, sample_rate)
+  if not emitted.size or not captured.size:
+    raise ValueError('the signals are empty')
+
+  # Centered once, so neither the correlation nor the sums below lose
+  # precision to large DC levels.
+  emitted_mean, captured_mean = emitted.mean(), captured.mean()
+  emitted = emitted - emitted_mean
+  captured = captured - captured_mean
+
+  max_lag = min(int(round(max_delay * sample_rate)), max(emitted.size, captured.size) - 1)
+  # An inverting device under test gives a negative peak and a negative gain.
+  r = cross_correlation(emitted, captured, max_lag, block_size)
+  magnitude = numpy.abs(r)
+  index = int(numpy.argmax(magnitude))
+  lag = index - max_lag + _peak_offset(magnitude, index)
+  lag = _refine_lag(emitted, captured, lag, r[index] < 0)
+
+  # The captured samples at the emitted times shifted by the lag, by cubic
+  # convolution, over the range where both exist.
+  shift = int(numpy.floor(lag))
+  weights = _cubic_weights(lag - shift)
+  first = max(0, -shift)
+  last = min(emitted.size, captured.size - 1 - shift)
+  if last - first < 2:
+    raise ValueError('the signals do not overlap at the measured delay')
+  # The edge samples are repeated for the taps out of the signal.
+  captured = numpy.concatenate([captured[:1], captured, captured[-1:], captured[-1:]])
+
+  # Sums over blocks, so the aligned signal is never held whole.
+  count = last - first
+  sums = numpy.zeros(5)
+  for start in range(first, last, block_size):
+    stop = min(start + block_size, last)
+    x = emitted[start:stop]
+    y = sum(weight * captured[start + shift + tap:stop + shift + tap] for tap, weight in enumerate(weights))
+    sums += (x.sum(), y.sum(), x @ x, y @ y, x @ y)
+  mean_x, mean_y = sums[0] / count, sums[1] / count
+  var_x = sums[2] / count - mean_x * mean_x
+  var_y = sums[3] / count - mean_y * mean_y
+  cov = sums[4] / count - mean_x * mean_y
+  if var_x <= 0 or var_y <= 0:
+    raise ValueError('a signal is constant over the aligned range')
+
+  gain = cov / var_x
+  return LatencyResult(delay=float(lag / sample_rate),
+                       gain=float(gain),
+                       offset=float(captured_mean + mean_y - gain * (emitted_mean + mean_x)),
+                       residual=float(numpy.sqrt(max(var_y - cov * gain, 0.0))),
+                       correlation=float(cov / numpy.sqrt(var_x * var_y)),
+                       samples=count)
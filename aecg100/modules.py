@@ -1,94 +1,381 @@
 import ctypes
+import logging
 
-from typing import Sequence, Tuple
-from aecg100 import structures
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from aecg100 import buffers, output, recording, sampling, standalone, streaming, structures
+from aecg100 import scan as frequency_scan
 
-_SamplingCallback = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_int)
-_SamplingErrorCallback = ctypes.CFUNCTYPE(None, ctypes.c_int)
+# Raw samples are either a buffer of float64 (NumPy array, memoryview,
+# array('d')) which is passed to the SDK without copying, or a sequence.
+RawSamples = Union[Sequence[float], Any]
+
+# The callback of raw data is an SDK callback or a recorder.
+RawCallback = Union[structures.OutputSignalCallback, recording.OutputRecorder]
+
+# The NULL OutputSignalCallback. Structures are passed as is to the SDK
+# functions, whose prototypes take them by reference.
+_NO_CALLBACK = structures.OutputSignalCallback(0)
+
+
+def _make_raw_data(sample_rate: int,
+                   ac: RawSamples,
+                   dc: RawSamples,
+                   callback: RawCallback,
+                   pool: buffers.BufferPool,
+                   sync_pulse: structures.SyncPulse = structures.SyncPulse.LEDOff) -> structures.RawData:
+  """Builds the raw data structure pointing to the AC and DC samples.
+
+  The sample arrays and the callback are referenced by the returned
+  structure, so they live as long as the structure does. Copied samples are
+  taken from ``pool`` and listed in ``_pooled`` to be released later;
+  ``_copied`` tells whether the samples had to be copied.
+  """
+  if isinstance(callback, recording.OutputRecorder):
+    callback = callback.callback
+  ac_array, ac_copied = buffers.as_double_array(ac, pool)
+  dc_array, dc_copied = buffers.as_double_array(dc, pool)
+  pooled = [samples for samples, copied in ((ac_array, ac_copied), (dc_array, dc_copied)) if copied]
+  if len(ac_array) != len(dc_array):
+    for samples in pooled:
+      pool.release(samples)
+    raise ValueError('the number of AC and DC data is not equal')
+
+  raw_data = structures.RawData(
+      sample_rate=sample_rate,
+      size=len(ac_array),
+      sync_pulse=sync_pulse,
+      ac=ctypes.addressof(ac_array),
+      dc=ctypes.addressof(dc_array),
+      output_signal_callback=callback)
+  raw_data._samples = (ac_array, dc_array, callback)
+  raw_data._pooled = pooled
+  raw_data._copied = bool(pooled)
+  return raw_data
+
+
+def _release_raw_data(pool: buffers.BufferPool, *raw_data: Optional[structures.RawData]) -> None:
+  """Gives the pooled samples of raw data the SDK did not take back to the pool."""
+  for raw in raw_data:
+    for samples in getattr(raw, '_pooled', ()):
+      pool.release(samples)
+
+
+def _channel_buffer(data: Any, dc: Optional[RawSamples]) -> Tuple[Any, Optional[RawSamples], Tuple[int, ...]]:
+  """Returns the multi-channel samples as a plain buffer and its shape.
+
+  A structured array of (ac, dc) fields per channel is viewed as a
+  (channels, 2, samples) float64 array, copied only if its layout differs.
+  """
+  dtype = getattr(data, 'dtype', None)
+  if dtype is not None and dtype.names:
+    import numpy
+
+    if data.ndim != 1 or set(dtype.names) != {'ac', 'dc'}:
+      raise ValueError('a structured array has one (ac, dc) item per channel')
+    if dc is not None:
+      raise ValueError('the DC data is in the structured array')
+    if len(dtype['ac'].shape) != 1 or dtype['ac'].shape != dtype['dc'].shape:
+      raise ValueError('the ac and dc fields are arrays of the same length')
+    samples = dtype['ac'].shape[0]
+    packed = numpy.dtype([('ac', numpy.float64, (samples,)), ('dc', numpy.float64, (samples,))])
+    if dtype == packed and data.flags.c_contiguous:
+      data = data.view(numpy.float64)
+    else:
+      data = numpy.stack([data['ac'], data['dc']], axis=1).astype(numpy.float64)
+    return data, None, (data.size // (2 * samples), 2, samples)
+
+  try:
+    shape = memoryview(data).shape
+  except TypeError:
+    rows = [list(row) for row in data]
+    shape = (len(rows), len(rows[0]) if rows else 0)
+    if any(len(row) != shape[1] for row in rows):
+      raise ValueError(f'the rows of raw data have {sorted({len(row) for row in rows})} samples, not the same number')
+    data = [sample for row in rows for sample in row]
+  return data, dc, shape
+
+
+def _make_raw_channels(sample_rate: int,
+                       data: Any,
+                       dc: Optional[RawSamples],
+                       channels: Sequence[structures.RawChannel],
+                       callbacks: Mapping[structures.RawChannel, RawCallback],
+                       pool: buffers.BufferPool,
+                       sync_pulse: structures.SyncPulse) -> Dict[structures.RawChannel, structures.RawData]:
+  """Builds the raw data structures of every channel of one buffer.
+
+  The structures point into the buffer, so a C-contiguous float64 buffer is
+  not copied; otherwise it is converted once into a pooled array, and the
+  ``_copied`` of the structures is True.
+  """
+  data, dc, shape = _channel_buffer(data, dc)
+  if len(shape) == 3 and shape[1] == 2:
+    interleaved = True
+  elif len(shape) == 2:
+    interleaved = False
+  else:
+    raise ValueError('the raw data shape is (channels, samples) or (channels, 2, samples)')
+  if shape[0] != len(channels) or len(set(channels)) != len(channels):
+    raise ValueError(f'{shape[0]} rows of raw data for the channels {list(channels)}')
+
+  if dc is not None and not interleaved:
+    dc, _, dc_shape = _channel_buffer(dc, None)
+    if len(dc_shape) > 1 and tuple(dc_shape) != tuple(shape):
+      raise ValueError(f'the DC data shape {tuple(dc_shape)} differs from the AC data shape {tuple(shape)}')
+
+  size = shape[-1]
+  pooled = []
+  samples, copied = buffers.as_double_array(data, pool)
+  if copied:
+    pooled.append(samples)
+  dc_samples = None
+  dc_copied = False
+  if not interleaved:
+    if dc is None:
+      # A single row of zeros is shared by the channels.
+      dc_samples = pool.acquire(size)
+      ctypes.memset(dc_samples, 0, size * ctypes.sizeof(ctypes.c_double))
+      pooled.append(dc_samples)
+      dc_stride = 0
+    else:
+      dc_samples, dc_copied = buffers.as_double_array(dc, pool)
+      if dc_copied:
+        pooled.append(dc_samples)
+      dc_stride = size
+      if len(dc_samples) != len(samples):
+        for array in pooled:
+          pool.release(array)
+        raise ValueError('the number of AC and DC data is not equal')
+
+  item_size = ctypes.sizeof(ctypes.c_double)
+  base = ctypes.addressof(samples)
+  raw_data = {}
+  for row, channel in enumerate(channels):
+    if interleaved:
+      ac_address = base + 2 * row * size * item_size
+      dc_address = ac_address + size * item_size
+    else:
+      ac_address = base + row * size * item_size
+      dc_address = ctypes.addressof(dc_samples) + row * dc_stride * item_size
+    callback = callbacks.get(channel, structures.OutputSignalCallback(0))
+    if isinstance(callback, recording.OutputRecorder):
+      callback = callback.callback
+    raw = structures.RawData(
+        sample_rate=sample_rate,
+        size=size,
+        sync_pulse=sync_pulse,
+        ac=ac_address,
+        dc=dc_address,
+        output_signal_callback=callback)
+    raw._samples = (samples, dc_samples, callback)
+    raw._copied = copied or dc_copied
+    raw_data[structures.RawChannel(channel)] = raw
+  # The pooled arrays are released once, with the first channel.
+  raw_data[structures.RawChannel(channels[0])]._pooled = pooled
+  return raw_data
 
 
 class _PpgModule:
   """PPG module API implementation."""
 
   def play_ppg_waveform(self, *waveforms: Tuple[structures.PPGChannel, structures.PPGWaveForm]) -> None:
-    """Plays PPG waveform."""
+    """Plays PPG waveform, unless the same waveforms are being output."""
     ch_nums = len(waveforms)
+    if not 1 <= ch_nums <= 3:
+      raise ValueError('the PPG has 3 channels at most')
+    if self.output_state.is_output(ppg_waveforms=waveforms):
+      return
+
     if ch_nums == 1:
-      self.handle.WTQOutputPPG(waveforms[0][0], ctypes.pointer(waveforms[0][1]), None)
+      self.handle.WTQOutputPPG(waveforms[0][0], waveforms[0][1], _NO_CALLBACK)
     elif ch_nums == 2:
-      self.handle.WTQOutputPPGEx(waveforms[0][1], waveforms[1][1], None, None)
-    elif ch_nums == 3:
-      self.handle.WTQOutputPPG3(waveforms[0][1], waveforms[1][1], waveforms[2][1], None, None, None)
+      self.handle.WTQOutputPPGEx(waveforms[0][1], waveforms[1][1], _NO_CALLBACK, _NO_CALLBACK)
     else:
-      raise ValueError('the PPG has 3 channels at most')
+      self.handle.WTQOutputPPG3(waveforms[0][1], waveforms[1][1], waveforms[2][1], _NO_CALLBACK, _NO_CALLBACK,
+                                _NO_CALLBACK)
+    self._hold_output(*waveforms)
+    self._output_state = self._output_state.with_output(ppg_waveforms=waveforms)
 
   def play_ppg_rawdata(self, channel: structures.PPGChannel,
       sample_rate: int,
-      ac: Sequence[float],
-      dc: Sequence[float],
+      ac: RawSamples,
+      dc: RawSamples,
       sync_pulse: structures.SyncPulse,
       loop: bool,
-      callback: structures.OutputSignalCallback = structures.OutputSignalCallback(0)) -> None:
-    """Play PPG Raw data waveform."""
-    if len(ac) != len(dc):
-      raise ValueError('the number of AC and DC data is not equal')
+      callback: RawCallback = structures.OutputSignalCallback(0)) -> bool:
+    """Play PPG Raw data waveform.
 
-    size = len(ac)
-    SampleArray = ctypes.c_double * size
-    ac_array = SampleArray(*ac)
-    dc_array = SampleArray(*dc)
+    Returns:
+      whether the samples were copied, i.e. they are not contiguous float64
+      buffers which are passed to the SDK as is.
+    Raises:
+      RuntimeError: failed to play the raw data.
+    """
+    raw_data = _make_raw_data(sample_rate, ac, dc, callback, self.buffer_pool, sync_pulse)
 
-    raw_data = structures.RawData(
-        sample_rate=sample_rate,
-        size=size,
-        ac=ctypes.addressof(ac_array),
-        dc=ctypes.addressof(dc_array),
-        output_signal_callback=callback)
+    self.handle.WTQWaveformPlayerLoop(bool(loop))
+    if not self.handle.WTQWaveformPlayerOutputPPG(channel, raw_data):
+      _release_raw_data(self.buffer_pool, raw_data)
+      raise RuntimeError('Failed to play the PPG raw data')
+    self._hold_output(raw_data)
+    return raw_data._copied
+
+  def play_ppg_stream(
+      self,
+      channel: structures.PPGChannel,
+      sample_rate: int,
+      chunks: Iterable[streaming.Chunk],
+      sync_pulse: structures.SyncPulse,
+      segment_size: int = 65536,
+      callback: Optional[Union[Callable[[float, int, int], Any], recording.OutputRecorder]] = None,
+      stall_timeout: float = 2.0) -> streaming.RawStream:
+    """Plays PPG raw data chunks of any total length.
+
+    Args:
+      channel: the PPG channel to output.
+      sample_rate: the sampling frequency in Hz.
+      chunks: an iterable, e.g. a generator, of (ac, dc) sample pairs.
+      sync_pulse: the sync pulse setting.
+      segment_size: the number of samples buffered per segment; two segments
+        are allocated for the whole stream.
+      callback: called with (time, ac, dc) of every output sample, or an
+        OutputRecorder, which is finished with the stream.
+      stall_timeout: the time in seconds the stream fails after if no sample
+        is output.
+    Returns:
+      the stream, which can be waited for.
+    """
+    self.handle.WTQWaveformPlayerLoop(False)
+    stream = streaming.RawStream(
+        lambda raw_data: self.handle.WTQWaveformPlayerOutputPPG(channel, raw_data),
+        sample_rate, chunks, segment_size, self.buffer_pool, sync_pulse, callback, stall_timeout)
+    try:
+      started = stream.start()
+    except Exception:
+      stream.close()
+      raise
+    # The previous output is only released once the SDK plays the stream.
+    if started:
+      self._hold_output(stream)
+    else:
+      stream.close()
+    return stream
 
-    self.handle.WTQWaveformPlayerLoop(ctypes.c_bool(loop))
-    self.handle.WTQWaveformPlayerOutputPPG(channel, ctypes.pointer(raw_data))
+  def scan_ppg_frequency(
+      self,
+      scan: structures.PPGFrequencyScan,
+      callback: Optional[Callable[[float, int, int], Any]] = None) -> frequency_scan.FrequencyScan:
+    """Scans the PPG frequency.
 
-  def scan_ppg_frequency(self, scan: structures.PPGFrequencyScan) -> None:
-    """Scans the PPG frequency."""
-    self.handle.WTQOutputFrequencyScanPPG(structures.PPGChannel.Channel1, ctypes.pointer(scan), None)
+    Args:
+      scan: the scan setting.
+      callback: called with (time, ac, dc) of every output sample.
+    Returns:
+      the scan, which can be waited for, polled and cancelled.
+    Raises:
+      RuntimeError: failed to start the scan.
+    """
+    handle = frequency_scan.FrequencyScan(scan.frequency_start, scan.frequency_finish, scan.duration, self.stop,
+                                          callback)
+    if not self.handle.WTQOutputFrequencyScanPPG(structures.PPGChannel.Channel1, scan, handle.signal_callback):
+      raise RuntimeError('Failed to start the PPG frequency scan')
+    self._hold_output(scan, handle)
+    return handle
 
 
 class _EcgModule:
   """ECG module API implementation."""
 
   def play_ecg_waveform(self, waveform: structures.ECGWaveform) -> None:
-    """Plays ECG waveform."""
-    self.handle.WTQOutputECG(ctypes.pointer(waveform), None)
+    """Plays ECG waveform, unless the same waveform is being output."""
+    if self.output_state.is_output(ecg_waveform=waveform):
+      return
+
+    self.handle.WTQOutputECG(waveform, _NO_CALLBACK)
+    self._hold_output(waveform)
+    self._output_state = self._output_state.with_output(ecg_waveform=waveform)
 
   def play_ecg_rawdata(
       self,
       sample_rate: int,
-      ac: Sequence[float],
-      dc: Sequence[float],
+      ac: RawSamples,
+      dc: RawSamples,
       loop: bool,
-      callback: structures.OutputSignalCallback = structures.OutputSignalCallback(0)) -> None:
-    """Play ECG Raw data waveform."""
-    if len(ac) != len(dc):
-      raise ValueError('the number of AC and DC data is not equal')
+      callback: RawCallback = structures.OutputSignalCallback(0)) -> bool:
+    """Play ECG Raw data waveform.
 
-    size = len(ac)
-    SampleArray = ctypes.c_double * size
-    ac_array = SampleArray(*ac)
-    dc_array = SampleArray(*dc)
+    Returns:
+      whether the samples were copied, i.e. they are not contiguous float64
+      buffers which are passed to the SDK as is.
+    Raises:
+      RuntimeError: failed to play the raw data.
+    """
+    raw_data = _make_raw_data(sample_rate, ac, dc, callback, self.buffer_pool)
 
-    raw_data = structures.RawData(
-        sample_rate=sample_rate,
-        size=size,
-        ac=ctypes.addressof(ac_array),
-        dc=ctypes.addressof(dc_array),
-        output_signal_callback=callback)
+    self.handle.WTQWaveformPlayerLoop(bool(loop))
+    if not self.handle.WTQWaveformPlayerOutputECG(raw_data):
+      _release_raw_data(self.buffer_pool, raw_data)
+      raise RuntimeError('Failed to play the ECG raw data')
+    self._hold_output(raw_data)
+    return raw_data._copied
+
+  def play_ecg_stream(
+      self,
+      sample_rate: int,
+      chunks: Iterable[streaming.Chunk],
+      segment_size: int = 65536,
+      callback: Optional[Union[Callable[[float, int, int], Any], recording.OutputRecorder]] = None,
+      stall_timeout: float = 2.0) -> streaming.RawStream:
+    """Plays ECG raw data chunks of any total length.
 
-    self.handle.WTQWaveformPlayerLoop(ctypes.c_bool(loop))
-    self.handle.WTQWaveformPlayerOutputECG(ctypes.pointer(raw_data))
+    Args:
+      sample_rate: the sampling frequency in Hz.
+      chunks: an iterable, e.g. a generator, of (ac, dc) sample pairs.
+      segment_size: the number of samples buffered per segment; two segments
+        are allocated for the whole stream.
+      callback: called with (time, ac, dc) of every output sample, or an
+        OutputRecorder, which is finished with the stream.
+      stall_timeout: the time in seconds the stream fails after if no sample
+        is output.
+    Returns:
+      the stream, which can be waited for.
+    """
+    self.handle.WTQWaveformPlayerLoop(False)
+    stream = streaming.RawStream(
+        lambda raw_data: self.handle.WTQWaveformPlayerOutputECG(raw_data),
+        sample_rate, chunks, segment_size, self.buffer_pool, callback=callback, stall_timeout=stall_timeout)
+    try:
+      started = stream.start()
+    except Exception:
+      stream.close()
+      raise
+    # The previous output is only released once the SDK plays the stream.
+    if started:
+      self._hold_output(stream)
+    else:
+      stream.close()
+    return stream
+
+  def scan_ecg_frequency(
+      self,
+      scan: structures.ECGFrequencyScan,
+      callback: Optional[Callable[[float, int, int], Any]] = None) -> frequency_scan.FrequencyScan:
+    """Scans the ECG frequency.
 
-  def scan_ecg_frequency(self, scan: structures.ECGFrequencyScan) -> None:
-    """Scans the ECG frequency."""
-    self.handle.WTQOutputFrequencyScan(ctypes.pointer(scan), None)
+    Args:
+      scan: the scan setting.
+      callback: called with (time, ac, dc) of every output sample.
+    Returns:
+      the scan, which can be waited for, polled and cancelled.
+    Raises:
+      RuntimeError: failed to start the scan.
+    """
+    handle = frequency_scan.FrequencyScan(scan.frequency_start, scan.frequency_finish, scan.duration, self.stop,
+                                          callback)
+    if not self.handle.WTQOutputFrequencyScan(scan, handle.signal_callback):
+      raise RuntimeError('Failed to start the ECG frequency scan')
+    self._hold_output(scan, handle)
+    return handle
 
 
 class _PwttModule:
@@ -100,6 +387,260 @@ class _PwttModule:
       ecg_waveform: structures.ECGWaveform,
       ppg_waveform: structures.PPGWaveForm,
   ) -> None:
-    """Plays ECG and PPG waveform to compose PWTT outputs."""
+    """Plays ECG and PPG waveform to compose PWTT outputs.
+
+    Nothing is sent if the same waveforms are being output.
+    """
+    ppg_waveforms = ((structures.PPGChannel.Channel1, ppg_waveform),)
+    if self.output_state.is_output(ecg_waveform, ppg_waveforms, diff_ptt_peak):
+      return
+
     self.handle.WTQOutputECGAndPPG(
-        diff_ptt_peak, ctypes.pointer(ecg_waveform), ctypes.pointer(ppg_waveform), None, None)
+        diff_ptt_peak, ecg_waveform, ppg_waveform, _NO_CALLBACK, _NO_CALLBACK)
+    self._hold_output(ecg_waveform, ppg_waveform)
+    self._output_state = self._output_state.with_output(ecg_waveform, ppg_waveforms, diff_ptt_peak)
+
+
+class _RawModule:
+  """Multi-channel raw data playback."""
+
+  def play_rawdata(self,
+                   sample_rate: int,
+                   data: Any,
+                   channels: Sequence[structures.RawChannel],
+                   dc: Optional[RawSamples] = None,
+                   sync_pulse: structures.SyncPulse = structures.SyncPulse.LEDOff,
+                   loop: bool = False,
+                   callbacks: Optional[Mapping[structures.RawChannel, RawCallback]] = None) -> bool:
+    """Plays raw data of several channels at once from one buffer.
+
+    The supported channel sets are ECG, PPG1 or PPG2, PPG1 and PPG2, the
+    three PPG channels, and ECG with any of these PPG sets.
+
+    Args:
+      sample_rate: the sampling frequency in Hz, shared by the channels.
+      data: the samples in uV, either a (channels, samples) buffer of AC data,
+        a (channels, 2, samples) buffer of AC and DC data, or a structured
+        array of one (ac, dc) item per channel.
+      channels: the output of each row of ``data``.
+      dc: the (channels, samples) DC data of a buffer of AC data, or None
+        for zeros.
+      sync_pulse: the sync pulse setting.
+      loop: whether the raw data is played in loop.
+      callbacks: the OutputSignalCallback or recorder of some channels.
+    Returns:
+      whether the samples were copied, i.e. they are not a contiguous float64
+      buffer which is passed to the SDK as is.
+    Raises:
+      ValueError: the data shape or the channel set is not supported.
+      RuntimeError: failed to play the raw data.
+    """
+    raw_data = _make_raw_channels(sample_rate, data, dc, channels, callbacks or {}, self.buffer_pool, sync_pulse)
+    ecg = raw_data.pop(structures.RawChannel.ECG, None)
+    ppg_channels = tuple(sorted(raw_data))
+    ppg = [raw_data[channel] for channel in ppg_channels]
+
+    handle = self.handle
+    if ecg is not None and not ppg:
+      output, args = handle.WTQWaveformPlayerOutputECG, (ecg,)
+    elif ecg is not None and len(ppg) == 1 and ppg_channels[0] != structures.RawChannel.PPG3:
+      output, args = handle.WTQWaveformPlayerOutputECGAndPPG, (ecg, ppg_channels[0], ppg[0])
+    elif ecg is not None and ppg_channels == (structures.RawChannel.PPG1, structures.RawChannel.PPG2):
+      output, args = handle.WTQWaveformPlayerOutputECGAndPPGEx, (ecg, *ppg)
+    elif ecg is not None and len(ppg) == 3:
+      output, args = handle.WTQWaveformPlayerOutputECGAndPPG3, (ecg, *ppg)
+    elif ecg is None and len(ppg) == 1 and ppg_channels[0] != structures.RawChannel.PPG3:
+      output, args = handle.WTQWaveformPlayerOutputPPG, (ppg_channels[0], ppg[0])
+    elif ecg is None and ppg_channels == (structures.RawChannel.PPG1, structures.RawChannel.PPG2):
+      output, args = handle.WTQWaveformPlayerOutputPPGEx, tuple(ppg)
+    elif ecg is None and len(ppg) == 3:
+      output, args = handle.WTQWaveformPlayerOutputPPG3, tuple(ppg)
+    else:
+      _release_raw_data(self.buffer_pool, ecg, *ppg)
+      raise ValueError(f'the channels {[channel.name for channel in channels]} cannot be played together')
+
+    handle.WTQWaveformPlayerLoop(bool(loop))
+    if not output(*args):
+      _release_raw_data(self.buffer_pool, ecg, *ppg)
+      raise RuntimeError(f'Failed to play the raw data of {[channel.name for channel in channels]}')
+    self._hold_output(*([ecg] if ecg is not None else []), *ppg)
+    return (ecg if ecg is not None else ppg[0])._copied
+
+
+class _SignalModule:
+  """Signal output control API implementation.
+
+  The settings are shadowed in ``output_state``; setting the value the
+  device already has returns False without calling the SDK.
+  """
+
+  def _set_output(self, name: str, value: Any, function: str, argument: int) -> bool:
+    handle = self.handle
+    if getattr(self.output_state, name) == value:
+      return False
+
+    # Unknown until the device accepted it, so a failed call is retried.
+    self._output_state = self._output_state._replace(**{name: None})
+    if not getattr(handle, function)(argument):
+      raise RuntimeError(f'Failed to set the {name.replace("_", " ")} to {value}')
+    self._output_state = self._output_state._replace(**{name: value})
+    logging.info('AECG100 set the %s to %s.', name.replace('_', ' '), value)
+    return True
+
+  def set_electrode(self, electrode: structures.Electrode) -> bool:
+    """Sets the output lead.
+
+    Returns:
+      whether the device was changed.
+    Raises:
+      RuntimeError: failed to set the lead.
+    """
+    electrode = structures.Electrode(electrode)
+    return self._set_output('electrode', electrode, 'WTQDeviceSetElectrode', electrode)
+
+  def set_dc_offset(self, dc_offset: int) -> bool:
+    """Sets the DC offset in mV, one of ``output.DC_OFFSETS``.
+
+    Returns:
+      whether the device was changed.
+    Raises:
+      ValueError: the offset is not supported.
+      RuntimeError: failed to set the offset.
+    """
+    if dc_offset not in output.DC_OFFSETS:
+      raise ValueError(f'the DC offset must be one of {output.DC_OFFSETS} mV')
+    return self._set_output('dc_offset', int(dc_offset), 'WTQDeviceSetDCOffset', int(dc_offset))
+
+  def enable_impedance(self, enabled: bool = True) -> bool:
+    """Enables or disables the 620K impedance.
+
+    Returns:
+      whether the device was changed.
+    Raises:
+      RuntimeError: failed to set the impedance.
+    """
+    value = structures.ECGImpedance.On if enabled else structures.ECGImpedance.Off
+    return self._set_output('impedance', bool(enabled), 'WTQDeviceEnableImpedance', value)
+
+  def enable_pacing(self, enabled: bool = True) -> bool:
+    """Enables or disables pacing.
+
+    Returns:
+      whether the device was changed.
+    Raises:
+      RuntimeError: failed to set pacing.
+    """
+    value = structures.ECGPacingEnable.On if enabled else structures.ECGPacingEnable.Off
+    return self._set_output('pacing', bool(enabled), 'WTQDeviceEnablePacing', value)
+
+  def enable_respiration(self, enabled: bool = True) -> bool:
+    """Enables or disables respiration.
+
+    Returns:
+      whether the device was changed.
+    Raises:
+      RuntimeError: failed to set respiration.
+    """
+    value = structures.ECGRespirationEnable.On if enabled else structures.ECGRespirationEnable.Off
+    return self._set_output('respiration', bool(enabled), 'WTQDeviceEnableRespiration', value)
+
+
+class _StandaloneModule:
+  """Standalone mode settings API implementation."""
+
+  def read_standalone(
+      self, modes: Iterable[structures.StandaloneMode] = tuple(structures.StandaloneMode)
+  ) -> Dict[structures.StandaloneMode, standalone.StandaloneSlot]:
+    """Reads the settings of standalone mode slots.
+
+    Args:
+      modes: the slots to read, all of them by default.
+    Returns:
+      the setting of each slot.
+    Raises:
+      RuntimeError: failed to read a slot.
+    """
+    return {structures.StandaloneMode(mode): standalone.read_slot(self.handle, mode) for mode in modes}
+
+  def write_standalone(self, *slots: standalone.StandaloneSlot) -> None:
+    """Writes the settings of standalone mode slots, whatever they hold."""
+    for slot in slots:
+      standalone.write_slot(self.handle, slot)
+    logging.info('AECG100 wrote the standalone modes %s.', ', '.join(slot.mode.name for slot in slots))
+
+  def apply_standalone(
+      self,
+      profile: Iterable[standalone.StandaloneSlot],
+      current: Optional[Mapping[structures.StandaloneMode, standalone.StandaloneSlot]] = None
+  ) -> List[structures.StandaloneMode]:
+    """Writes the slots of a profile which differ from the device settings.
+
+    Args:
+      profile: the target settings of some slots.
+      current: the device settings, e.g. from ``read_standalone``; the slots
+        of the profile are read if it is None.
+    Returns:
+      the written slots.
+    Raises:
+      RuntimeError: failed to read or write a slot.
+    """
+    profile = list(profile)
+    if current is None:
+      current = self.read_standalone(slot.mode for slot in profile)
+    changed = standalone.changed_slots(profile, dict(current))
+    if changed:
+      self.write_standalone(*changed)
+    return [slot.mode for slot in changed]
+
+
+class _SamplingModule:
+  """PPG module sampling API implementation."""
+
+  @property
+  def sampling_capture(self) -> Optional[sampling.SamplingCapture]:
+    """The current sampling capture, or None if sampling is not started."""
+    return self._sampling
+
+  def start_sampling(self,
+                     *modes: structures.PPGSampling,
+                     capacity: int = 1 << 16,
+                     statistics: bool = False,
+                     window: Optional[int] = None) -> sampling.SamplingCapture:
+    """Starts the PD or switch sampling.
+
+    Args:
+      modes: the sampling modes to enable.
+      capacity: the number of (data, number) pairs buffered for each mode.
+      statistics: whether to track the statistics of each mode in the
+        ``stats`` of the capture.
+      window: the number of samples the statistics cover, None for all of
+        them.
+    Returns:
+      the capture holding a sampling ring for each mode.
+    Raises:
+      RuntimeError: failed to start sampling.
+    """
+    if self._sampling is not None:
+      self.stop_sampling()
+
+    capture = sampling.SamplingCapture(modes, capacity, statistics=statistics, window=window)
+    for mode, callback in capture.callbacks.items():
+      if not self.handle.WTQEnableSampling(mode, callback):
+        self.handle.WTQDisableSampling()
+        raise RuntimeError(f'Failed to enable sampling {mode.name}')
+
+    if not self.handle.WTQStartSampling(capture.error_callback):
+      self.handle.WTQDisableSampling()
+      raise RuntimeError('Failed to start sampling')
+
+    self._sampling = capture
+    logging.info('AECG100 started sampling %s.', ', '.join(mode.name for mode in capture.rings))
+    return capture
+
+  def stop_sampling(self) -> None:
+    """Stops sampling and disables all sampling modes."""
+    self.handle.WTQDisableSampling()
+    if self._sampling is not None:
+      self._sampling.close()
+    self._sampling = None
+    logging.info('AECG100 stopped sampling.')
@@ -0,0 +1,88 @@
+"""The shadow of the device output configuration.
+
+  The client keeps the signal output settings it last sent and the waveforms
+  it is outputting, so setting a value the device already has skips the
+  serial round trip. A setting is None when it is unknown, e.g. after a
+  failed SDK call, and the next call always reaches the device.
+
+  The device does not report these settings, so the shadow starts from the
+  SDK defaults on connection and only follows the calls of the client.
+"""
+import ctypes
+
+from typing import NamedTuple, Optional, Tuple, TypeVar
+
+from aecg100 import structures
+
+_Struct = TypeVar('_Struct', bound=ctypes.Structure)
+
+# The values valid for WTQDeviceSetDCOffset(), in mV.
+DC_OFFSETS = (-300, 0, 300)
+
+
+def _copy(waveform: _Struct) -> _Struct:
+  return type(waveform).from_buffer_copy(waveform)
+
+
+def _same(left: Optional[ctypes.Structure], right: Optional[ctypes.Structure]) -> bool:
+  if left is None or right is None:
+    return left is right
+  return type(left) is type(right) and bytes(left) == bytes(right)
+
+
+class OutputState(NamedTuple):
+  """The output configuration of the device as last set by the client.
+
+  Attributes:
+    electrode: the output lead.
+    dc_offset: the DC offset in mV.
+    impedance: whether the 620K impedance is enabled.
+    pacing: whether pacing is enabled.
+    respiration: whether respiration is enabled.
+    ecg_waveform: a copy of the ECG waveform being output.
+    ppg_waveforms: copies of the PPG waveforms being output, with their
+      channels.
+    diff_ptt_peak: the PTT peak difference in ms of an ECG and PPG output.
+  """
+  electrode: Optional[structures.Electrode] = structures.Electrode.RightArm
+  dc_offset: Optional[int] = 0
+  impedance: Optional[bool] = False
+  pacing: Optional[bool] = False
+  respiration: Optional[bool] = False
+  ecg_waveform: Optional[structures.ECGWaveform] = None
+  ppg_waveforms: Tuple[Tuple[structures.PPGChannel, structures.PPGWaveForm], ...] = ()
+  diff_ptt_peak: Optional[int] = None
+
+  @classmethod
+  def unknown(cls) -> 'OutputState':
+    """Returns a state whose every setting is unknown."""
+    return cls(None, None, None, None, None)
+
+  def is_output(self,
+                ecg_waveform: Optional[structures.ECGWaveform] = None,
+                ppg_waveforms: Tuple[Tuple[structures.PPGChannel, structures.PPGWaveForm], ...] = (),
+                diff_ptt_peak: Optional[int] = None) -> bool:
+    """Whether the waveforms are the ones being output, compared by bytes."""
+    return (_same(self.ecg_waveform, ecg_waveform) and diff_ptt_peak == self.diff_ptt_peak and
+            len(ppg_waveforms) == len(self.ppg_waveforms) and
+            all(channel == current_channel and _same(waveform, current)
+                for (channel, waveform), (current_channel, current) in zip(ppg_waveforms, self.ppg_waveforms)))
+
+  def with_output(self,
+                  ecg_waveform: Optional[structures.ECGWaveform] = None,
+                  ppg_waveforms: Tuple[Tuple[structures.PPGChannel, structures.PPGWaveForm], ...] = (),
+                  diff_ptt_peak: Optional[int] = None) -> 'OutputState':
+    """Returns the state outputting copies of the waveforms.
+
+    An ECG waveform carries its own impedance, electrode, DC offset, pacing
+    and respiration fields, so those settings become unknown.
+    """
+    state = self if ecg_waveform is None else self._replace(
+        electrode=None, dc_offset=None, impedance=None, pacing=None, respiration=None)
+    return state._replace(ecg_waveform=None if ecg_waveform is None else _copy(ecg_waveform),
+                          ppg_waveforms=tuple((channel, _copy(waveform)) for channel, waveform in ppg_waveforms),
+                          diff_ptt_peak=diff_ptt_peak)
+
+  def without_output(self) -> 'OutputState':
+    """Returns the state with no waveform output."""
+    return self.with_output()
@@ -0,0 +1,247 @@
+"""Declarative playlists of outputs.
+
+  A playlist is a sequence of steps, each one an output lasting a duration:
+
+    steps = [
+        playlist.EcgWaveform(ecg_waveform, duration=10),
+        playlist.PpgRawData(channel, 1000, ac, dc, sync_pulse, duration=10),
+        playlist.PpgScan(scan),
+        playlist.Pwtt(500, ecg_waveform, ppg_waveform, duration=10),
+    ]
+    timings = playlist.Scheduler(client).run(steps)
+
+  The scheduler starts each step when the previous one ends. The SDK
+  switches from one output to the next directly, without stopping in
+  between, and the step deadlines are computed from the start of the
+  playlist on the monotonic clock, so the lateness of one step does not
+  accumulate over the following ones.
+"""
+import abc
+import logging
+import threading
+import time
+
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from aecg100 import structures
+from aecg100.client import Aecg100Client
+
+logger = logging.getLogger('aecg100')
+
+
+class Step(abc.ABC):
+  """A playlist step, an output lasting ``duration`` seconds.
+
+  Attributes:
+    duration: the number of seconds of the output.
+    name: the name of the step in the timing report.
+  """
+
+  def __init__(self, duration: float, name: Optional[str] = None):
+    if duration <= 0:
+      raise ValueError('the step duration must be positive')
+    self.duration = duration
+    self.name = name or type(self).__name__
+
+  @abc.abstractmethod
+  def play(self, client: Aecg100Client) -> None:
+    """Starts the output of the step."""
+
+
+class EcgWaveform(Step):
+
+  def __init__(self, waveform: structures.ECGWaveform, duration: float, name: Optional[str] = None):
+    super().__init__(duration, name)
+    self.waveform = waveform
+
+  def play(self, client: Aecg100Client) -> None:
+    client.play_ecg_waveform(self.waveform)
+
+
+class PpgWaveform(Step):
+
+  def __init__(self,
+               waveforms: Sequence[Tuple[structures.PPGChannel, structures.PPGWaveForm]],
+               duration: float,
+               name: Optional[str] = None):
+    super().__init__(duration, name)
+    self.waveforms = list(waveforms)
+
+  def play(self, client: Aecg100Client) -> None:
+    client.play_ppg_waveform(*self.waveforms)
+
+
+class Pwtt(Step):
+
+  def __init__(self,
+               diff_ptt_peak: int,
+               ecg_waveform: structures.ECGWaveform,
+               ppg_waveform: structures.PPGWaveForm,
+               duration: float,
+               name: Optional[str] = None):
+    super().__init__(duration, name)
+    self.diff_ptt_peak = diff_ptt_peak
+    self.ecg_waveform = ecg_waveform
+    self.ppg_waveform = ppg_waveform
+
+  def play(self, client: Aecg100Client) -> None:
+    client.play_ecg_ppg_waveform(self.diff_ptt_peak, self.ecg_waveform, self.ppg_waveform)
+
+
+class EcgRawData(Step):
+  """ECG raw data, looped when the duration is longer than the samples."""
+
+  def __init__(self, sample_rate: int, ac: Any, dc: Any, duration: Optional[float] = None, name: Optional[str] = None):
+    super().__init__(duration or len(ac) / sample_rate, name)
+    self.sample_rate = sample_rate
+    self.ac = ac
+    self.dc = dc
+
+  def play(self, client: Aecg100Client) -> None:
+    client.play_ecg_rawdata(self.sample_rate, self.ac, self.dc, True)
+
+
+class PpgRawData(Step):
+  """PPG raw data, looped when the duration is longer than the samples."""
+
+  def __init__(self,
+               channel: structures.PPGChannel,
+               sample_rate: int,
+               ac: Any,
+               dc: Any,
+               sync_pulse: structures.SyncPulse,
+               duration: Optional[float] = None,
+               name: Optional[str] = None):
+    super().__init__(duration or len(ac) / sample_rate, name)
+    self.channel = channel
+    self.sample_rate = sample_rate
+    self.ac = ac
+    self.dc = dc
+    self.sync_pulse = sync_pulse
+
+  def play(self, client: Aecg100Client) -> None:
+    client.play_ppg_rawdata(self.channel, self.sample_rate, self.ac, self.dc, self.sync_pulse, True)
+
+
+class EcgScan(Step):
+  """ECG frequency scan, lasting the scan duration by default."""
+
+  def __init__(self, scan: structures.ECGFrequencyScan, duration: Optional[float] = None, name: Optional[str] = None):
+    super().__init__(duration or scan.duration, name)
+    self.scan = scan
+
+  def play(self, client: Aecg100Client) -> None:
+    client.scan_ecg_frequency(self.scan)
+
+
+class PpgScan(Step):
+  """PPG frequency scan, lasting the scan duration by default."""
+
+  def __init__(self, scan: structures.PPGFrequencyScan, duration: Optional[float] = None, name: Optional[str] = None):
+    super().__init__(duration or scan.duration, name)
+    self.scan = scan
+
+  def play(self, client: Aecg100Client) -> None:
+    client.scan_ppg_frequency(self.scan)
+
+
+class StepTiming(NamedTuple):
+  """The timing of a played step, in seconds from the start of the playlist.
+
+  Attributes:
+    name: the name of the step.
+    scheduled: the planned start time.
+    started: the time the output was started.
+    call_time: the number of seconds the play call took.
+    duration: the number of seconds the output lasted.
+  """
+  name: str
+  scheduled: float
+  started: float
+  call_time: float
+  duration: float
+
+  @property
+  def late(self) -> float:
+    return self.started - self.scheduled
+
+
+def format_report(timings: Iterable[StepTiming]) -> str:
+  """Formats the timings as a table."""
+  lines = [f'{"step":<24} {"scheduled":>10} {"started":>10} {"late ms":>8} {"call ms":>8} {"duration":>10}']
+  for timing in timings:
+    lines.append(f'{timing.name:<24} {timing.scheduled:>10.3f} {timing.started:>10.3f} {timing.late * 1e3:>8.2f} '
+                 f'{timing.call_time * 1e3:>8.2f} {timing.duration:>10.3f}')
+  return '\n'.join(lines)
+
+
+class Scheduler:
+  """Plays playlist steps back to back.
+
+  Attributes:
+    timings: the timings of the steps played by the last run.
+  """
+
+  def __init__(self, client: Aecg100Client):
+    self._client = client
+    self._cancelled = threading.Event()
+    self.timings: List[StepTiming] = []
+
+  def cancel(self) -> None:
+    """Stops a running playlist at the end of the current wait."""
+    self._cancelled.set()
+
+  def _wait_until(self, deadline: float) -> bool:
+    """Waits for a monotonic time, returns False if cancelled."""
+    while True:
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        return True
+      if self._cancelled.wait(remaining):
+        return False
+
+  def run(self, steps: Iterable[Step], stop: bool = True) -> List[StepTiming]:
+    """Plays the steps.
+
+    Args:
+      steps: the steps to play in order.
+      stop: whether the output is stopped after the last step, otherwise
+        the last output keeps on.
+    Returns:
+      the timings of the played steps.
+    """
+    self._cancelled.clear()
+    self.timings = []
+    start = time.monotonic()
+    deadline = start
+    started = None
+    try:
+      for step in steps:
+        if not self._wait_until(deadline):
+          break
+
+        before = time.monotonic()
+        step.play(self._client)
+        after = time.monotonic()
+        if started is not None:
+          self._finish_step(started, before, start)
+        started = (step, deadline - start, before, after)
+        # The next deadline is relative to the planned start, not to the
+        # actual one, so the drift is corrected by the next step.
+        deadline += step.duration
+
+      if started is not None:
+        self._wait_until(deadline)
+    finally:
+      end = time.monotonic()
+      if stop and started is not None:
+        self._client.stop()
+      if started is not None:
+        self._finish_step(started, end, start)
+
+    logger.info('playlist finished in %.3f seconds\n%s', time.monotonic() - start, format_report(self.timings))
+    return self.timings
+
+  def _finish_step(self, started: Tuple[Step, float, float, float], end: float, start: float) -> None:
+    step, scheduled, before, after = started
+    self.timings.append(StepTiming(step.name, scheduled, before - start, after - before, end - before))
@@ -0,0 +1,220 @@
+"""Validated, immutable templates of the SDK structures.
+
+  A preset holds the bytes of a structure whose fields were validated once.
+  Creating a structure from it is a ``ctypes.memmove`` of those bytes and
+  the override of a few fields:
+
+    waveform = presets.registry['ecg_1hz'].create(amplitude=2.0)
+    faster = presets.registry['ppg_60bpm'].derive(frequency=2, time_period=500)
+
+  Presets are interned by their bytes, so identical configurations share one
+  preset whatever the way they were built, and derived presets are cached.
+"""
+import ctypes
+import threading
+
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
+
+from aecg100 import structures
+
+# The fields holding a value of an SDK enumeration, validated by presets.
+_ENUM_FIELDS = {
+    structures.ECGWaveform: {
+        'waveform_type': structures.ECGWaveformType,
+        'impedance': structures.ECGImpedance,
+        'noise_frequency': structures.ECGNoiseFrequency,
+        'pacing_enabled': structures.ECGPacingEnable,
+        'respiration_enabled': structures.ECGRespirationEnable,
+    },
+    structures.PPGWaveForm: {
+        'waveform_type': structures.PPGWaveformType,
+        'sync_pulse': structures.SyncPulse,
+        'inverted': structures.PPGInverted,
+        'noise_frequency': structures.PPGNoiseFrequency,
+    },
+    structures.PPGFrequencyScan: {
+        'sync_pulse': structures.SyncPulse,
+    },
+}
+
+# The difference of the ECG and PPG peaks of the PWTT presets in ms.
+PWTT_DIFF_PTT_PEAK = 500
+
+
+def _field_names(struct_type: Type[structures.StructBase]) -> frozenset:
+  return frozenset(name for name, _ in struct_type._fields_)
+
+
+def _validate(struct_type: Type[structures.StructBase], fields: Dict[str, Any]) -> None:
+  names = _field_names(struct_type)
+  enums = _ENUM_FIELDS.get(struct_type, {})
+  for key, value in fields.items():
+    if key not in names:
+      raise KeyError(f'{key} is invalid')
+    if key in enums:
+      enums[key](value)
+
+
+class Preset:
+  """An immutable template of an SDK structure.
+
+  Attributes:
+    name: the name the preset was first registered with, if any.
+    struct_type: the structure class of the template.
+  """
+
+  def __init__(self, registry: 'PresetRegistry', struct_type: Type[structures.StructBase], data: bytes,
+               name: Optional[str]):
+    self.name = name
+    self.struct_type = struct_type
+    self._registry = registry
+    self._data = data
+    self._template = ctypes.create_string_buffer(data, len(data))
+    self._field_names = _field_names(struct_type)
+
+  def create(self, **overrides: Any) -> structures.StructBase:
+    """Returns a new structure copied from the template.
+
+    Args:
+      overrides: the fields to set on the copy; only their names are
+        checked, use ``derive`` for a validated variant.
+    """
+    struct = self.struct_type()
+    ctypes.memmove(ctypes.addressof(struct), self._template, len(self._data))
+    for key, value in overrides.items():
+      if key not in self._field_names:
+        raise KeyError(f'{key} is invalid')
+      setattr(struct, key, value)
+    return struct
+
+  def derive(self, name: Optional[str] = None, **overrides: Any) -> 'Preset':
+    """Returns the validated preset of the template with ``overrides``."""
+    return self._registry.derive(self, name, **overrides)
+
+  @property
+  def values(self) -> Dict[str, Any]:
+    return self.create().dump()
+
+  def __eq__(self, other: Any) -> bool:
+    return isinstance(other, Preset) and self.struct_type is other.struct_type and self._data == other._data
+
+  def __hash__(self) -> int:
+    return hash((self.struct_type, self._data))
+
+  def __repr__(self) -> str:
+    return f'<Preset {self.name or "(unnamed)"} of {self.struct_type.__name__}>'
+
+
+class PresetRegistry:
+  """The named and interned presets."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._names: Dict[str, Preset] = {}
+    self._interned: Dict[Tuple[type, bytes], Preset] = {}
+    self._derived: Dict[Tuple[Preset, Tuple[Tuple[str, Any], ...]], Preset] = {}
+
+  def intern(self, struct: structures.StructBase, name: Optional[str] = None) -> Preset:
+    """Returns the preset of the structure bytes, creating it if needed.
+
+    The structure is not validated, see ``register``.
+    """
+    key = (type(struct), bytes(struct))
+    with self._lock:
+      preset = self._interned.get(key)
+      if preset is None:
+        preset = self._interned[key] = Preset(self, type(struct), key[1], name)
+      elif preset.name is None:
+        preset.name = name
+      if name is not None:
+        self._names.setdefault(name, preset)
+    return preset
+
+  def register(self, name: str, struct_type: Type[structures.StructBase], **fields: Any) -> Preset:
+    """Validates the fields and registers the preset under ``name``.
+
+    Raises:
+      KeyError: a field is invalid.
+      ValueError: the value of an enumeration field is invalid.
+    """
+    if name in self._names:
+      raise ValueError(f'preset {name} is already registered')
+    _validate(struct_type, fields)
+    return self.intern(struct_type(**fields), name)
+
+  def derive(self, preset: Preset, name: Optional[str] = None, **overrides: Any) -> Preset:
+    """Returns the validated preset of ``preset`` with ``overrides``."""
+    key = (preset, tuple(sorted(overrides.items())))
+    derived = self._derived.get(key)
+    if derived is None:
+      _validate(preset.struct_type, overrides)
+      derived = self._derived.setdefault(key, self.intern(preset.create(**overrides), name))
+    elif name is not None:
+      with self._lock:
+        self._names.setdefault(name, derived)
+    return derived
+
+  def __getitem__(self, name: str) -> Preset:
+    return self._names[name]
+
+  def __contains__(self, name: str) -> bool:
+    return name in self._names
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(list(self._names))
+
+  def __len__(self) -> int:
+    return len(self._names)
+
+
+registry = PresetRegistry()
+
+registry.register(
+    'ecg_1hz',
+    structures.ECGWaveform,
+    waveform_type=structures.ECGWaveformType.ECG,
+    frequency=1,
+    amplitude=1.0,
+    t_wave=0.2,
+    p_wave=0.2,
+    time_period=1000,
+    pr_interval=160,
+    qrs_duration=100,
+    t_duration=180,
+    qt_interval=350,
+    impedance=structures.ECGImpedance.Off,
+    pulse_width=100,
+    noise_frequency=structures.ECGNoiseFrequency.FrequencyOff,
+    pacing_amplitude=2,
+    pacing_duration=2,
+    pacing_rate=60,
+    respiration_amplitude=1000,
+    respiration_rate=20,
+    respiration_baseline=1000,
+    respiration_ratio=1,
+    respiration_apnea_duration=10,
+    respiration_apnea_cycle=1)
+
+registry.register(
+    'ppg_60bpm',
+    structures.PPGWaveForm,
+    waveform_type=structures.PPGWaveformType.PPG,
+    frequency=1,
+    vol_dc=625,
+    vol_sp=12.5,
+    vol_dn=7.0,
+    vol_dp=8.0,
+    time_period=1000,
+    time_sp=150,
+    time_dn=360,
+    time_dp=460,
+    sync_pulse=structures.SyncPulse.Off,
+    inverted=structures.PPGInverted.On,
+    noise_frequency=structures.PPGNoiseFrequency.FrequencyOff,
+    respiration_rate=30,
+    respiration_variation=1,
+    respiration_in_exhale_ratio=1)
+
+# The PWTT waveforms are played with PWTT_DIFF_PTT_PEAK.
+registry.intern(registry['ecg_1hz'].create(), 'pwtt_ecg_60bpm')
+registry.intern(registry['ppg_60bpm'].create(), 'pwtt_ppg_60bpm')
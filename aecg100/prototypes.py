@@ -0,0 +1,322 @@
+"""The ctypes prototypes of the SDK functions and structures.
+
+  Generated from sdk/AECG100.h by tools/generate_prototypes.py, do not edit.
+"""
+import ctypes
+
+from aecg100 import structures
+
+# The (restype, argtypes) of every SDK function.
+PROTOTYPES = {
+    'WTQInit': (ctypes.c_bool, [structures.ConnectedCallback]),
+    'WTQConnect': (ctypes.c_bool, [ctypes.c_uint, ctypes.c_uint]),
+    'WTQFree': (None, []),
+    'WTQGetDeviceInformation': (ctypes.c_bool, [ctypes.POINTER(structures.ModelInformation)]),
+    'WTQGetSerialNumber': (ctypes.c_char_p, []),
+    'WTQGetPPGDeviceInformation': (ctypes.c_bool, [ctypes.POINTER(structures.ModelInformation)]),
+    'WTQGetPPGSerialNumber': (ctypes.c_char_p, []),
+    'WTQGetHWInformation': (ctypes.c_bool, [ctypes.POINTER(structures.HWInformation)]),
+    'WTQGetPPGHWInformation': (ctypes.c_bool, [ctypes.POINTER(structures.HWInformation)]),
+    'WTQEnableSampling': (ctypes.c_bool, [ctypes.c_int, structures.SamplingCallback]),
+    'WTQStartSampling': (ctypes.c_bool, [structures.SamplingErrorCallback]),
+    'WTQDisableSampling': (None, []),
+    'WTQEnableRLD': (ctypes.c_bool, [ctypes.c_bool]),
+    'WTQReadRLD': (ctypes.c_bool, [ctypes.POINTER(ctypes.c_double), ctypes.POINTER(ctypes.c_double)]),
+    'WTQDeviceEnableImpedance': (ctypes.c_bool, [ctypes.c_int]),
+    'WTQDeviceSetElectrode': (ctypes.c_bool, [ctypes.c_int]),
+    'WTQDeviceSetDCOffset': (ctypes.c_bool, [ctypes.c_int]),
+    'WTQDeviceEnablePacing': (ctypes.c_bool, [ctypes.c_int]),
+    'WTQDeviceEnableRespiration': (ctypes.c_bool, [ctypes.c_int]),
+    'WTQReadLEDPulseGroupSetting': (ctypes.c_bool, [ctypes.POINTER(structures.LEDPulseGroupSetting)]),
+    'WTQWriteLEDPulseGroupSetting': (ctypes.c_bool, [ctypes.POINTER(structures.LEDPulseGroupSetting)]),
+    'WTQOutputECG': (ctypes.c_bool, [ctypes.POINTER(structures.ECGWaveform), structures.OutputSignalCallback]),
+    'WTQOutputECGAndPPG': (ctypes.c_bool, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputECGAndPPGEx': (ctypes.c_bool, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputECGAndPPG3': (ctypes.c_bool, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputPPG': (ctypes.c_bool, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputPPGEx': (ctypes.c_bool, [
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputPPG3': (ctypes.c_bool, [
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputFrequencyScan': (ctypes.c_bool, [
+        ctypes.POINTER(structures.ECGFrequencyScan),
+        structures.OutputSignalCallback,
+    ]),
+    'WTQOutputFrequencyScanPPG': (ctypes.c_bool, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGFrequencyScan),
+        structures.OutputSignalCallback,
+    ]),
+    'WTQWaveformPlayerOutputECG': (ctypes.c_bool, [ctypes.POINTER(structures.RawData)]),
+    'WTQWaveformPlayerOutputECGAndPPG': (ctypes.c_bool, [
+        ctypes.POINTER(structures.RawData),
+        ctypes.c_int,
+        ctypes.POINTER(structures.RawData),
+    ]),
+    'WTQWaveformPlayerOutputECGAndPPGEx': (ctypes.c_bool, [
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+    ]),
+    'WTQWaveformPlayerOutputECGAndPPG3': (ctypes.c_bool, [
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+    ]),
+    'WTQWaveformPlayerOutputPPG': (ctypes.c_bool, [ctypes.c_int, ctypes.POINTER(structures.RawData)]),
+    'WTQWaveformPlayerOutputPPGEx': (ctypes.c_bool, [
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+    ]),
+    'WTQWaveformPlayerOutputPPG3': (ctypes.c_bool, [
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+        ctypes.POINTER(structures.RawData),
+    ]),
+    'WTQWaveformPlayerLoop': (None, [ctypes.c_bool]),
+    'WTQStopOutputWaveform': (None, []),
+    'WTQStopPlayRawData': (None, []),
+    'WTQReadStandaloneModeType': (ctypes.c_int, [ctypes.c_int]),
+    'WTQReadECGModeFromStandaloneMode': (ctypes.c_int, [ctypes.c_int, ctypes.POINTER(structures.ECGWaveform)]),
+    'WTQWriteECGModeToStandaloneMode': (ctypes.c_int, [ctypes.c_int, ctypes.POINTER(structures.ECGWaveform)]),
+    'WTQReadPWVModeFromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWritePWVModeToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQReadPWVModeExFromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWritePWVModeExToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQReadPWVModePPG3FromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWritePWVModePPG3ToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.POINTER(structures.ECGWaveform),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQReadSPO2ModeFromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWriteSPO2ModeToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQReadSPO2ModePPG3FromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWriteSPO2ModePPG3ToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQReadPPGModeFromStandaloneMode': (ctypes.c_int, [ctypes.c_int, ctypes.POINTER(structures.PPGWaveForm)]),
+    'WTQWritePPGModeToStandaloneMode': (ctypes.c_int, [ctypes.c_int, ctypes.POINTER(structures.PPGWaveForm)]),
+    'WTQReadPPGModeExFromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWritePPGModeExToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQReadPPGModePPG3FromStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQWritePPGModePPG3ToStandaloneMode': (ctypes.c_int, [
+        ctypes.c_int,
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+        ctypes.POINTER(structures.PPGWaveForm),
+    ]),
+    'WTQRestoreFactorySetting': (ctypes.c_bool, []),
+    'WTQReadPPGLedCalibrationSetting': (ctypes.c_bool, [ctypes.c_int, ctypes.POINTER(ctypes.c_ubyte)]),
+    'WTQWritePPGLedCalibrationSetting': (ctypes.c_bool, [ctypes.c_int, ctypes.c_ubyte]),
+    'WTQReadPPGTriggerLevelCalibrationSetting': (ctypes.c_bool, [ctypes.c_int, ctypes.POINTER(ctypes.c_ubyte)]),
+    'WTQWritePPGTriggerLevelCalibrationSetting': (ctypes.c_bool, [ctypes.c_int, ctypes.c_ubyte]),
+    'WTQGetVersion': (ctypes.c_uint, []),
+}
+
+# The C fields of the SDK structures, (name, type) in the header order.
+LAYOUTS = {
+    structures.HWInformation: [
+        ('FWMainVersion', ctypes.c_int),
+        ('FWSubVersion', ctypes.c_int),
+        ('HWVersion', ctypes.c_int),
+        ('PCBVersion', ctypes.c_int),
+    ],
+    structures.ModelInformation: [
+        ('ProductName', ctypes.c_char * 2),
+        ('GenerationNumber', ctypes.c_char),
+        ('ModelNumber', ctypes.c_char),
+        ('SerialNumber', ctypes.c_int),
+        ('Year', ctypes.c_int),
+        ('LEDType1', ctypes.c_int),
+        ('LEDType2', ctypes.c_int),
+        ('LEDType3', ctypes.c_int),
+    ],
+    structures.ECGWaveform: [
+        ('WaveformType', ctypes.c_int),
+        ('Frequency', ctypes.c_double),
+        ('Amplitude', ctypes.c_double),
+        ('TWave', ctypes.c_double),
+        ('PWave', ctypes.c_double),
+        ('STSegment', ctypes.c_double),
+        ('DCOffsetVariable', ctypes.c_int),
+        ('DCOffset', ctypes.c_int),
+        ('TimePeriod', ctypes.c_int),
+        ('PRInterval', ctypes.c_int),
+        ('QRSDuration', ctypes.c_int),
+        ('TDuration', ctypes.c_int),
+        ('QTInterval', ctypes.c_int),
+        ('Impedance', ctypes.c_int),
+        ('Electrode', ctypes.c_int),
+        ('PulseWidth', ctypes.c_int),
+        ('NoiseAmplitude', ctypes.c_double),
+        ('NoiseFrequency', ctypes.c_int),
+        ('PacingEnabled', ctypes.c_int),
+        ('PacingAmplitude', ctypes.c_double),
+        ('PacingDuration', ctypes.c_double),
+        ('PacingRate', ctypes.c_int),
+        ('RespirationEnabled', ctypes.c_int),
+        ('RespirationAmplitude', ctypes.c_int),
+        ('RespirationRate', ctypes.c_int),
+        ('RespirationRatio', ctypes.c_int),
+        ('RespirationBaseline', ctypes.c_int),
+        ('RespirationApneaDuration', ctypes.c_int),
+        ('RespirationApneaCycle', ctypes.c_int),
+        ('Reserved', ctypes.c_char * 12),
+    ],
+    structures.PPGWaveForm: [
+        ('WaveformType', ctypes.c_int),
+        ('Frequency', ctypes.c_double),
+        ('VolDC', ctypes.c_double),
+        ('VolSP', ctypes.c_double),
+        ('VolDN', ctypes.c_double),
+        ('VolDP', ctypes.c_double),
+        ('ACOffset', ctypes.c_double),
+        ('TimeSP', ctypes.c_int),
+        ('TimeDN', ctypes.c_int),
+        ('TimeDP', ctypes.c_int),
+        ('TimePeriod', ctypes.c_int),
+        ('SyncPulse', ctypes.c_int),
+        ('Inverted', ctypes.c_int),
+        ('NoiseAmplitude', ctypes.c_double),
+        ('NoiseFrequency', ctypes.c_int),
+        ('RespirationEnabled', ctypes.c_int),
+        ('RespirationRate', ctypes.c_int),
+        ('RespirationVariation', ctypes.c_double),
+        ('RespirationInExhaleRatio', ctypes.c_int),
+        ('Reserved', ctypes.c_char * 12),
+    ],
+    structures.ECGFrequencyScan: [
+        ('Amplitude', ctypes.c_double),
+        ('FrequencyStart', ctypes.c_double),
+        ('FrequencyFinish', ctypes.c_double),
+        ('Duration', ctypes.c_int),
+    ],
+    structures.PPGFrequencyScan: [
+        ('Amplitude', ctypes.c_double),
+        ('DC', ctypes.c_double),
+        ('SyncPulse', ctypes.c_int),
+        ('FrequencyStart', ctypes.c_double),
+        ('FrequencyFinish', ctypes.c_double),
+        ('Duration', ctypes.c_int),
+    ],
+    structures.RawData: [
+        ('SampleRate', ctypes.c_double),
+        ('Size', ctypes.c_int),
+        ('SyncPulse', ctypes.c_int),
+        ('AC', ctypes.POINTER(ctypes.c_double)),
+        ('DC', ctypes.POINTER(ctypes.c_double)),
+        ('cb', structures.OutputSignalCallback),
+    ],
+    structures.LEDPulseSetting: [
+        ('LEDPulse', ctypes.c_ubyte),
+        ('Reserved', ctypes.c_ubyte),
+        ('PulsePeriod', ctypes.c_ushort),
+        ('PulseWidth', ctypes.c_ushort),
+    ],
+    structures.LEDPulseGroupSetting: [
+        ('TriggerMode', ctypes.c_int),
+        ('PulseGroupInterval', ctypes.c_ushort),
+        ('LEDPulse', structures.LEDPulseSetting * 8),
+    ],
+}
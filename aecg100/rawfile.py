@@ -0,0 +1,271 @@
+"""Loader of the SDK raw data text format.
+
+  The text format is the one of ``ecg-1hz-5mv.txt``: a header of four lines,
+  the sample rate, the number of samples, the number of channels and the
+  signal type, followed by one sample per line. Multi-channel files hold one
+  row of whitespace or comma separated values per sample.
+
+  Parsed files are cached in a binary sidecar next to the text file, keyed by
+  the modification time and the SHA-256 hash of the text. Later loads map the
+  sidecar into memory and do not parse anything.
+
+  Samples derived from raw data, e.g. resampled ones, are cached in keyed
+  sidecars with ``write_keyed`` and ``load_keyed``: they have no text file,
+  and the key given by the caller takes the place of the hash of the text.
+"""
+import array
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+
+from typing import Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger('aecg100')
+
+SIDECAR_SUFFIX = '.aecgraw'
+
+_MAGIC = b'AECGRAW\x01'
+# magic, sample rate, size, channels, signal type, mtime (ns), file size, sha256
+_HEADER = struct.Struct('<8sdqi16sqq32s')
+# The samples start at a cache line boundary so they are aligned when mapped.
+_DATA_OFFSET = 128
+# The maximum number of bytes of the key of a keyed sidecar.
+KEY_SIZE = 32
+
+
+class RawFile:
+  """Samples of a raw data file.
+
+  The samples are stored channel after channel, each channel is a contiguous
+  float64 ``memoryview`` which can be passed to ``play_ecg_rawdata`` and
+  ``play_ppg_rawdata`` without copying.
+
+  Attributes:
+    sample_rate: the sampling frequency in Hz.
+    size: the number of samples of each channel.
+    channels: the number of channels.
+    signal_type: the signal type of the header, e.g. ``ECG``.
+    samples: all samples, the channels are concatenated.
+  """
+
+  def __init__(self, sample_rate: float, size: int, channels: int, signal_type: str, samples: memoryview):
+    self.sample_rate = sample_rate
+    self.size = size
+    self.channels = channels
+    self.signal_type = signal_type
+    self.samples = samples
+
+  def channel(self, index: int = 0) -> memoryview:
+    """Returns the samples of a channel."""
+    if not 0 <= index < self.channels:
+      raise IndexError(f'channel {index} is out of range')
+    return self.samples[index * self.size:(index + 1) * self.size]
+
+  def __len__(self) -> int:
+    return self.size
+
+
+def _parse(text: bytes, path: str) -> RawFile:
+  """Parses the content of a raw data text file."""
+  lines = text.split(maxsplit=4)
+  if len(lines) < 4:
+    raise ValueError(f'{path}: the raw data header is incomplete')
+
+  sample_rate = float(lines[0])
+  size = int(lines[1])
+  channels = int(lines[2])
+  signal_type = lines[3].decode('ascii')
+  if channels < 1:
+    raise ValueError(f'{path}: invalid number of channels {channels}')
+
+  body = lines[4] if len(lines) > 4 else b''
+  values = array.array('d', map(float, body.replace(b',', b' ').split()))
+  if len(values) != size * channels:
+    raise ValueError(f'{path}: expects {size * channels} samples but got {len(values)}')
+
+  if channels > 1:
+    interleaved = values
+    values = array.array('d')
+    for index in range(channels):
+      values.extend(interleaved[index::channels])
+
+  return RawFile(sample_rate, size, channels, signal_type, memoryview(values))
+
+
+def parse(path: str) -> RawFile:
+  """Parses a raw data text file without using the sidecar cache."""
+  with open(path, 'rb') as fp:
+    return _parse(fp.read(), path)
+
+
+def _sidecar_path(path: str, cache_dir: Optional[str]) -> str:
+  if cache_dir is None:
+    return path + SIDECAR_SUFFIX
+  digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+  return os.path.join(cache_dir, f'{os.path.basename(path)}.{digest}{SIDECAR_SUFFIX}')
+
+
+def _write_sidecar(sidecar: str, raw: RawFile, stat: os.stat_result, digest: bytes) -> None:
+  header = _HEADER.pack(_MAGIC, raw.sample_rate, raw.size, raw.channels, raw.signal_type.encode('ascii')[:16],
+                        stat.st_mtime_ns, stat.st_size, digest)
+  samples = raw.samples
+  if sys.byteorder != 'little':
+    swapped = array.array('d', samples)
+    swapped.byteswap()
+    samples = memoryview(swapped)
+
+  temp = f'{sidecar}.{os.getpid()}.tmp'
+  with open(temp, 'wb') as fp:
+    fp.write(header.ljust(_DATA_OFFSET, b'\0'))
+    fp.write(samples)
+  os.replace(temp, sidecar)
+
+
+def _map_sidecar(sidecar: str) -> Tuple[tuple, Optional[mmap.mmap]]:
+  """Maps a sidecar file, returns its header and the mapping."""
+  with open(sidecar, 'rb') as fp:
+    # Copy-on-write keeps the mapping writable for ctypes without touching
+    # the file, so the samples can be handed to the SDK without copying.
+    mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+  if len(mapping) < _DATA_OFFSET:
+    mapping.close()
+    raise ValueError(f'{sidecar}: truncated sidecar')
+
+  header = _HEADER.unpack_from(mapping)
+  if header[0] != _MAGIC:
+    mapping.close()
+    raise ValueError(f'{sidecar}: not a raw data sidecar')
+  if len(mapping) < _data_end(header):
+    mapping.close()
+    raise ValueError(f'{sidecar}: truncated sidecar')
+  return header, mapping
+
+
+def _data_end(header: tuple) -> int:
+  _, _, size, channels = header[:4]
+  return _DATA_OFFSET + size * channels * 8
+
+
+def _from_mapping(header: tuple, mapping: mmap.mmap) -> RawFile:
+  _, sample_rate, size, channels, signal_type, _, _, _ = header
+  samples = memoryview(mapping)[_DATA_OFFSET:_data_end(header)].cast('d')
+  if sys.byteorder != 'little':
+    swapped = array.array('d', samples)
+    swapped.byteswap()
+    samples = memoryview(swapped)
+  return RawFile(sample_rate, size, channels, signal_type.rstrip(b'\0').decode('ascii'), samples)
+
+
+def load(path: str, cache: bool = True, cache_dir: Optional[str] = None) -> RawFile:
+  """Loads a raw data text file.
+
+  Args:
+    path: the path of the text file.
+    cache: whether to use and create the binary sidecar.
+    cache_dir: the directory of the sidecar, which is next to the text file if
+      it is None.
+  Returns:
+    the samples of the file.
+  Raises:
+    ValueError: the file is malformed.
+  """
+  if not cache:
+    return parse(path)
+
+  stat = os.stat(path)
+  sidecar = _sidecar_path(path, cache_dir)
+  text = None
+  try:
+    header, mapping = _map_sidecar(sidecar)
+  except (OSError, ValueError):
+    header, mapping = None, None
+
+  if header is not None:
+    mtime, file_size, digest = header[5:]
+    if mtime == stat.st_mtime_ns and file_size == stat.st_size:
+      return _from_mapping(header, mapping)
+
+    # The file is touched, e.g. by a checkout; it is fine if the content is.
+    with open(path, 'rb') as fp:
+      text = fp.read()
+    if hashlib.sha256(text).digest() == digest:
+      raw = _from_mapping(header, mapping)
+      _store(sidecar, raw, stat, digest)
+      return raw
+    mapping.close()
+
+  if text is None:
+    with open(path, 'rb') as fp:
+      text = fp.read()
+  raw = _parse(text, path)
+  _store(sidecar, raw, stat, hashlib.sha256(text).digest())
+  return raw
+
+
+def _store(sidecar: str, raw: RawFile, stat: os.stat_result, digest: bytes) -> None:
+  try:
+    _write_sidecar(sidecar, raw, stat, digest)
+  except OSError as e:
+    logger.warning('failed to write the raw data sidecar %s: %s', sidecar, e)
+
+
+def _key(key: bytes) -> bytes:
+  if len(key) > KEY_SIZE:
+    raise ValueError(f'the key is longer than {KEY_SIZE} bytes')
+  return key.ljust(KEY_SIZE, b'\0')
+
+
+def load_keyed(sidecar: str, key: bytes) -> Optional[RawFile]:
+  """Maps a sidecar written by ``write_keyed``.
+
+  Returns:
+    the samples, or None if the sidecar is missing, invalid or has another
+    key.
+  """
+  key = _key(key)
+  try:
+    header, mapping = _map_sidecar(sidecar)
+  except (OSError, ValueError):
+    return None
+  if header[7] != key:
+    mapping.close()
+    return None
+  return _from_mapping(header, mapping)
+
+
+def write_keyed(sidecar: str, key: bytes, sample_rate: float, size: int, channels: int, signal_type: str,
+                blocks: Iterable[Any]) -> RawFile:
+  """Writes a keyed sidecar and maps it.
+
+  Args:
+    sidecar: the path of the sidecar.
+    key: the key identifying the samples, at most ``KEY_SIZE`` bytes, e.g. a
+      hash of what they are derived from.
+    sample_rate: the sampling frequency in Hz.
+    size: the number of samples of each channel.
+    channels: the number of channels.
+    signal_type: the signal type, e.g. ``ECG``.
+    blocks: bytes-like objects of little-endian float64 samples, channel
+      after channel, ``size * channels`` samples in total.
+  Returns:
+    the samples mapped from the sidecar.
+  Raises:
+    OSError: failed to write the sidecar.
+    ValueError: the blocks do not hold ``size * channels`` samples.
+  """
+  header = _HEADER.pack(_MAGIC, sample_rate, size, channels, signal_type.encode('ascii')[:16], 0, 0, _key(key))
+  temp = f'{sidecar}.{os.getpid()}.tmp'
+  with open(temp, 'wb') as fp:
+    fp.write(header.ljust(_DATA_OFFSET, b'\0'))
+    for block in blocks:
+      fp.write(block)
+    written = fp.tell() - _DATA_OFFSET
+  if written != size * channels * 8:
+    os.remove(temp)
+    raise ValueError(f'{sidecar}: expects {size * channels} samples but got {written // 8}')
+  os.replace(temp, sidecar)
+  header, mapping = _map_sidecar(sidecar)
+  return _from_mapping(header, mapping)
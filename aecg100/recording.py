@@ -0,0 +1,209 @@
+"""Batched recording of the output signals.
+
+  The SDK calls the OutputSignalCallback once per output sample. The recorder
+  only stores the sample into a preallocated block in that call; full blocks
+  are handed to a drain thread or a queue, so the per-sample work and the
+  time the SDK thread holds the GIL stay minimal.
+"""
+import array
+import collections
+import logging
+import queue
+import threading
+
+from typing import Any, Callable, Deque, Iterator, Optional
+
+from aecg100 import buffers, streaming, structures
+
+logger = logging.getLogger('aecg100')
+
+
+class SignalBlock:
+  """A block of recorded output samples.
+
+  The arrays are reused once the block is released, so the samples must be
+  copied to be kept.
+
+  Attributes:
+    time: the output time of each sample in seconds.
+    ac: the AC data of each sample.
+    dc: the DC data of each sample.
+    size: the number of recorded samples, the arrays may be longer.
+  """
+
+  def __init__(self, recorder: 'OutputRecorder', block_size: int):
+    self.time = array.array('d', bytes(8 * block_size))
+    self.ac = array.array('i', bytes(4 * block_size))
+    self.dc = array.array('i', bytes(4 * block_size))
+    self.size = 0
+    self._recorder = recorder
+
+  def __len__(self) -> int:
+    return self.size
+
+  def arrays(self) -> Any:
+    """Returns NumPy views of the (time, ac, dc) samples."""
+    numpy = buffers.import_numpy('SignalBlock.arrays')
+
+    return (numpy.frombuffer(self.time, dtype=numpy.float64, count=self.size),
+            numpy.frombuffer(self.ac, dtype=numpy.int32, count=self.size),
+            numpy.frombuffer(self.dc, dtype=numpy.int32, count=self.size))
+
+  def release(self) -> None:
+    """Gives the block back to the recorder."""
+    self.size = 0
+    self._recorder._free.append(self)
+
+
+class OutputRecorder:
+  """Records output signals into preallocated blocks.
+
+  Pass the recorder as the callback of ``play_ecg_rawdata`` or
+  ``play_ppg_rawdata``, or as the callback of a raw data stream. With a
+  ``handler`` every full block is passed to it on a drain thread and released
+  afterwards; without one the blocks are read with ``get`` or by iterating
+  the recorder. When no free block is left the samples are dropped and
+  counted in ``dropped_samples``.
+
+  Attributes:
+    block_size: the number of samples of each block.
+    samples_recorded: the number of samples stored into blocks.
+    dropped_samples: the number of samples dropped as no block was free.
+    callback: the SDK OutputSignalCallback of the recorder.
+  """
+
+  def __init__(self,
+               handler: Optional[Callable[[SignalBlock], Any]] = None,
+               block_size: int = 1024,
+               max_blocks: int = 16):
+    """Initiates the recorder.
+
+    Args:
+      handler: called with every full block on the drain thread.
+      block_size: the number of samples of each block.
+      max_blocks: the number of preallocated blocks.
+    """
+    if block_size <= 0 or max_blocks <= 0:
+      raise ValueError('the block size and the number of blocks must be positive')
+
+    self.block_size = block_size
+    self.samples_recorded = 0
+    self.dropped_samples = 0
+    self._free: Deque[SignalBlock] = collections.deque(SignalBlock(self, block_size) for _ in range(max_blocks))
+    self._ready: 'queue.SimpleQueue[Optional[SignalBlock]]' = queue.SimpleQueue()
+    self._block: Optional[SignalBlock] = self._free.popleft()
+    self._finished = threading.Event()
+    self._handler = handler
+    self._thread = None
+    if handler is not None:
+      self._thread = threading.Thread(target=self._drain, name='aecg100-recorder', daemon=True)
+      self._thread.start()
+    self.callback = structures.OutputSignalCallback(self._on_output)
+
+  def __call__(self, time: float, ac: int, dc: int) -> None:
+    self._on_output(time, ac, dc)
+
+  def _on_output(self, time: float, ac: int, dc: int) -> None:
+    # Called by the SDK thread for every sample.
+    if ac == streaming.OUTPUT_END:
+      self._finish()
+      return
+
+    block = self._block
+    if block is None:
+      if not self._free:
+        self.dropped_samples += 1
+        return
+      block = self._block = self._free.popleft()
+
+    size = block.size
+    block.time[size] = time
+    block.ac[size] = ac
+    block.dc[size] = dc
+    block.size = size + 1
+    self.samples_recorded += 1
+    if size + 1 == self.block_size:
+      self._ready.put(block)
+      self._block = self._free.popleft() if self._free else None
+
+  def _finish(self) -> None:
+    if self._finished.is_set():
+      return
+    block, self._block = self._block, None
+    if block is not None:
+      if block.size:
+        self._ready.put(block)
+      else:
+        block.release()
+    self._finished.set()
+    self._ready.put(None)
+
+  def _drain(self) -> None:
+    while True:
+      block = self._ready.get()
+      if block is None:
+        return
+      try:
+        self._handler(block)
+      except Exception:
+        logger.exception('output signal handler failed')
+      finally:
+        block.release()
+
+  @property
+  def is_finished(self) -> bool:
+    """Indicates the end of the output is reported or the recorder closed."""
+    return self._finished.is_set()
+
+  def wait(self, timeout: Optional[float] = None) -> bool:
+    """Waits for the end of the output.
+
+    With a handler the drain thread is also waited for, so every block has
+    been handled when True is returned.
+    """
+    if not self._finished.wait(timeout):
+      return False
+    if self._thread is not None and self._thread is not threading.current_thread():
+      self._thread.join(timeout)
+      return not self._thread.is_alive()
+    return True
+
+  def get(self, timeout: Optional[float] = None) -> Optional[SignalBlock]:
+    """Returns the next full block, to be released after use.
+
+    Returns:
+      the block, or None at the end of the recording or after the timeout.
+    """
+    if self._handler is not None:
+      raise RuntimeError('the blocks are passed to the handler')
+    try:
+      block = self._ready.get(timeout=timeout)
+    except queue.Empty:
+      return None
+    if block is None:
+      # Keeps the end marker for the other readers.
+      self._ready.put(None)
+    return block
+
+  def __iter__(self) -> Iterator[SignalBlock]:
+    """Yields the blocks until the end of the recording.
+
+    Each block is released when the next one is requested.
+    """
+    while True:
+      block = self.get()
+      if block is None:
+        return
+      try:
+        yield block
+      finally:
+        block.release()
+
+  def close(self) -> None:
+    """Ends the recording and hands over the partially filled block.
+
+    The output must be stopped, i.e. the SDK no longer calls the callback.
+    """
+    self._finish()
+    if self._thread is not None and self._thread is not threading.current_thread():
+      self._thread.join()
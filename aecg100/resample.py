@@ -0,0 +1,262 @@
+"""Resampling of raw data to the playback sample rate.
+
+  Two modes are available: ``POLYPHASE`` filters with a Kaiser windowed sinc
+  low-pass filter split into the phases of the rational rate ratio, and
+  ``LINEAR`` interpolates between neighbour samples, which is much faster but
+  aliases when downsampling.
+
+  ``Resampler`` works over chunks of any size and keeps only the filter
+  history between them, so long recordings never sit in memory:
+
+    resampler = resample.Resampler(360, 1000)
+    for chunk in chunks:
+      output = resampler.process(chunk)
+    output = resampler.flush()
+
+  ``resample_chunks`` adapts the (ac, dc) chunks of ``play_*_stream`` and
+  ``resample_file`` resamples a raw data file into a disk cache keyed by the
+  hash of the source samples, the target rate and the mode.
+"""
+import fractions
+import hashlib
+import logging
+import os
+
+from typing import Iterable, Iterator, Optional
+
+from aecg100 import buffers, rawfile, streaming
+
+numpy = buffers.import_numpy('aecg100.resample')
+
+logger = logging.getLogger('aecg100')
+
+POLYPHASE = 'polyphase'
+LINEAR = 'linear'
+
+# The number of samples read from a file per chunk.
+_FILE_CHUNK = 1 << 16
+
+
+def _design_filter(up: int, down: int, taps_per_phase: int, beta: float) -> numpy.ndarray:
+  """Returns the (up, taps_per_phase) polyphase low-pass filter bank."""
+  length = up * taps_per_phase
+  # The cutoff in cycles per sample of the upsampled signal, slightly under
+  # the lower Nyquist frequency of the two rates. The filter has an odd
+  # number of taps so its delay is a whole number of samples.
+  cutoff = 0.5 / max(up, down) * 0.95
+  odd = length - 1 + length % 2
+  n = numpy.arange(odd) - (odd - 1) // 2
+  h = numpy.zeros(length)
+  h[:odd] = 2 * cutoff * numpy.sinc(2 * cutoff * n) * numpy.kaiser(odd, beta)
+  h *= up / h.sum()
+  return h.reshape(taps_per_phase, up).T.copy()
+
+
+class Resampler:
+  """Converts the sample rate of a signal given in chunks.
+
+  Attributes:
+    source_rate: the sampling frequency of the input in Hz.
+    target_rate: the sampling frequency of the output in Hz, the requested
+      one approximated by a ratio of integers.
+    mode: ``POLYPHASE`` or ``LINEAR``.
+    up: the numerator of the rate ratio.
+    down: the denominator of the rate ratio.
+  """
+
+  def __init__(self,
+               source_rate: float,
+               target_rate: float,
+               mode: str = POLYPHASE,
+               taps_per_phase: int = 16,
+               beta: float = 8.0,
+               max_denominator: int = 1000):
+    """Initiates the resampler.
+
+    Args:
+      source_rate: the sampling frequency of the input in Hz.
+      target_rate: the sampling frequency of the output in Hz.
+      mode: ``POLYPHASE`` or ``LINEAR``.
+      taps_per_phase: the filter length per phase, i.e. per input sample.
+      beta: the Kaiser window parameter, higher for more stop band rejection.
+      max_denominator: the maximum denominator of the rate ratio.
+    """
+    if source_rate <= 0 or target_rate <= 0:
+      raise ValueError('the sample rates must be positive')
+    if mode not in (POLYPHASE, LINEAR):
+      raise ValueError(f'unknown resampling mode {mode}')
+
+    ratio = (fractions.Fraction(target_rate) / fractions.Fraction(source_rate)).limit_denominator(max_denominator)
+    self.source_rate = source_rate
+    self.up = ratio.numerator
+    self.down = ratio.denominator
+    self.target_rate = source_rate * self.up / self.down
+    self.mode = mode
+
+    if mode == POLYPHASE:
+      self._filters = _design_filter(self.up, self.down, taps_per_phase, beta)
+      self._taps = taps_per_phase
+      length = self.up * taps_per_phase
+      # The center of the odd filter, see _design_filter().
+      self._delay = (length - 2 + length % 2) // 2
+      # The upsampled position of an output must be before this offset from
+      # the end of the input.
+      self._lookahead = self._delay
+    else:
+      self._taps = 1
+      self._delay = 0
+      self._lookahead = self.up
+
+    self._reset()
+
+  def output_size(self, input_size: int) -> int:
+    """The number of samples output for ``input_size`` input samples."""
+    return -(-input_size * self.up // self.down)
+
+  def process(self, samples: Iterable[float]) -> numpy.ndarray:
+    """Resamples a chunk, returns the output samples available so far."""
+    samples = numpy.asarray(samples, dtype=numpy.float64).ravel()
+    self._buffer = numpy.concatenate((self._buffer, samples))
+    self._inputs += samples.size
+    return self._produce(self._inputs, self.output_size(self._inputs))
+
+  def flush(self) -> numpy.ndarray:
+    """Returns the last output samples once the input is finished.
+
+    The resampler is reset afterwards and can process another signal.
+    """
+    if self._inputs:
+      # The filter is drained with zeros, the interpolation holds the last
+      # sample.
+      tail = numpy.zeros(self._taps) if self.mode == POLYPHASE else self._buffer[-1:]
+      self._buffer = numpy.concatenate((self._buffer, tail))
+      output = self._produce(self._inputs + tail.size, self.output_size(self._inputs))
+    else:
+      output = numpy.empty(0)
+    self._reset()
+    return output
+
+  def _reset(self) -> None:
+    # The input samples from the global index self._start; the history is
+    # zeros before the first sample.
+    self._buffer = numpy.zeros(self._taps - 1)
+    self._start = -(self._taps - 1)
+    self._inputs = 0
+    self._outputs = 0
+
+  def _produce(self, available: int, limit: int) -> numpy.ndarray:
+    # Output m is at position m * down + delay of the upsampled signal, i.e.
+    # at the phase p of the input sample n.
+    end = (available * self.up - self._lookahead - 1) // self.down + 1
+    end = max(min(end, limit), self._outputs)
+    m = numpy.arange(self._outputs, end)
+    position = m * self.down + self._delay
+    n = position // self.up
+    phase = position % self.up
+
+    if self.mode == POLYPHASE:
+      index = n[:, None] - numpy.arange(self._taps)[None, :] - self._start
+      output = numpy.einsum('ij,ij->i', self._buffer[index], self._filters[phase])
+    else:
+      index = n - self._start
+      fraction = phase / self.up
+      output = self._buffer[index] * (1 - fraction) + self._buffer[index + 1] * fraction
+
+    self._outputs = end
+    # Drops the input which no later output needs.
+    keep = (end * self.down + self._delay) // self.up - (self._taps - 1) - self._start
+    # The last sample is kept for the interpolation at the end.
+    keep = min(keep, self._buffer.size - (1 if self.mode == LINEAR else 0))
+    if keep > 0:
+      self._buffer = self._buffer[keep:]
+      self._start += keep
+    return output
+
+
+def resample(samples: Iterable[float], source_rate: float, target_rate: float,
+             mode: str = POLYPHASE) -> numpy.ndarray:
+  """Resamples a whole signal at once."""
+  resampler = Resampler(source_rate, target_rate, mode)
+  return numpy.concatenate((resampler.process(samples), resampler.flush()))
+
+
+def resample_chunks(chunks: Iterable[streaming.Chunk], source_rate: float, target_rate: float,
+                    mode: str = POLYPHASE) -> Iterator[streaming.Chunk]:
+  """Resamples (ac, dc) chunks, e.g. for ``play_ecg_stream``."""
+  ac_resampler = Resampler(source_rate, target_rate, mode)
+  dc_resampler = Resampler(source_rate, target_rate, mode)
+  for ac, dc in chunks:
+    ac_output = ac_resampler.process(ac)
+    dc_output = dc_resampler.process(dc)
+    if ac_output.size:
+      yield ac_output, dc_output
+  ac_output = ac_resampler.flush()
+  if ac_output.size:
+    yield ac_output, dc_resampler.flush()
+
+
+def _cache_dir() -> str:
+  base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+  return os.path.join(base, 'aecg100', 'resampled')
+
+
+def resample_file(path: str,
+                  target_rate: float,
+                  mode: str = POLYPHASE,
+                  cache: bool = True,
+                  cache_dir: Optional[str] = None) -> rawfile.RawFile:
+  """Resamples a raw data file, see ``rawfile.load``.
+
+  The result is written channel by channel into a cache file named by the
+  SHA-256 hash of the source samples, the target rate and the mode, and is
+  mapped into memory like the raw data sidecars; later calls with the same
+  source samples only map the cache file.
+
+  Args:
+    path: the path of the raw data text file.
+    target_rate: the sampling frequency of the result in Hz.
+    mode: ``POLYPHASE`` or ``LINEAR``.
+    cache: whether to use and create the cache file.
+    cache_dir: the directory of the cache files, by default the aecg100
+      directory of the user cache directory.
+  Returns:
+    the resampled samples.
+  """
+  source = rawfile.load(path)
+  if source.sample_rate == target_rate:
+    return source
+
+  digest = hashlib.sha256(source.samples.cast('B')).digest()
+  cache_dir = cache_dir or _cache_dir()
+  cache_path = os.path.join(cache_dir, f'{digest.hex()[:32]}-{target_rate:g}hz-{mode}{rawfile.SIDECAR_SUFFIX}')
+  if cache:
+    cached = rawfile.load_keyed(cache_path, digest)
+    if cached is not None:
+      return cached
+
+  resampler = Resampler(source.sample_rate, target_rate, mode)
+  size = resampler.output_size(source.size)
+  if not cache:
+    samples = numpy.concatenate([resample(source.channel(index), source.sample_rate, target_rate, mode)
+                                 for index in range(source.channels)])
+    return rawfile.RawFile(resampler.target_rate, size, source.channels, source.signal_type, memoryview(samples))
+
+  try:
+    os.makedirs(cache_dir, exist_ok=True)
+    raw = rawfile.write_keyed(cache_path, digest, resampler.target_rate, size, source.channels, source.signal_type,
+                              _resampled_blocks(source, resampler))
+  except OSError as e:
+    logger.warning('failed to write the resampled cache %s: %s', cache_path, e)
+    return resample_file(path, target_rate, mode, cache=False)
+  logger.info('resampled %d samples from %g Hz to %g Hz into %s', source.size, source.sample_rate,
+              resampler.target_rate, cache_path)
+  return raw
+
+
+def _resampled_blocks(source: rawfile.RawFile, resampler: Resampler) -> Iterator[bytes]:
+  """Yields the resampled samples as little-endian float64, channel after channel."""
+  for index in range(source.channels):
+    channel = source.channel(index)
+    for offset in range(0, source.size, _FILE_CHUNK):
+      yield resampler.process(channel[offset:offset + _FILE_CHUNK]).astype('<f8').tobytes()
+    yield resampler.flush().astype('<f8').tobytes()
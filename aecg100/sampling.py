@@ -0,0 +1,183 @@
+"""PPG PD sampling capture.
+
+  The SDK reports sampling data as (data, number) pairs, meaning ``number``
+  consecutive samples of value ``data``. The pairs are stored as they are in a
+  preallocated single-producer single-consumer ring, so the SDK callback does
+  a constant amount of work and never allocates; consumers read the pairs in
+  NumPy batches.
+"""
+import array
+import collections
+import logging
+
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from aecg100 import buffers, structures
+from aecg100 import stats as sampling_stats
+
+logger = logging.getLogger('aecg100')
+
+
+class SamplingRing:
+  """A lock-free ring of run-length encoded sampling data.
+
+  ``push`` is called by the SDK thread and ``read`` by a single consumer
+  thread. Each side only writes its own index, so no lock is needed; when
+  the ring is full new pairs are dropped and counted in ``dropped_samples``.
+
+  Attributes:
+    capacity: the maximum number of pairs held in the ring.
+    total_samples: the number of samples received, including dropped ones.
+    dropped_samples: the number of samples dropped as the ring was full.
+    closed: whether the sampling of the ring is stopped.
+    wakeup: called by the SDK thread when a pair is stored into an empty
+      ring, and once the ring is closed, so a consumer can wait instead of
+      polling.
+  """
+
+  def __init__(self, capacity: int = 1 << 16):
+    """Initiates the ring.
+
+    Args:
+      capacity: the number of pairs, rounded up to a power of two.
+    """
+    capacity = 1 << max(capacity - 1, 0).bit_length()
+    self.capacity = capacity
+    self.total_samples = 0
+    self.dropped_samples = 0
+    self.closed = False
+    self.wakeup: Optional[Callable[[], Any]] = None
+    self._mask = capacity - 1
+    self._data = array.array('i', bytes(4 * capacity))
+    self._number = array.array('i', bytes(4 * capacity))
+    self._write = 0
+    self._read = 0
+
+  def push(self, data: int, number: int) -> None:
+    """Stores a pair; this is the SDK SamplingCallback."""
+    self.total_samples += number
+    write, read = self._write, self._read
+    if write - read >= self.capacity:
+      self.dropped_samples += number
+      return
+
+    index = write & self._mask
+    self._data[index] = data
+    self._number[index] = number
+    self._write = write + 1
+    if write == read and self.wakeup is not None:
+      self.wakeup()
+
+  def close(self) -> None:
+    """Marks the sampling as stopped; the remaining pairs can still be read."""
+    self.closed = True
+    if self.wakeup is not None:
+      self.wakeup()
+
+  @property
+  def available(self) -> int:
+    """The number of pairs which can be read."""
+    return self._write - self._read
+
+  def read(self, max_pairs: int = 0) -> Tuple[Any, Any]:
+    """Reads the available pairs.
+
+    Args:
+      max_pairs: the maximum number of pairs to read, 0 means all of them.
+    Returns:
+      the NumPy arrays of the data values and of their repeat counts.
+    """
+    numpy = buffers.import_numpy('SamplingRing.read')
+
+    read = self._read
+    count = self._write - read
+    if max_pairs:
+      count = min(count, max_pairs)
+
+    data = numpy.empty(count, dtype=numpy.int32)
+    number = numpy.empty(count, dtype=numpy.int32)
+    start = read & self._mask
+    first = min(count, self.capacity - start)
+    for target, source in ((data, self._data), (number, self._number)):
+      ring = numpy.frombuffer(source, dtype=numpy.int32)
+      target[:first] = ring[start:start + first]
+      target[first:] = ring[:count - first]
+
+    self._read = read + count
+    return data, number
+
+  def read_samples(self, max_pairs: int = 0) -> Any:
+    """Reads the available pairs expanded to a NumPy array of samples."""
+    numpy = buffers.import_numpy('SamplingRing.read_samples')
+
+    data, number = self.read(max_pairs)
+    return numpy.repeat(data, number)
+
+
+def _push_both(ring: SamplingRing, stats: sampling_stats.SamplingStats) -> Callable[[int, int], None]:
+  ring_push, stats_push = ring.push, stats.push
+
+  def push(data: int, number: int) -> None:
+    ring_push(data, number)
+    stats_push(data, number)
+
+  return push
+
+
+class SamplingCapture:
+  """The sampling rings and SDK callbacks of the enabled sampling modes.
+
+  Attributes:
+    rings: the ring of each enabled sampling mode.
+    stats: the statistics of each enabled sampling mode, empty unless they
+      are enabled.
+    errors: the latest sampling error codes reported by the SDK.
+    error_count: the number of sampling errors reported by the SDK.
+  """
+
+  def __init__(self,
+               modes: Iterable[structures.PPGSampling],
+               capacity: int = 1 << 16,
+               max_errors: int = 64,
+               statistics: bool = False,
+               window: Optional[int] = None):
+    """Initiates the capture.
+
+    Args:
+      modes: the sampling modes to enable.
+      capacity: the number of (data, number) pairs buffered for each mode.
+      max_errors: the number of error codes kept in ``errors``.
+      statistics: whether the SDK callbacks also update ``stats``.
+      window: the number of samples the statistics cover, None for all of
+        them.
+    """
+    self.rings: Dict[structures.PPGSampling, SamplingRing] = {}
+    self.stats: Dict[structures.PPGSampling, sampling_stats.SamplingStats] = {}
+    self.callbacks = {}
+    for mode in modes:
+      mode = structures.PPGSampling(mode)
+      if mode == structures.PPGSampling.Max:
+        raise ValueError(f'{mode} is not a sampling mode')
+      ring = SamplingRing(capacity)
+      self.rings[mode] = ring
+      push: Callable[[int, int], None] = ring.push
+      if statistics:
+        self.stats[mode] = sampling_stats.SamplingStats(window)
+        push = _push_both(ring, self.stats[mode])
+      self.callbacks[mode] = structures.SamplingCallback(push)
+
+    self.errors: Deque[int] = collections.deque(maxlen=max_errors)
+    self.error_count = 0
+    self.error_callback = structures.SamplingErrorCallback(self._on_error)
+
+  def _on_error(self, error: int) -> None:
+    self.errors.append(error)
+    self.error_count += 1
+
+  def close(self) -> None:
+    """Closes the rings once the SDK stopped sampling."""
+    for ring in self.rings.values():
+      ring.close()
+
+  def __getitem__(self, mode: structures.PPGSampling) -> SamplingRing:
+    return self.rings[mode]
@@ -0,0 +1,140 @@
+"""Frequency scans which can be waited for, polled and cancelled.
+
+  The SDK outputs a frequency scan in the background and reports its end
+  through the OutputSignalCallback, whose last call carries INT_MIN as its
+  data. A ``FrequencyScan`` waits for that call, so scans can be chained back
+  to back without sleeping for their duration:
+
+    for scan in scans:
+      client.scan_ecg_frequency(scan).wait()
+"""
+import logging
+import threading
+import time
+
+from typing import Any, Callable, Optional
+
+from aecg100 import streaming, structures
+
+logger = logging.getLogger('aecg100')
+
+# The delay after the scan duration before a scan whose end is not reported
+# is taken as finished.
+_END_DELAY = 1.0
+
+
+class FrequencyScan:
+  """The handle of a frequency scan output.
+
+  The frequency is swept linearly from ``frequency_start`` to
+  ``frequency_finish`` over ``duration`` seconds.
+
+  Attributes:
+    frequency_start: the frequency in Hz at the start of the scan.
+    frequency_finish: the frequency in Hz at the end of the scan.
+    duration: the duration of the scan in seconds.
+    samples_output: the number of samples reported by the SDK so far.
+  """
+
+  def __init__(self,
+               frequency_start: float,
+               frequency_finish: float,
+               duration: float,
+               stop: Callable[[], Any],
+               callback: Optional[Callable[[float, int, int], Any]] = None):
+    """Initiates the handle.
+
+    Args:
+      frequency_start: the frequency in Hz at the start of the scan.
+      frequency_finish: the frequency in Hz at the end of the scan.
+      duration: the duration of the scan in seconds.
+      stop: stops the output of the device.
+      callback: called with (time, ac, dc) of every output sample.
+    """
+    self.frequency_start = frequency_start
+    self.frequency_finish = frequency_finish
+    self.duration = duration
+    self.samples_output = 0
+    self._stop = stop
+    self._callback = callback
+    self._started = time.monotonic()
+    self._ended: Optional[float] = None
+    self._finished = threading.Event()
+    self._completed = False
+    self.signal_callback = structures.OutputSignalCallback(self._on_output)
+
+  def _finish(self, completed: bool) -> None:
+    if self._ended is None:
+      self._ended = time.monotonic()
+      self._completed = completed
+    self._finished.set()
+
+  def _on_output(self, time_: float, ac: int, dc: int) -> None:
+    if ac == streaming.OUTPUT_END:
+      self._finish(True)
+      return
+
+    self.samples_output += 1
+    if self._callback is not None:
+      self._callback(time_, ac, dc)
+
+  @property
+  def elapsed(self) -> float:
+    """The number of seconds since the scan started, up to its duration."""
+    if self._completed:
+      return float(self.duration)
+    now = time.monotonic() if self._ended is None else self._ended
+    return min(now - self._started, float(self.duration))
+
+  @property
+  def progress(self) -> float:
+    """The part of the scan output so far, from 0 to 1."""
+    return self.elapsed / self.duration if self.duration > 0 else 1.0
+
+  @property
+  def frequency(self) -> float:
+    """The instantaneous frequency in Hz being output."""
+    return self.frequency_start + (self.frequency_finish - self.frequency_start) * self.progress
+
+  @property
+  def is_running(self) -> bool:
+    return not self._finished.is_set()
+
+  @property
+  def completed(self) -> bool:
+    """Whether the SDK reported the end of the scan.
+
+    The output stopped by ``cancel`` is not completed; the end reported for
+    a ``stop`` of the client is, as the SDK does not tell them apart.
+    """
+    return self._completed
+
+  def wait(self, timeout: Optional[float] = None) -> bool:
+    """Waits until the scan is finished, cancelled or replaced.
+
+    A scan whose end is not reported within a second after its duration is
+    taken as finished.
+
+    Returns:
+      True if the scan is finished, or False if the timeout elapsed.
+    """
+    deadline = self._started + self.duration + _END_DELAY
+    remaining = deadline - time.monotonic()
+    if timeout is not None and timeout < remaining:
+      return self._finished.wait(max(timeout, 0.0))
+    if not self._finished.wait(max(remaining, 0.0)):
+      logger.warning('no end of the frequency scan is reported in %.1f seconds', self.duration + _END_DELAY)
+      self._finish(False)
+    return True
+
+  def cancel(self) -> None:
+    """Stops the device output if the scan is still running."""
+    if self.is_running:
+      # Finished first, so the end reported by the stop is not taken as the
+      # completion of the scan.
+      self._finish(False)
+      self._stop()
+
+  def close(self) -> None:
+    """Marks the scan as finished, called once the output is stopped or replaced."""
+    self._finish(False)
@@ -0,0 +1,657 @@
+"""Software-simulated AECG100 SDK.
+
+  ``SimulatedSdk`` implements the ``WTQ*`` entry points of ``sdk/AECG100.h``
+  in Python with the calling conventions of the SDK library returned by
+  ``_load_cdll``, so it can replace the shared library to run and benchmark
+  the Python layer without a device:
+
+    client = aecg100.Aecg100Client(aecg100.simulator.SDK_NAME)
+    client = aecg100.Aecg100Client(aecg100.simulator.SimulatedSdk(time_scale=100))
+
+  Outputs emit OutputSignalCallback samples at the output sample rate, raw
+  data at its own sample rate, and PD sampling emits (data, number) pairs.
+  Time runs in real time by default; ``time_scale`` speeds it up, and an
+  infinite time scale emits as fast as possible.
+"""
+import ctypes
+import logging
+import math
+import threading
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aecg100 import streaming, structures
+
+logger = logging.getLogger('aecg100')
+
+# The sdk_path selecting the simulated SDK.
+SDK_NAME = 'simulator'
+
+STATUS_OK = 0
+STATUS_DEVICE_NOT_CONNECTED = 1
+STATUS_INVALID_MODE_TYPE = 4
+
+# ModeType of the standalone modes.
+_MODE_ECG = 1
+_MODE_PWV = 2
+_MODE_SPO2 = 3
+_MODE_PPG1 = 4
+_MODE_PPG2 = 5
+_MODE_PWV2 = 6
+_MODE_PWV3 = 7
+_MODE_SPO23 = 8
+_MODE_PPG3 = 9
+
+# A source returns the (ac, dc) output of a sample index in uV, or None at the
+# end of the output.
+_Source = Callable[[int], Optional[Tuple[int, int]]]
+
+
+def _value(arg: Any) -> Any:
+  """Returns the Python value of an argument, which may be a ctypes object."""
+  return arg.value if isinstance(arg, ctypes._SimpleCData) else arg
+
+
+def _object(arg: Any) -> Any:
+  """Returns the ctypes object a pointer or ``byref`` argument refers to."""
+  if isinstance(arg, ctypes._Pointer):
+    return arg.contents
+  if type(arg).__name__ == 'CArgObject':
+    return arg._obj
+  return arg
+
+
+def _contents(arg: Any, ctype: Any) -> Any:
+  """Returns the object of type ``ctype`` an argument points to.
+
+  The argument may be a pointer, a ``byref`` reference, an object passed by
+  value or an address; the returned object shares the memory of the caller.
+  """
+  arg = _object(arg)
+  address = arg if isinstance(arg, int) else ctypes.addressof(arg)
+  return ctype.from_address(address)
+
+
+def _callback(arg: Any) -> Optional[Callable]:
+  """Returns a callable callback, or None for a NULL callback."""
+  if arg is None or (isinstance(arg, ctypes._CFuncPtr) and not arg):
+    return None
+  return arg
+
+
+def _shape(waveform_type: int, phase: float, pulse: bool) -> float:
+  """Returns a unit waveform in [-1, 1] at a phase in [0, 1)."""
+  if waveform_type == 1:
+    return 1 - 4 * abs(phase - 0.5)
+  if waveform_type == 2:
+    return 1.0 if phase < 0.5 else -1.0
+  if pulse:
+    # ECG and PPG morphologies are approximated by a pulse per period.
+    return math.exp(-((phase - 0.3) / 0.04)**2)
+  return math.sin(2 * math.pi * phase)
+
+
+class _Emitter:
+  """Emits the output samples of several channels in one thread."""
+
+  def __init__(self, sdk: 'SimulatedSdk', sample_rate: float, channels: Sequence[Tuple[Optional[Callable], _Source]]):
+    self._sdk = sdk
+    self._sample_rate = sample_rate
+    self._channels = [(callback, source) for callback, source in channels]
+    self._stopped = threading.Event()
+    self._thread = threading.Thread(target=self._run, name='aecg100-simulator', daemon=True)
+    self._thread.start()
+
+  def _run(self) -> None:
+    tick = max(1, int(self._sample_rate * self._sdk.tick))
+    index = 0
+    start = time.monotonic()
+    while not self._stopped.is_set():
+      self._sdk.wait_until(start, (index + tick) / self._sample_rate, self._stopped)
+      for _ in range(tick):
+        if self._stopped.is_set():
+          return
+        for callback, source in self._channels:
+          sample = source(index)
+          if sample is None:
+            self._finish()
+            return
+          if callback is not None:
+            callback(index / self._sample_rate, sample[0], sample[1])
+        index += 1
+
+  def _finish(self) -> None:
+    self._stopped.set()
+    for callback, _ in self._channels:
+      if callback is not None:
+        callback(0.0, streaming.OUTPUT_END, streaming.OUTPUT_END)
+
+  def stop(self, notify: bool = True) -> None:
+    """Stops emitting, the callbacks get the end marker if ``notify``."""
+    if self._stopped.is_set():
+      return
+    self._stopped.set()
+    if self._thread is not threading.current_thread():
+      self._thread.join()
+    if notify:
+      for callback, _ in self._channels:
+        if callback is not None:
+          callback(0.0, streaming.OUTPUT_END, streaming.OUTPUT_END)
+
+
+class SimulatedSdk:
+  """A simulated AECG100 SDK library.
+
+  Attributes:
+    time_scale: the speed of the simulated time, 1 is real time.
+    output_rate: the sample rate of waveform and frequency scan outputs.
+    sampling_rate: the PD sampling rate.
+    tick: the number of simulated seconds emitted at once.
+    present: whether a device can be connected.
+    settings: the signal output control settings.
+  """
+
+  def __init__(self,
+               time_scale: float = 1.0,
+               output_rate: float = 1000,
+               sampling_rate: float = 1000,
+               tick: float = 0.01,
+               present: bool = True):
+    if time_scale <= 0:
+      raise ValueError('the time scale must be positive')
+
+    self.time_scale = time_scale
+    self.output_rate = output_rate
+    self.sampling_rate = sampling_rate
+    self.tick = tick
+    self.present = present
+    self.settings: Dict[str, int] = {}
+    self._connected = False
+    self._connected_callback = None
+    self._loop = False
+    self._emitter: Optional[_Emitter] = None
+    # Whether the emitter plays raw data, which WTQStopOutputWaveform() does
+    # not stop.
+    self._raw_output = False
+    self._sampling_callbacks: Dict[int, Callable] = {}
+    self._sampling_stopped = threading.Event()
+    self._sampling_thread: Optional[threading.Thread] = None
+    self._standalone: Dict[int, Tuple[int, int, List[bytes]]] = {}
+    self._led_levels: Dict[int, int] = {}
+    self._trigger_levels: Dict[int, int] = {}
+    self._led_pulse_group = b''
+    self._lock = threading.RLock()
+    self._reset_settings()
+
+  def _reset_settings(self) -> None:
+    # The SDK resets the lead, the impedance and the respiration on connect.
+    self.settings = {
+        'electrode': structures.Electrode.RightArm,
+        'impedance': structures.ECGImpedance.Off,
+        'respiration': structures.ECGRespirationEnable.Off,
+        'pacing': structures.ECGPacingEnable.Off,
+        'dc_offset': 0,
+    }
+
+  def wait_until(self, start: float, simulated: float, stopped: threading.Event) -> None:
+    """Waits until ``simulated`` seconds are elapsed since ``start``."""
+    if math.isinf(self.time_scale):
+      # Yields to the other threads, the time is not simulated.
+      time.sleep(0)
+      return
+    delay = start + simulated / self.time_scale - time.monotonic()
+    if delay > 0:
+      stopped.wait(delay)
+
+  #
+  # Initialization & Cleanup
+  #
+  def WTQInit(self, cb: Any) -> bool:
+    self._connected_callback = _callback(cb)
+    if not self.present:
+      return False
+
+    self._connected = True
+    self._reset_settings()
+    if self._connected_callback is not None:
+      threading.Thread(target=self._connected_callback, args=(True,), daemon=True).start()
+    return True
+
+  def WTQConnect(self, portNumber: Any, millisecondsTimeout: Any) -> bool:
+    self._connected = self.present
+    self._reset_settings()
+    return self._connected
+
+  def WTQFree(self) -> None:
+    self._stop_output()
+    self.WTQDisableSampling()
+    was_connected, self._connected = self._connected, False
+    callback, self._connected_callback = self._connected_callback, None
+    if was_connected and callback is not None:
+      threading.Thread(target=callback, args=(False,), daemon=True).start()
+
+  #
+  # Device Configurations
+  #
+  def WTQGetDeviceInformation(self, modelInfo: Any) -> bool:
+    info = _contents(modelInfo, structures.ModelInformation)
+    info.product_name = b'AE'
+    info.generation_number = b'\x01'
+    info.model_number = b'\x00'
+    info.serial_number = 1
+    info.year = 0x14
+    return self._connected
+
+  def WTQGetPPGDeviceInformation(self, modelInfo: Any) -> bool:
+    info = _contents(modelInfo, structures.ModelInformation)
+    info.product_name = b'AP'
+    info.generation_number = b'\x02'
+    info.model_number = b'\x05'
+    info.serial_number = 1
+    info.year = 0x14
+    info.attr_1 = structures.LEDType.Red
+    info.attr_2 = structures.LEDType.IR
+    info.attr_3 = structures.LEDType.Green
+    return self._connected
+
+  def WTQGetSerialNumber(self) -> bytes:
+    return b'WAE0100-200001'
+
+  def WTQGetPPGSerialNumber(self) -> bytes:
+    return b'WAP0205-200001'
+
+  def WTQGetHWInformation(self, hwInfo: Any) -> bool:
+    info = _contents(hwInfo, structures.HWInformation)
+    info.fw_main_version, info.fw_sub_version, info.hw_version, info.pcb_version = 1, 8, 9, 1
+    return self._connected
+
+  def WTQGetPPGHWInformation(self, hwInfo: Any) -> bool:
+    return self.WTQGetHWInformation(hwInfo)
+
+  def WTQGetVersion(self) -> int:
+    return 0x01000108
+
+  #
+  # PPG Module Sampling
+  #
+  def WTQEnableSampling(self, mode: Any, cbSamplingData: Any) -> bool:
+    mode = _value(mode)
+    if not 0 <= mode < structures.PPGSampling.Max:
+      return False
+    self._sampling_callbacks[mode] = _callback(cbSamplingData)
+    return self._connected
+
+  def WTQStartSampling(self, cbError: Any) -> bool:
+    if not self._connected or not self._sampling_callbacks:
+      return False
+
+    self._sampling_stopped.clear()
+    self._sampling_thread = threading.Thread(target=self._sample, name='aecg100-sampling', daemon=True)
+    self._sampling_thread.start()
+    return True
+
+  def _sample(self) -> None:
+    number = max(1, int(self.sampling_rate * self.tick))
+    start = time.monotonic()
+    index = 0
+    while not self._sampling_stopped.is_set():
+      self.wait_until(start, (index + number) / self.sampling_rate, self._sampling_stopped)
+      if self._sampling_stopped.is_set():
+        return
+      # A 1 Hz PD signal around the middle of the [0, 1023] range.
+      data = int(512 + 256 * math.sin(2 * math.pi * index / self.sampling_rate))
+      for callback in list(self._sampling_callbacks.values()):
+        if callback is not None:
+          callback(data, number)
+      index += number
+
+  def WTQDisableSampling(self) -> None:
+    self._sampling_stopped.set()
+    thread, self._sampling_thread = self._sampling_thread, None
+    if thread is not None and thread is not threading.current_thread():
+      thread.join()
+    self._sampling_callbacks = {}
+
+  def WTQEnableRLD(self, enable: Any) -> bool:
+    return self._connected
+
+  def WTQReadRLD(self, N1: Any, N2: Any) -> bool:
+    _contents(N1, ctypes.c_double).value = 0.0
+    _contents(N2, ctypes.c_double).value = 0.0
+    return self._connected
+
+  #
+  # Signal Output Control
+  #
+  def _set(self, name: str, value: Any) -> bool:
+    self.settings[name] = _value(value)
+    return self._connected
+
+  def WTQDeviceEnableImpedance(self, impedance: Any) -> bool:
+    return self._set('impedance', impedance)
+
+  def WTQDeviceSetElectrode(self, electrode: Any) -> bool:
+    return self._set('electrode', electrode)
+
+  def WTQDeviceSetDCOffset(self, dcOffset: Any) -> bool:
+    return self._set('dc_offset', dcOffset)
+
+  def WTQDeviceEnablePacing(self, pacing: Any) -> bool:
+    return self._set('pacing', pacing)
+
+  def WTQDeviceEnableRespiration(self, respiration: Any) -> bool:
+    return self._set('respiration', respiration)
+
+  def WTQReadLEDPulseGroupSetting(self, pulseGroupSetting: Any) -> bool:
+    setting = _object(pulseGroupSetting)
+    ctypes.memmove(ctypes.addressof(setting), self._led_pulse_group, len(self._led_pulse_group))
+    return self._connected
+
+  def WTQWriteLEDPulseGroupSetting(self, pulseGroupSetting: Any) -> bool:
+    self._led_pulse_group = bytes(_object(pulseGroupSetting))
+    return self._connected
+
+  #
+  # Waveform outputs
+  #
+  def _start(self, sample_rate: float, channels: Sequence[Tuple[Any, _Source]], raw: bool = False) -> bool:
+    if not self._connected:
+      return False
+    with self._lock:
+      # The new output replaces the current one, which is not stopped.
+      if self._emitter is not None:
+        self._emitter.stop(notify=False)
+      self._emitter = _Emitter(self, sample_rate, [(_callback(cb), source) for cb, source in channels])
+      self._raw_output = raw
+    return True
+
+  def _stop_output(self, raw: Optional[bool] = None) -> None:
+    """Stops the output; if ``raw`` is given, only a raw data output or only another one."""
+    with self._lock:
+      if raw is not None and raw != self._raw_output:
+        return
+      emitter, self._emitter = self._emitter, None
+    if emitter is not None:
+      emitter.stop()
+
+  def _ecg_source(self, waveform: Any) -> _Source:
+    ecg = structures.ECGWaveform.from_buffer_copy(_contents(waveform, structures.ECGWaveform))
+    rate = self.output_rate
+    pulse = ecg.waveform_type == structures.ECGWaveformType.ECG
+
+    def source(index: int) -> Tuple[int, int]:
+      phase = (index * ecg.frequency / rate) % 1.0
+      return int(ecg.amplitude * 1000 * _shape(ecg.waveform_type, phase, pulse)), int(ecg.dc_offset * 1000)
+
+    return source
+
+  def _ppg_source(self, waveform: Any) -> _Source:
+    ppg = structures.PPGWaveForm.from_buffer_copy(_contents(waveform, structures.PPGWaveForm))
+    rate = self.output_rate
+    pulse = ppg.waveform_type == structures.PPGWaveformType.PPG
+
+    def source(index: int) -> Tuple[int, int]:
+      phase = (index * ppg.frequency / rate) % 1.0
+      ac = (ppg.vol_sp * _shape(ppg.waveform_type, phase, pulse) + ppg.ac_offset) * 1000
+      return int(ac), int(ppg.vol_dc * 1000)
+
+    return source
+
+  def _scan_source(self, amplitude: float, dc: float, start: float, finish: float, duration: int) -> _Source:
+    rate = self.output_rate
+    size = int(duration * rate)
+
+    def source(index: int) -> Optional[Tuple[int, int]]:
+      if index >= size:
+        return None
+      t = index / rate
+      # Linear sweep, the phase is the integral of the frequency.
+      phase = start * t + (finish - start) * t * t / (2 * duration)
+      return int(amplitude * 1000 * math.sin(2 * math.pi * phase)), int(dc * 1000)
+
+    return source
+
+  def WTQOutputECG(self, waveform: Any, cb: Any) -> bool:
+    return self._start(self.output_rate, [(cb, self._ecg_source(waveform))])
+
+  def WTQOutputECGAndPPG(self, timeDiffPTTPeak: Any, ecgWaveform: Any, ppgWaveform: Any, cbECG: Any,
+                         cbPPG: Any) -> bool:
+    return self._start(self.output_rate, [(cbECG, self._ecg_source(ecgWaveform)),
+                                          (cbPPG, self._ppg_source(ppgWaveform))])
+
+  def WTQOutputECGAndPPGEx(self, timeDiffPTTPeak: Any, ecgWaveform: Any, ppgChannel1Waveform: Any,
+                           ppgChannel2Waveform: Any, cbECG: Any, cbPPGChannel1: Any, cbPPGChannel2: Any) -> bool:
+    return self._start(self.output_rate, [(cbECG, self._ecg_source(ecgWaveform)),
+                                          (cbPPGChannel1, self._ppg_source(ppgChannel1Waveform)),
+                                          (cbPPGChannel2, self._ppg_source(ppgChannel2Waveform))])
+
+  def WTQOutputECGAndPPG3(self, timeDiffPTTPeak: Any, ecgWaveform: Any, ppgChannel1Waveform: Any,
+                          ppgChannel2Waveform: Any, ppgChannel3Waveform: Any, cbECG: Any, cbPPGChannel1: Any,
+                          cbPPGChannel2: Any, cbPPGChannel3: Any) -> bool:
+    return self._start(self.output_rate, [(cbECG, self._ecg_source(ecgWaveform)),
+                                          (cbPPGChannel1, self._ppg_source(ppgChannel1Waveform)),
+                                          (cbPPGChannel2, self._ppg_source(ppgChannel2Waveform)),
+                                          (cbPPGChannel3, self._ppg_source(ppgChannel3Waveform))])
+
+  def WTQOutputPPG(self, channelNo: Any, waveform: Any, cb: Any) -> bool:
+    return self._start(self.output_rate, [(cb, self._ppg_source(waveform))])
+
+  def WTQOutputPPGEx(self, channel1Waveform: Any, channel2Waveform: Any, cbChannel1: Any, cbChannel2: Any) -> bool:
+    return self._start(self.output_rate, [(cbChannel1, self._ppg_source(channel1Waveform)),
+                                          (cbChannel2, self._ppg_source(channel2Waveform))])
+
+  def WTQOutputPPG3(self, channel1Waveform: Any, channel2Waveform: Any, channel3Waveform: Any, cbChannel1: Any,
+                    cbChannel2: Any, cbChannel3: Any) -> bool:
+    return self._start(self.output_rate, [(cbChannel1, self._ppg_source(channel1Waveform)),
+                                          (cbChannel2, self._ppg_source(channel2Waveform)),
+                                          (cbChannel3, self._ppg_source(channel3Waveform))])
+
+  def WTQOutputFrequencyScan(self, scan: Any, cb: Any) -> bool:
+    scan = _contents(scan, structures.ECGFrequencyScan)
+    source = self._scan_source(scan.amplitude, 0, scan.frequency_start, scan.frequency_finish, scan.duration)
+    return self._start(self.output_rate, [(cb, source)])
+
+  def WTQOutputFrequencyScanPPG(self, channelNo: Any, scan: Any, cb: Any) -> bool:
+    scan = _contents(scan, structures.PPGFrequencyScan)
+    source = self._scan_source(scan.amplitude, scan.dc, scan.frequency_start, scan.frequency_finish, scan.duration)
+    return self._start(self.output_rate, [(cb, source)])
+
+  #
+  # Play Raw Data
+  #
+  def _raw_channel(self, data: Any) -> Tuple[float, Any, _Source]:
+    raw = _contents(data, structures.RawData)
+    size = raw.size
+    # The samples are read while playing, as the device does.
+    ac = (ctypes.c_double * size).from_address(raw.ac)
+    dc = (ctypes.c_double * size).from_address(raw.dc)
+    loop = self._loop
+
+    def source(index: int) -> Optional[Tuple[int, int]]:
+      if index >= size and (not loop or not size):
+        return None
+      index %= size
+      return int(ac[index] * 1000), int(dc[index] * 1000)
+
+    # Copies the callback address, as the structure may be freed once the
+    # call returns like with the SDK.
+    address = ctypes.cast(raw.output_signal_callback, ctypes.c_void_p).value
+    callback = structures.OutputSignalCallback(address) if address else None
+    return raw.sample_rate, callback, source
+
+  def _play(self, *data: Any) -> bool:
+    channels = [self._raw_channel(item) for item in data]
+    return self._start(channels[0][0], [(callback, source) for _, callback, source in channels], raw=True)
+
+  def WTQWaveformPlayerOutputECG(self, data: Any) -> bool:
+    return self._play(data)
+
+  def WTQWaveformPlayerOutputECGAndPPG(self, ecgData: Any, channelNo: Any, ppgData: Any) -> bool:
+    return self._play(ecgData, ppgData)
+
+  def WTQWaveformPlayerOutputECGAndPPGEx(self, ecgData: Any, ppgChannel1Data: Any, ppgChannel2Data: Any) -> bool:
+    return self._play(ecgData, ppgChannel1Data, ppgChannel2Data)
+
+  def WTQWaveformPlayerOutputECGAndPPG3(self, ecgData: Any, ppgChannel1Data: Any, ppgChannel2Data: Any,
+                                        ppgChannel3Data: Any) -> bool:
+    return self._play(ecgData, ppgChannel1Data, ppgChannel2Data, ppgChannel3Data)
+
+  def WTQWaveformPlayerOutputPPG(self, channelNo: Any, ppgData: Any) -> bool:
+    return self._play(ppgData)
+
+  def WTQWaveformPlayerOutputPPGEx(self, ppgChannel1Data: Any, ppgChannel2Data: Any) -> bool:
+    return self._play(ppgChannel1Data, ppgChannel2Data)
+
+  def WTQWaveformPlayerOutputPPG3(self, ppgChannel1Data: Any, ppgChannel2Data: Any, ppgChannel3Data: Any) -> bool:
+    return self._play(ppgChannel1Data, ppgChannel2Data, ppgChannel3Data)
+
+  def WTQWaveformPlayerLoop(self, loop: Any) -> None:
+    self._loop = bool(_value(loop))
+
+  def WTQStopOutputWaveform(self) -> None:
+    self._stop_output(raw=False)
+
+  def WTQStopPlayRawData(self) -> None:
+    self._stop_output(raw=True)
+
+  #
+  # Standalone Mode Setting Control
+  #
+  def WTQReadStandaloneModeType(self, mode: Any) -> int:
+    return self._standalone.get(_value(mode), (_MODE_ECG, 0, []))[0]
+
+  def _read_standalone(self, mode: Any, mode_type: int, ptt: Any, waveforms: Sequence[Tuple[Any, Any]]) -> int:
+    if not self._connected:
+      return STATUS_DEVICE_NOT_CONNECTED
+
+    stored_type, stored_ptt, stored = self._standalone.get(_value(mode), (_MODE_ECG, 0, []))
+    if stored_type != mode_type:
+      return STATUS_INVALID_MODE_TYPE
+    if ptt is not None:
+      _contents(ptt, ctypes.c_int).value = stored_ptt
+    for (pointer, struct_type), data in zip(waveforms, stored):
+      ctypes.memmove(ctypes.addressof(_contents(pointer, struct_type)), data, len(data))
+    return STATUS_OK
+
+  def _write_standalone(self, mode: Any, mode_type: int, ptt: Any, waveforms: Sequence[Tuple[Any, Any]]) -> int:
+    if not self._connected:
+      return STATUS_DEVICE_NOT_CONNECTED
+
+    stored = [bytes(_contents(pointer, struct_type)) for pointer, struct_type in waveforms]
+    self._standalone[_value(mode)] = (mode_type, _value(ptt) or 0, stored)
+    return STATUS_OK
+
+  def WTQReadECGModeFromStandaloneMode(self, mode: Any, waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_ECG, None, [(waveform, structures.ECGWaveform)])
+
+  def WTQWriteECGModeToStandaloneMode(self, mode: Any, waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_ECG, None, [(waveform, structures.ECGWaveform)])
+
+  def WTQReadPWVModeFromStandaloneMode(self, mode: Any, timeDiffPTTPeak: Any, ecgWaveform: Any,
+                                       ppgWaveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_PWV, timeDiffPTTPeak, [(ecgWaveform, structures.ECGWaveform),
+                                                                     (ppgWaveform, structures.PPGWaveForm)])
+
+  def WTQWritePWVModeToStandaloneMode(self, mode: Any, timeDiffPTTPeak: Any, ecgWaveform: Any,
+                                      ppgWaveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_PWV, timeDiffPTTPeak, [(ecgWaveform, structures.ECGWaveform),
+                                                                     (ppgWaveform, structures.PPGWaveForm)])
+
+  def WTQReadPWVModeExFromStandaloneMode(self, mode: Any, timeDiffPTTPeak: Any, ecgWaveform: Any,
+                                         ppgChannel1Waveform: Any, ppgChannel2Waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_PWV2, timeDiffPTTPeak, [(ecgWaveform, structures.ECGWaveform),
+                                                                      (ppgChannel1Waveform, structures.PPGWaveForm),
+                                                                      (ppgChannel2Waveform, structures.PPGWaveForm)])
+
+  def WTQWritePWVModeExToStandaloneMode(self, mode: Any, timeDiffPTTPeak: Any, ecgWaveform: Any,
+                                        ppgChannel1Waveform: Any, ppgChannel2Waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_PWV2, timeDiffPTTPeak, [(ecgWaveform, structures.ECGWaveform),
+                                                                       (ppgChannel1Waveform, structures.PPGWaveForm),
+                                                                       (ppgChannel2Waveform, structures.PPGWaveForm)])
+
+  def WTQReadPWVModePPG3FromStandaloneMode(self, mode: Any, timeDiffPTTPeak: Any, ecgWaveform: Any,
+                                           ppgChannel1Waveform: Any, ppgChannel2Waveform: Any,
+                                           ppgChannel3Waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_PWV3, timeDiffPTTPeak, [(ecgWaveform, structures.ECGWaveform),
+                                                                      (ppgChannel1Waveform, structures.PPGWaveForm),
+                                                                      (ppgChannel2Waveform, structures.PPGWaveForm),
+                                                                      (ppgChannel3Waveform, structures.PPGWaveForm)])
+
+  def WTQWritePWVModePPG3ToStandaloneMode(self, mode: Any, timeDiffPTTPeak: Any, ecgWaveform: Any,
+                                          ppgChannel1Waveform: Any, ppgChannel2Waveform: Any,
+                                          ppgChannel3Waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_PWV3, timeDiffPTTPeak, [(ecgWaveform, structures.ECGWaveform),
+                                                                       (ppgChannel1Waveform, structures.PPGWaveForm),
+                                                                       (ppgChannel2Waveform, structures.PPGWaveForm),
+                                                                       (ppgChannel3Waveform, structures.PPGWaveForm)])
+
+  def WTQReadSPO2ModeFromStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_SPO2, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                          (channel2Waveform, structures.PPGWaveForm)])
+
+  def WTQWriteSPO2ModeToStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_SPO2, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                           (channel2Waveform, structures.PPGWaveForm)])
+
+  def WTQReadSPO2ModePPG3FromStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any,
+                                            channel3Waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_SPO23, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                           (channel2Waveform, structures.PPGWaveForm),
+                                                           (channel3Waveform, structures.PPGWaveForm)])
+
+  def WTQWriteSPO2ModePPG3ToStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any,
+                                           channel3Waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_SPO23, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                            (channel2Waveform, structures.PPGWaveForm),
+                                                            (channel3Waveform, structures.PPGWaveForm)])
+
+  def WTQReadPPGModeFromStandaloneMode(self, mode: Any, ppgWaveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_PPG1, None, [(ppgWaveform, structures.PPGWaveForm)])
+
+  def WTQWritePPGModeToStandaloneMode(self, mode: Any, ppgWaveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_PPG1, None, [(ppgWaveform, structures.PPGWaveForm)])
+
+  def WTQReadPPGModeExFromStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_PPG2, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                          (channel2Waveform, structures.PPGWaveForm)])
+
+  def WTQWritePPGModeExToStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_PPG2, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                           (channel2Waveform, structures.PPGWaveForm)])
+
+  def WTQReadPPGModePPG3FromStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any,
+                                           channel3Waveform: Any) -> int:
+    return self._read_standalone(mode, _MODE_PPG3, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                          (channel2Waveform, structures.PPGWaveForm),
+                                                          (channel3Waveform, structures.PPGWaveForm)])
+
+  def WTQWritePPGModePPG3ToStandaloneMode(self, mode: Any, channel1Waveform: Any, channel2Waveform: Any,
+                                          channel3Waveform: Any) -> int:
+    return self._write_standalone(mode, _MODE_PPG3, None, [(channel1Waveform, structures.PPGWaveForm),
+                                                           (channel2Waveform, structures.PPGWaveForm),
+                                                           (channel3Waveform, structures.PPGWaveForm)])
+
+  #
+  # PPG calibration
+  #
+  def WTQRestoreFactorySetting(self) -> bool:
+    self._led_levels = {}
+    self._trigger_levels = {}
+    return self._connected
+
+  def WTQReadPPGLedCalibrationSetting(self, channelNo: Any, level: Any) -> bool:
+    _contents(level, ctypes.c_ubyte).value = self._led_levels.get(_value(channelNo), 128)
+    return self._connected
+
+  def WTQWritePPGLedCalibrationSetting(self, channelNo: Any, level: Any) -> bool:
+    self._led_levels[_value(channelNo)] = _value(level)
+    return self._connected
+
+  def WTQReadPPGTriggerLevelCalibrationSetting(self, channelNo: Any, level: Any) -> bool:
+    _contents(level, ctypes.c_ubyte).value = self._trigger_levels.get(_value(channelNo), 128)
+    return self._connected
+
+  def WTQWritePPGTriggerLevelCalibrationSetting(self, channelNo: Any, level: Any) -> bool:
+    self._trigger_levels[_value(channelNo)] = _value(level)
+    return self._connected
@@ -0,0 +1,140 @@
+"""Snapshots of the standalone mode slots of the device.
+
+  The device stores one setting per standalone mode slot (Main, A, B and C),
+  played when the device runs without a host. A slot holds a mode type and
+  the waveforms of that type, e.g. an ECG and a PPG waveform and the PTT peak
+  difference of a PWV slot:
+
+    slots = client.read_standalone()
+    profile = [standalone.StandaloneSlot(structures.StandaloneMode.A, structures.ModeType.ECG,
+                                         (presets.registry['ecg_1hz'].create(),))]
+    written = client.apply_standalone(profile, current=slots)
+
+  Slots are compared by their bytes, so applying a profile only writes the
+  slots which differ.
+"""
+import ctypes
+
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple, Type
+
+from aecg100 import structures
+
+_ECG = structures.ECGWaveform
+_PPG = structures.PPGWaveForm
+
+
+class _SlotFormat(NamedTuple):
+  """The SDK functions and the waveforms of a mode type."""
+  name: str
+  has_ptt: bool
+  waveform_types: Tuple[Type[structures.StructBase], ...]
+
+  @property
+  def read_function(self) -> str:
+    return f'WTQRead{self.name}FromStandaloneMode'
+
+  @property
+  def write_function(self) -> str:
+    return f'WTQWrite{self.name}ToStandaloneMode'
+
+
+_FORMATS = {
+    structures.ModeType.ECG: _SlotFormat('ECGMode', False, (_ECG,)),
+    structures.ModeType.PWV: _SlotFormat('PWVMode', True, (_ECG, _PPG)),
+    structures.ModeType.PWV2: _SlotFormat('PWVModeEx', True, (_ECG, _PPG, _PPG)),
+    structures.ModeType.PWV3: _SlotFormat('PWVModePPG3', True, (_ECG, _PPG, _PPG, _PPG)),
+    structures.ModeType.SPO2: _SlotFormat('SPO2Mode', False, (_PPG, _PPG)),
+    structures.ModeType.SPO23: _SlotFormat('SPO2ModePPG3', False, (_PPG, _PPG, _PPG)),
+    structures.ModeType.PPG1: _SlotFormat('PPGMode', False, (_PPG,)),
+    structures.ModeType.PPG2: _SlotFormat('PPGModeEx', False, (_PPG, _PPG)),
+    structures.ModeType.PPG3: _SlotFormat('PPGModePPG3', False, (_PPG, _PPG, _PPG)),
+}
+
+
+class StandaloneSlot(NamedTuple):
+  """The setting of a standalone mode slot.
+
+  Attributes:
+    mode: the slot.
+    mode_type: the type of the setting.
+    waveforms: the ECG waveform first if the type has one, then the PPG
+      waveforms by channel.
+    diff_ptt_peak: the difference of the ECG and PPG peaks in ms of the PWV
+      types, None for the others.
+  """
+  mode: structures.StandaloneMode
+  mode_type: structures.ModeType
+  waveforms: Tuple[structures.StructBase, ...]
+  diff_ptt_peak: Optional[int] = None
+
+  def key(self) -> Tuple[int, Optional[int], Tuple[bytes, ...]]:
+    """The bytes the slot is compared by."""
+    return self.mode_type, self.diff_ptt_peak, tuple(bytes(waveform) for waveform in self.waveforms)
+
+  def differs(self, other: Optional['StandaloneSlot']) -> bool:
+    """Whether writing the slot changes the ``other`` setting."""
+    return other is None or self.key() != other.key()
+
+
+def _format(mode_type: int) -> _SlotFormat:
+  try:
+    return _FORMATS[structures.ModeType(mode_type)]
+  except ValueError:
+    raise RuntimeError(f'unknown standalone mode type {mode_type}') from None
+
+
+def _check(status: int, action: str, mode: structures.StandaloneMode) -> None:
+  if status != structures.Status.OK:
+    try:
+      reason = structures.Status(status).name
+    except ValueError:
+      reason = f'status {status}'
+    raise RuntimeError(f'Failed to {action} the standalone mode {mode.name}: {reason}')
+
+
+def read_slot(handle: Any, mode: structures.StandaloneMode) -> StandaloneSlot:
+  """Reads a slot through the SDK handle.
+
+  Raises:
+    RuntimeError: the SDK failed to read the slot.
+  """
+  mode = structures.StandaloneMode(mode)
+  mode_type = handle.WTQReadStandaloneModeType(mode)
+  slot_format = _format(mode_type)
+  waveforms = tuple(waveform_type() for waveform_type in slot_format.waveform_types)
+  if slot_format.has_ptt:
+    ptt = ctypes.c_int()
+    status = getattr(handle, slot_format.read_function)(mode, ctypes.byref(ptt), *waveforms)
+    diff_ptt_peak = ptt.value
+  else:
+    status = getattr(handle, slot_format.read_function)(mode, *waveforms)
+    diff_ptt_peak = None
+  _check(status, 'read', mode)
+  return StandaloneSlot(mode, structures.ModeType(mode_type), waveforms, diff_ptt_peak)
+
+
+def write_slot(handle: Any, slot: StandaloneSlot) -> None:
+  """Writes a slot through the SDK handle.
+
+  Raises:
+    ValueError: the waveforms do not match the mode type.
+    RuntimeError: the SDK failed to write the slot.
+  """
+  slot_format = _format(slot.mode_type)
+  if tuple(type(waveform) for waveform in slot.waveforms) != slot_format.waveform_types:
+    raise ValueError(f'a {slot.mode_type.name} slot holds the waveforms '
+                     f'{[waveform_type.__name__ for waveform_type in slot_format.waveform_types]}')
+  if slot_format.has_ptt != (slot.diff_ptt_peak is not None):
+    raise ValueError(f'diff_ptt_peak is {"required" if slot_format.has_ptt else "invalid"} in a '
+                     f'{slot.mode_type.name} slot')
+
+  mode = structures.StandaloneMode(slot.mode)
+  args = (slot.diff_ptt_peak,) if slot_format.has_ptt else ()
+  status = getattr(handle, slot_format.write_function)(mode, *args, *slot.waveforms)
+  _check(status, 'write', mode)
+
+
+def changed_slots(profile: Sequence[StandaloneSlot],
+                  current: Dict[structures.StandaloneMode, StandaloneSlot]) -> Sequence[StandaloneSlot]:
+  """Returns the slots of the profile which differ from the current ones."""
+  return [slot for slot in profile if slot.differs(current.get(slot.mode))]
@@ -0,0 +1,170 @@
+"""Incremental statistics of run-length encoded sampling data.
+
+  The SDK reports PD sampling data as (data, number) pairs. ``SamplingStats``
+  updates its sums and a histogram of the [0, 1023] range from each pair
+  directly, in constant time whatever ``number`` is, so it can run in the
+  SDK callback for hours. Snapshots are taken from any thread while the
+  capture goes on:
+
+    capture = client.start_sampling(structures.PPGSampling.Channel1PD, statistics=True, window=1000)
+    snapshot = capture.stats[structures.PPGSampling.Channel1PD].snapshot()
+    print(snapshot.mean, snapshot.percentile(95))
+"""
+import bisect
+import collections
+import itertools
+import math
+import time
+
+from typing import Deque, List, NamedTuple, Optional, Sequence, Tuple
+
+# The number of histogram bins, one per PD sampling value.
+HISTOGRAM_BINS = 1024
+
+
+class StatsSnapshot(NamedTuple):
+  """The statistics of the samples in the window at one point in time.
+
+  Values outside [0, 1023] are counted in the first or last histogram bin, so
+  the minimum, maximum and percentiles are clamped to that range while the
+  mean and variance are exact.
+
+  Attributes:
+    count: the number of samples in the window.
+    total_samples: the number of samples pushed since the start or reset.
+    mean: the mean of the window, NaN if it is empty.
+    variance: the population variance of the window, NaN if it is empty.
+    minimum: the smallest value of the window, None if it is empty.
+    maximum: the largest value of the window, None if it is empty.
+    histogram: the number of samples of each value in the window.
+  """
+  count: int
+  total_samples: int
+  mean: float
+  variance: float
+  minimum: Optional[int]
+  maximum: Optional[int]
+  histogram: Sequence[int]
+
+  @property
+  def std(self) -> float:
+    return math.sqrt(self.variance)
+
+  def percentile(self, q: float) -> Optional[int]:
+    """Returns the nearest-rank percentile, None if the window is empty.
+
+    Args:
+      q: the percentile, from 0 to 100.
+    """
+    return self.percentiles(q)[0]
+
+  def percentiles(self, *qs: float) -> List[Optional[int]]:
+    """Returns several nearest-rank percentiles, accumulating the histogram once."""
+    if any(not 0 <= q <= 100 for q in qs):
+      raise ValueError('the percentile must be in [0, 100]')
+    if not self.count:
+      return [None] * len(qs)
+    cumulative = list(itertools.accumulate(self.histogram))
+    return [bisect.bisect_left(cumulative, max(1, math.ceil(q / 100 * self.count))) for q in qs]
+
+
+class SamplingStats:
+  """The statistics of the last ``window`` samples of a sampling mode.
+
+  ``push`` is the SDK SamplingCallback. Every pair updates integer sums and
+  the histogram, and the oldest pairs are dropped once the window is full,
+  so the cost per pair is amortized constant.
+
+  Like ``sampling.SamplingRing`` there is no lock: ``push`` is the only
+  writer and makes a version counter odd while it updates; ``snapshot``
+  copies the state and retries if the version changed meanwhile.
+
+  Attributes:
+    window: the number of samples the statistics cover, None for all of
+      them.
+  """
+
+  def __init__(self, window: Optional[int] = None):
+    if window is not None and window <= 0:
+      raise ValueError('the window must be positive')
+    self.window = window
+    self._version = 0
+    self._reset = False
+    self._clear()
+
+  def _clear(self) -> None:
+    # The (value, bin, number) of the pairs in the window, oldest first.
+    self._runs: Deque[Tuple[int, int, int]] = collections.deque()
+    self._histogram = [0] * HISTOGRAM_BINS
+    self._count = 0
+    self._total = 0
+    self._sum = 0
+    self._sum_squares = 0
+
+  def push(self, data: int, number: int) -> None:
+    """Adds ``number`` samples of value ``data``."""
+    if number <= 0:
+      return
+    bin_ = data if 0 <= data < HISTOGRAM_BINS else (0 if data < 0 else HISTOGRAM_BINS - 1)
+    window = self.window
+    self._version += 1
+    if self._reset:
+      self._reset = False
+      self._clear()
+    self._total += number
+    if window is not None:
+      # Only the end of a run longer than the window stays in it.
+      if number > window:
+        number = window
+      self._runs.append((data, bin_, number))
+    self._histogram[bin_] += number
+    self._count += number
+    self._sum += data * number
+    self._sum_squares += data * data * number
+    if window is not None and self._count > window:
+      self._evict(self._count - window)
+    self._version += 1
+
+  def _evict(self, excess: int) -> None:
+    runs = self._runs
+    histogram = self._histogram
+    while excess:
+      value, bin_, number = runs[0]
+      dropped = number if number < excess else excess
+      if dropped == number:
+        runs.popleft()
+      else:
+        runs[0] = (value, bin_, number - dropped)
+      histogram[bin_] -= dropped
+      self._count -= dropped
+      self._sum -= value * dropped
+      self._sum_squares -= value * value * dropped
+      excess -= dropped
+
+  def reset(self) -> None:
+    """Drops all samples; done by the next ``push`` if sampling goes on."""
+    self._reset = True
+
+  def snapshot(self) -> StatsSnapshot:
+    """Returns the current statistics; safe to call from any thread."""
+    while True:
+      version = self._version
+      if not version & 1:
+        histogram = self._histogram[:]
+        count, total, total_sum, sum_squares = self._count, self._total, self._sum, self._sum_squares
+        if self._version == version:
+          break
+      # Gives the GIL back to the interrupted push.
+      time.sleep(0)
+
+    if self._reset:
+      return StatsSnapshot(0, 0, math.nan, math.nan, None, None, tuple([0] * HISTOGRAM_BINS))
+    if not count:
+      return StatsSnapshot(0, total, math.nan, math.nan, None, None, tuple(histogram))
+    # The bins of the extremes are found from both ends of the histogram.
+    minimum = next(value for value, number in enumerate(histogram) if number)
+    maximum = HISTOGRAM_BINS - 1 - next(value for value, number in enumerate(reversed(histogram)) if number)
+    mean = total_sum / count
+    # Exact in integers, then divided once.
+    variance = (sum_squares * count - total_sum * total_sum) / (count * count)
+    return StatsSnapshot(count, total, mean, variance, minimum, maximum, tuple(histogram))
@@ -0,0 +1,257 @@
+"""Chunked raw data playback for recordings larger than memory."""
+import ctypes
+import functools
+import logging
+import threading
+
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from aecg100 import buffers, structures
+
+logger = logging.getLogger('aecg100')
+
+# The last OutputSignalCallback of an output carries INT_MIN as its data.
+OUTPUT_END = -2147483647 - 1
+
+# A chunk is a pair of AC and DC samples of equal length.
+Chunk = Tuple[Any, Any]
+
+
+class RawStream:
+  """Plays raw data chunks through two alternating fixed-size segments.
+
+  While one segment is played by the SDK the other one is filled from the
+  chunk iterator; the played samples are counted in the OutputSignalCallback
+  and the next segment is output once the current one is finished. Only the
+  two segments are allocated, whatever the length of the recording.
+
+  The SDK has no queue of raw data: the next segment can only be output once
+  the current one is finished, and replaces it. So the output is continuous
+  within a segment, but every swap has a gap of one callback and one SDK call;
+  larger segments make fewer gaps.
+
+  Every output segment has its own callback tagged with a generation, so a
+  late call for a segment already replaced does not end the current one.
+
+  Attributes:
+    sample_rate: the sampling frequency in Hz.
+    segment_size: the number of samples of each segment.
+    samples_played: the number of samples output so far.
+  """
+
+  def __init__(self,
+               output: Callable[[structures.RawData], Any],
+               sample_rate: float,
+               chunks: Iterable[Chunk],
+               segment_size: int,
+               pool: buffers.BufferPool,
+               sync_pulse: structures.SyncPulse = structures.SyncPulse.LEDOff,
+               callback: Optional[Callable[[float, int, int], Any]] = None,
+               stall_timeout: float = 2.0):
+    """Initiates the stream.
+
+    Args:
+      output: the function outputting a raw data segment through the SDK,
+        which returns whether it succeeded.
+      sample_rate: the sampling frequency in Hz.
+      chunks: an iterable of (ac, dc) sample pairs of any length.
+      segment_size: the number of samples of each segment.
+      pool: the pool providing the segment buffers.
+      sync_pulse: the sync pulse setting of the raw data.
+      callback: called with (time, ac, dc) of every output sample, then with
+        ``OUTPUT_END`` as ac and dc once the stream ends, as the SDK does at
+        the end of an output; e.g. an ``OutputRecorder``.
+      stall_timeout: the time in seconds the stream fails after if no sample
+        is output, however slow the output is.
+    """
+    if segment_size <= 0:
+      raise ValueError('the segment size must be positive')
+    if stall_timeout <= 0:
+      raise ValueError('the stall timeout must be positive')
+
+    self.sample_rate = sample_rate
+    self.segment_size = segment_size
+    self.samples_played = 0
+    self._output = output
+    self._chunks: Iterator[Chunk] = iter(chunks)
+    self._pending: Optional[Tuple[ctypes.Array, ctypes.Array, int]] = None
+    self._pool = pool
+    self._sync_pulse = sync_pulse
+    self._callback = callback
+    self._stall_timeout = stall_timeout
+    self._segments = [(pool.acquire(segment_size), pool.acquire(segment_size)) for _ in range(2)]
+    self._segment_length = 0
+    self._segment_played = 0
+    self._generation = 0
+    # The callbacks of the segments, kept alive while the SDK may call them.
+    self._signal_callbacks: List[Optional[structures.OutputSignalCallback]] = [None, None]
+    self._segment_done = threading.Event()
+    self._finished = threading.Event()
+    self._closing = False
+    self._lock = threading.Lock()
+    self._error: Optional[BaseException] = None
+    self._thread = threading.Thread(target=self._run, name='aecg100-stream', daemon=True)
+
+  def start(self) -> bool:
+    """Outputs the first segment, then feeds the SDK in a background thread.
+
+    The first segment is output before returning, so the buffers of the
+    previous output can be released once this returns True.
+
+    Returns:
+      True if a segment is output, or False if there are no samples.
+    Raises:
+      the error raised while reading the chunks or outputting the segment.
+    """
+    try:
+      size = self._fill(0)
+      started = bool(size) and self._play(0, size)
+    except Exception:
+      self._end()
+      raise
+    if not started:
+      self._end()
+      return False
+    self._thread.start()
+    return True
+
+  def _on_output(self, generation: int, time: float, ac: int, dc: int) -> None:
+    if ac == OUTPUT_END:
+      if generation == self._generation:
+        self._segment_done.set()
+      return
+
+    self.samples_played += 1
+    if self._callback is not None:
+      self._callback(time, ac, dc)
+    if generation == self._generation:
+      self._segment_played += 1
+      if self._segment_played >= self._segment_length:
+        self._segment_done.set()
+
+  def _next_chunk(self) -> Optional[Tuple[ctypes.Array, ctypes.Array, int]]:
+    if self._pending is not None:
+      pending, self._pending = self._pending, None
+      return pending
+
+    for ac, dc in self._chunks:
+      ac_array, _ = buffers.as_double_array(ac)
+      dc_array, _ = buffers.as_double_array(dc)
+      if len(ac_array) != len(dc_array):
+        raise ValueError('the number of AC and DC data is not equal')
+      if len(ac_array):
+        return ac_array, dc_array, 0
+    return None
+
+  def _fill(self, index: int) -> int:
+    """Copies the next samples into a segment, returns the number of them."""
+    ac_segment, dc_segment = self._segments[index]
+    size = 0
+    while size < self.segment_size:
+      chunk = self._next_chunk()
+      if chunk is None:
+        break
+
+      ac_array, dc_array, offset = chunk
+      count = min(len(ac_array) - offset, self.segment_size - size)
+      item_size = ctypes.sizeof(ctypes.c_double)
+      for segment, source in ((ac_segment, ac_array), (dc_segment, dc_array)):
+        ctypes.memmove(
+            ctypes.addressof(segment) + size * item_size,
+            ctypes.addressof(source) + offset * item_size, count * item_size)
+
+      size += count
+      if offset + count < len(ac_array):
+        self._pending = (ac_array, dc_array, offset + count)
+    return size
+
+  def _play(self, index: int, size: int) -> bool:
+    ac_segment, dc_segment = self._segments[index]
+    generation = self._generation + 1
+    signal_callback = structures.OutputSignalCallback(functools.partial(self._on_output, generation))
+    raw_data = structures.RawData(
+        sample_rate=self.sample_rate,
+        size=size,
+        sync_pulse=self._sync_pulse,
+        ac=ctypes.addressof(ac_segment),
+        dc=ctypes.addressof(dc_segment),
+        output_signal_callback=signal_callback)
+
+    with self._lock:
+      if self._closing:
+        return False
+      self._segment_length = size
+      self._segment_played = 0
+      self._segment_done.clear()
+      self._generation = generation
+      self._signal_callbacks[index] = signal_callback
+      if not self._output(raw_data):
+        raise RuntimeError('Failed to play the raw data segment')
+    return True
+
+  def _wait_segment(self) -> None:
+    # Only a stall fails, so a slow output, e.g. a simulated one, does not.
+    played = self.samples_played
+    while not self._segment_done.wait(self._stall_timeout):
+      if self.samples_played == played:
+        raise RuntimeError(f'no sample of the raw data segment is output in {self._stall_timeout:.1f} seconds')
+      played = self.samples_played
+
+  def _end(self) -> None:
+    try:
+      if self._callback is not None:
+        self._callback(0.0, OUTPUT_END, OUTPUT_END)
+    finally:
+      self._finished.set()
+
+  def _run(self) -> None:
+    try:
+      current = 0
+      while True:
+        next_size = self._fill(1 - current)
+        self._wait_segment()
+        current, size = 1 - current, next_size
+        if not size or not self._play(current, size):
+          break
+    except Exception as e:
+      self._error = e
+      logger.exception('raw data stream failed')
+    finally:
+      self._end()
+
+  @property
+  def is_running(self) -> bool:
+    return self._thread.is_alive()
+
+  def wait(self, timeout: Optional[float] = None) -> bool:
+    """Waits until all chunks are output.
+
+    Returns:
+      True if the stream is finished, or False if the timeout elapsed.
+    Raises:
+      the error raised while reading the chunks.
+    """
+    finished = self._finished.wait(timeout)
+    if self._error is not None:
+      raise self._error
+    return finished
+
+  def stop(self) -> None:
+    """Stops feeding the SDK; the segments are kept until ``close``."""
+    with self._lock:
+      self._closing = True
+    self._segment_done.set()
+    if self._thread.is_alive() and self._thread is not threading.current_thread():
+      self._thread.join()
+
+  def close(self) -> None:
+    """Stops feeding the SDK and returns the segments to the pool.
+
+    The SDK must have stopped reading the segments, i.e. the output is
+    stopped or replaced.
+    """
+    self.stop()
+    for segment in self._segments:
+      for samples in segment:
+        self._pool.release(samples)
+    self._segments = []
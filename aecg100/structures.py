@@ -10,7 +10,10 @@ import enum
 
 from typing import Any, Dict
 
+ConnectedCallback = ctypes.CFUNCTYPE(None, ctypes.c_bool)
 OutputSignalCallback = ctypes.CFUNCTYPE(None, ctypes.c_double, ctypes.c_int, ctypes.c_int)
+SamplingCallback = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_int)
+SamplingErrorCallback = ctypes.CFUNCTYPE(None, ctypes.c_int)
 
 
 #
@@ -122,6 +125,59 @@ class PPGSampling(enum.IntEnum):
   Max = 4
 
 
+@enum.unique
+class SamplingError(enum.IntEnum):
+  Channel1PDPacketLost = 0x10
+  Channel1SwitchPacketLost = 0x11
+  Channel2PDPacketLost = 0x12
+  Channel2SwitchPacketLost = 0x13
+
+
+@enum.unique
+class StandaloneMode(enum.IntEnum):
+  Main = 0
+  A = 1
+  B = 2
+  C = 3
+
+
+@enum.unique
+class ModeType(enum.IntEnum):
+  ECG = 1
+  PWV = 2
+  SPO2 = 3
+  PPG1 = 4
+  PPG2 = 5
+  PWV2 = 6
+  PWV3 = 7
+  SPO23 = 8
+  PPG3 = 9
+
+
+@enum.unique
+class Status(enum.IntEnum):
+  OK = 0
+  DeviceNotConnected = 1
+  DeviceError = 2
+  InvalidParameter = 3
+  InvalidModeType = 4
+
+
+@enum.unique
+class LEDTriggerMode(enum.IntEnum):
+  One = 0
+  Multi = 1
+
+
+@enum.unique
+class RawChannel(enum.IntEnum):
+  """The outputs of multi-channel raw data playback, not an SDK enum."""
+  ECG = 0
+  PPG1 = 1
+  PPG2 = 2
+  PPG3 = 3
+
+
 class StructBase(ctypes.Structure):
 
   def update(self, attributes: Dict[str, Any]):
@@ -223,9 +279,9 @@ class PPGWaveForm(StructBase):
       ('noise_frequency', ctypes.c_int),
       ('respiration_enabled', ctypes.c_int),
       ('respiration_rate', ctypes.c_int),
-      ('respiration_variation', ctypes.c_int),
+      ('respiration_variation', ctypes.c_double),
       ('respiration_in_exhale_ratio', ctypes.c_int),
-      ('reserved', ctypes.c_char * 16),
+      ('reserved', ctypes.c_char * 12),
   ]
 
 
@@ -258,3 +314,21 @@ class RawData(StructBase):
       ('dc', ctypes.c_void_p),
       ('output_signal_callback', OutputSignalCallback),
   ]
+
+
+class LEDPulseSetting(StructBase):
+  _fields_ = [
+      ('led_pulse', ctypes.c_ubyte),
+      ('reserved', ctypes.c_ubyte),
+      ('pulse_period', ctypes.c_ushort),
+      ('pulse_width', ctypes.c_ushort),
+  ]
+
+
+class LEDPulseGroupSetting(StructBase):
+  _fields_ = [
+      ('trigger_mode', ctypes.c_int),
+      # The burst period in the multi trigger mode, a union in the SDK.
+      ('pulse_group_interval', ctypes.c_ushort),
+      ('led_pulse', LEDPulseSetting * 8),
+  ]
@@ -0,0 +1,250 @@
+"""ECG and PPG raw data synthesized from the SDK waveform parameters.
+
+  The samples are generated with NumPy from ``ECGWaveform`` and
+  ``PPGWaveForm`` structures, e.g. built from ``presets``, so morphologies
+  the hardware generator does not support can be derived from known
+  parameters and played as raw data:
+
+    ac, dc = synth.ecg(waveform, duration=10)
+    client.play_ecg_rawdata(synth.SAMPLE_RATE, ac, dc, True)
+
+  Passing a sequence of structures synthesizes all of them at once; the
+  result has one row per structure and each row can be played without
+  copying. The values are in uV, the unit of the raw data.
+
+  The shapes approximate the device generator: waves are raised cosines
+  placed by the interval fields, and the respiration, which the device
+  outputs as an impedance change for ECG, modulates the amplitude.
+"""
+import math
+
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+from aecg100 import buffers, structures
+
+numpy = buffers.import_numpy('aecg100.synth')
+
+# The default sampling frequency in Hz.
+SAMPLE_RATE = 1000
+
+# The frequencies in Hz of the noise settings, 0 for none.
+_ECG_NOISE_FREQUENCIES = {
+    structures.ECGNoiseFrequency.FrequencyOff: 0,
+    structures.ECGNoiseFrequency.Frequency50Hz: 50,
+    structures.ECGNoiseFrequency.Frequency60Hz: 60,
+    structures.ECGNoiseFrequency.Frequency100Hz: 100,
+    structures.ECGNoiseFrequency.Frequency120Hz: 120,
+}
+_PPG_NOISE_FREQUENCIES = {
+    structures.PPGNoiseFrequency.FrequencyOff: 0,
+    structures.PPGNoiseFrequency.Frequency50Hz: 50,
+    structures.PPGNoiseFrequency.Frequency60Hz: 60,
+    structures.PPGNoiseFrequency.Frequency1KHz: 1000,
+    structures.PPGNoiseFrequency.Frequency5KHz: 5000,
+    structures.PPGNoiseFrequency.Frequency100Hz: 100,
+    structures.PPGNoiseFrequency.Frequency120Hz: 120,
+    structures.PPGNoiseFrequency.FrequencyWhiteNoise: -1,
+}
+
+# The mV to uV factor of raw data.
+_UV = 1000.0
+
+Waveforms = Union[structures.StructBase, Sequence[structures.StructBase]]
+
+
+def _params(waveforms: Sequence[structures.StructBase], names: Sequence[str]) -> Dict[str, numpy.ndarray]:
+  """Returns the fields as (n, 1) arrays, to broadcast over the samples."""
+  return {name: numpy.array([getattr(w, name) for w in waveforms], dtype=numpy.float64)[:, None] for name in names}
+
+
+def _period(params: Dict[str, numpy.ndarray]) -> numpy.ndarray:
+  """The beat period in ms, from the frequency or else the time period."""
+  frequency = params['frequency']
+  return numpy.where(frequency > 0, 1000.0 / numpy.where(frequency > 0, frequency, 1), params['time_period'])
+
+
+def _bump(t: numpy.ndarray, start: Any, width: Any) -> numpy.ndarray:
+  """A raised cosine of height 1 over [start, start + width)."""
+  width = numpy.maximum(width, 1e-9)
+  x = (t - start) / width
+  return numpy.where((x >= 0) & (x < 1), 0.5 - 0.5 * numpy.cos(2 * math.pi * x), 0.0)
+
+
+def _ease(x: numpy.ndarray) -> numpy.ndarray:
+  """A smooth step from 0 to 1 over x in [0, 1]."""
+  return 0.5 - 0.5 * numpy.cos(math.pi * numpy.clip(x, 0, 1))
+
+
+def _periodic(waveform_type: numpy.ndarray, phase: numpy.ndarray, t: numpy.ndarray,
+              pulse_width: Any) -> numpy.ndarray:
+  """The basic shapes of height 1 shared by ECG and PPG, by type value."""
+  return numpy.select([
+      waveform_type == structures.ECGWaveformType.Sine,
+      waveform_type == structures.ECGWaveformType.Triangle,
+      waveform_type == structures.ECGWaveformType.Square,
+      waveform_type == structures.ECGWaveformType.RectanglePulse,
+      waveform_type == structures.ECGWaveformType.TrianglePulse,
+      waveform_type == structures.ECGWaveformType.Exponential,
+  ], [
+      numpy.sin(2 * math.pi * phase),
+      1 - 4 * numpy.abs(phase - 0.5),
+      numpy.where(phase < 0.5, 1.0, -1.0),
+      numpy.where(t < pulse_width, 1.0, 0.0),
+      numpy.where(t < pulse_width, 1 - numpy.abs(2 * t / numpy.maximum(pulse_width, 1e-9) - 1), 0.0),
+      numpy.where(t < pulse_width, numpy.exp(-5 * t / numpy.maximum(pulse_width, 1e-9)), 0.0),
+  ], 0.0)
+
+
+def _respiration(t_ms: numpy.ndarray, rate: numpy.ndarray, ratio: numpy.ndarray) -> numpy.ndarray:
+  """A breathing cycle in [-1, 1]: rising while inhaling, then exhaling."""
+  period = 60000.0 / numpy.maximum(rate, 1e-9)
+  inhale = period / (1 + numpy.maximum(ratio, 1))
+  t = numpy.mod(t_ms, period)
+  return numpy.where(t < inhale, 2 * _ease(t / inhale) - 1, 1 - 2 * _ease((t - inhale) / (period - inhale)))
+
+
+def _noise(t_ms: numpy.ndarray, amplitude: numpy.ndarray, frequency: numpy.ndarray,
+           rng: numpy.random.Generator) -> numpy.ndarray:
+  tone = amplitude * numpy.sin(2 * math.pi * frequency * t_ms / 1000)
+  white = numpy.where(frequency < 0, amplitude * numpy.clip(rng.standard_normal(t_ms.shape) / 3, -1, 1), 0.0)
+  return numpy.where(frequency > 0, tone, 0.0) + white
+
+
+def _prepare(waveforms: Waveforms, struct_type: type, duration: Optional[float], beats: Optional[int],
+             sample_rate: float, names: Sequence[str]) -> Tuple[bool, Dict[str, numpy.ndarray], numpy.ndarray]:
+  single = isinstance(waveforms, struct_type)
+  if single:
+    waveforms = [waveforms]
+  if not waveforms:
+    raise ValueError('no waveform is given')
+  params = _params(waveforms, names)
+  params['period'] = _period(params)
+  if (duration is None) == (beats is None):
+    raise ValueError('either the duration or the number of beats must be given')
+  if duration is None:
+    duration = beats * float(params['period'].max()) / 1000
+  t = numpy.arange(int(round(duration * sample_rate)), dtype=numpy.float64) * (1000.0 / sample_rate)
+  return single, params, t[None, :]
+
+
+def _result(single: bool, ac: numpy.ndarray, dc: numpy.ndarray) -> Tuple[numpy.ndarray, numpy.ndarray]:
+  ac = numpy.ascontiguousarray(ac, dtype=numpy.float64)
+  dc = numpy.ascontiguousarray(numpy.broadcast_to(dc, ac.shape), dtype=numpy.float64)
+  if single:
+    return ac[0], dc[0]
+  return ac, dc
+
+
+def ecg(waveforms: Waveforms,
+        duration: Optional[float] = None,
+        beats: Optional[int] = None,
+        sample_rate: float = SAMPLE_RATE,
+        seed: Optional[int] = None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+  """Synthesizes ECG raw data.
+
+  The ECG type uses frequency, amplitude (R wave), p_wave, t_wave,
+  st_segment, pr_interval, qrs_duration, t_duration and qt_interval; the
+  other types use frequency, amplitude and pulse_width. Noise, pacing,
+  respiration and the dc_offset are added for all types.
+
+  Args:
+    waveforms: an ECGWaveform, or a sequence of them to synthesize at once.
+    duration: the number of seconds to synthesize.
+    beats: the number of beats to synthesize instead, of the longest period.
+    sample_rate: the sampling frequency in Hz.
+    seed: the seed of the white noise.
+  Returns:
+    the AC and DC arrays in uV, of one row per waveform for a sequence.
+  """
+  single, p, t = _prepare(waveforms, structures.ECGWaveform, duration, beats, sample_rate, [
+      'waveform_type', 'frequency', 'amplitude', 't_wave', 'p_wave', 'st_segment', 'dc_offset', 'time_period',
+      'pr_interval', 'qrs_duration', 't_duration', 'qt_interval', 'pulse_width', 'noise_amplitude', 'noise_frequency',
+      'pacing_enabled', 'pacing_amplitude', 'pacing_duration', 'pacing_rate', 'respiration_enabled',
+      'respiration_amplitude', 'respiration_rate', 'respiration_ratio', 'respiration_baseline'
+  ])
+  rng = numpy.random.default_rng(seed)
+  beat = numpy.mod(t, p['period'])
+
+  # The beat starts with the P wave, the QRS complex starts after the PR
+  # interval and the T wave ends the QT interval.
+  qrs_start = p['pr_interval']
+  qrs = p['qrs_duration']
+  qrs_end = qrs_start + qrs
+  t_end = qrs_start + p['qt_interval']
+  t_start = numpy.maximum(t_end - p['t_duration'], qrs_end)
+  complex_ = (-0.15 * _bump(beat, qrs_start, qrs * 0.3) + _bump(beat, qrs_start + qrs * 0.2, qrs * 0.5) -
+              0.25 * _bump(beat, qrs_start + qrs * 0.65, qrs * 0.35))
+  pqrst = (p['p_wave'] * _bump(beat, 0, p['pr_interval'] * 0.6) + p['amplitude'] * complex_ + p['st_segment'] *
+           ((beat >= qrs_end) & (beat < t_start)) + p['t_wave'] * _bump(beat, t_start, t_end - t_start))
+  other = p['amplitude'] * _periodic(p['waveform_type'], beat / p['period'], beat, p['pulse_width'])
+  ac = numpy.where(p['waveform_type'] == structures.ECGWaveformType.ECG, pqrst, other)
+
+  # The relative impedance change of the respiration modulates the signal.
+  depth = p['respiration_amplitude'] / numpy.maximum(p['respiration_baseline'] * 1000, 1e-9)
+  respiration = 1 + depth * _respiration(t, p['respiration_rate'], p['respiration_ratio'])
+  ac = numpy.where(p['respiration_enabled'] != 0, ac * respiration, ac)
+
+  pacing_period = 60000.0 / numpy.maximum(p['pacing_rate'], 1e-9)
+  pacing = numpy.where(numpy.mod(t, pacing_period) < p['pacing_duration'], p['pacing_amplitude'], 0.0)
+  ac = ac + numpy.where(p['pacing_enabled'] != 0, pacing, 0.0)
+
+  noise_frequency = numpy.vectorize(lambda v: _ECG_NOISE_FREQUENCIES.get(int(v), 0))(p['noise_frequency'])
+  ac = ac + _noise(t, p['noise_amplitude'], noise_frequency, rng)
+  return _result(single, ac * _UV, p['dc_offset'] * _UV)
+
+
+def ppg(waveforms: Waveforms,
+        duration: Optional[float] = None,
+        beats: Optional[int] = None,
+        sample_rate: float = SAMPLE_RATE,
+        seed: Optional[int] = None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+  """Synthesizes PPG raw data.
+
+  The PPG type rises to vol_sp at time_sp, falls to the dicrotic notch
+  vol_dn at time_dn, rises to vol_dp at time_dp and decays until the end of
+  the period; the other types use vol_sp as their amplitude. The ac_offset,
+  noise, respiration variation and inversion are applied to all types, and
+  vol_dc is the DC data.
+
+  Args:
+    waveforms: a PPGWaveForm, or a sequence of them to synthesize at once.
+    duration: the number of seconds to synthesize.
+    beats: the number of beats to synthesize instead, of the longest period.
+    sample_rate: the sampling frequency in Hz.
+    seed: the seed of the white noise.
+  Returns:
+    the AC and DC arrays in uV, of one row per waveform for a sequence.
+  """
+  single, p, t = _prepare(waveforms, structures.PPGWaveForm, duration, beats, sample_rate, [
+      'waveform_type', 'frequency', 'vol_dc', 'vol_sp', 'vol_dn', 'vol_dp', 'ac_offset', 'time_sp', 'time_dn',
+      'time_dp', 'time_period', 'inverted', 'noise_amplitude', 'noise_frequency', 'respiration_enabled',
+      'respiration_rate', 'respiration_variation', 'respiration_in_exhale_ratio'
+  ])
+  rng = numpy.random.default_rng(seed)
+  period = p['period']
+  beat = numpy.mod(t, period)
+
+  # The keypoints are scaled with the period when the frequency differs from
+  # the one of time_period.
+  scale = period / numpy.where(p['time_period'] > 0, p['time_period'], period)
+  keys = [(numpy.zeros_like(period), numpy.zeros_like(period)), (p['time_sp'] * scale, p['vol_sp']),
+          (p['time_dn'] * scale, p['vol_dn']), (p['time_dp'] * scale, p['vol_dp']), (period, numpy.zeros_like(period))]
+  pulse = numpy.zeros(numpy.broadcast_shapes(beat.shape, period.shape))
+  for (start, low), (end, high) in zip(keys, keys[1:]):
+    inside = (beat >= start) & (beat < end)
+    value = low + (high - low) * _ease((beat - start) / numpy.maximum(end - start, 1e-9))
+    pulse = numpy.where(inside, value, pulse)
+
+  ppg_type = p['waveform_type'] == structures.PPGWaveformType.PPG
+  # The PPG types Sine, Triangle and Square share the ECG type values.
+  other = p['vol_sp'] * _periodic(p['waveform_type'], beat / period, beat, 0)
+  ac = numpy.where(ppg_type, pulse, other)
+
+  variation = p['respiration_variation'] / 100 * _respiration(t, p['respiration_rate'],
+                                                              p['respiration_in_exhale_ratio'])
+  ac = numpy.where(p['respiration_enabled'] != 0, ac * (1 + variation), ac)
+  ac = numpy.where(p['inverted'] != 0, -ac, ac) + p['ac_offset']
+
+  noise_frequency = numpy.vectorize(lambda v: _PPG_NOISE_FREQUENCIES.get(int(v), 0))(p['noise_frequency'])
+  ac = ac + _noise(t, p['noise_amplitude'], noise_frequency, rng)
+  return _result(single, ac * _UV, p['vol_dc'] * _UV)
@@ -0,0 +1,434 @@
+"""Benchmarks of the Python binding hot paths.
+
+  The client runs against a stand-in SDK, so only the cost of the binding is
+  measured: ``stub_sdk.c`` is compiled into a library whose functions return
+  at once, or the simulated SDK is used when no C compiler is available. The
+  results are written as JSON and can be compared with a previous run:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare baseline.json --threshold 0.2
+"""
+import argparse
+import array
+import json
+import logging
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aecg100  # NOQA: E402
+from aecg100 import container, presets, rawfile, recording, sampling, simulator, streaming, structures  # NOQA: E402
+
+_STUB_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stub_sdk.c')
+
+# The units whose larger values are better, used to detect regressions.
+_THROUGHPUT_UNITS = ('samples/s', 'calls/s')
+
+
+def build_stub(directory: str) -> Optional[str]:
+  """Compiles the stub SDK, returns its path or None without a compiler."""
+  compiler = os.environ.get('CC') or shutil.which('cc') or shutil.which('gcc')
+  if compiler is None:
+    return None
+
+  path = os.path.join(directory, 'libaecg100_stub.so')
+  try:
+    subprocess.run([compiler, '-O2', '-shared', '-fPIC', '-o', path, _STUB_SOURCE], check=True)
+  except (OSError, subprocess.CalledProcessError) as e:
+    print(f'cannot build the stub SDK: {e}', file=sys.stderr)
+    return None
+  return path
+
+
+def new_sdk(stub_path: Optional[str]) -> Any:
+  if stub_path is not None:
+    return stub_path
+  return simulator.SimulatedSdk(time_scale=math.inf)
+
+
+class Runner:
+  """Times the benchmarks and collects their results."""
+
+  def __init__(self, quick: bool):
+    self.quick = quick
+    self.min_time = 0.05 if quick else 0.5
+    self.repeat = 3 if quick else 5
+    self.results: List[Dict[str, Any]] = []
+
+  def time_per_call(self, func: Callable[[], Any]) -> float:
+    """Returns the best time in seconds of one call of ``func``."""
+    number = 1
+    while True:
+      start = time.perf_counter()
+      for _ in range(number):
+        func()
+      elapsed = time.perf_counter() - start
+      if elapsed >= self.min_time / 10 or number >= 1 << 20:
+        break
+      number *= 10
+
+    best = elapsed / number
+    for _ in range(self.repeat - 1):
+      start = time.perf_counter()
+      for _ in range(number):
+        func()
+      best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+  def add(self, name: str, value: float, unit: str, **params: Any) -> None:
+    self.results.append({'name': name, 'params': params, 'value': value, 'unit': unit})
+    label = ' '.join(f'{key}={value}' for key, value in params.items())
+    print(f'{name:<28} {label:<40} {value:>16.6g} {unit}')
+
+
+def bench_call_overhead(runner: Runner, client: aecg100.Aecg100Client) -> None:
+  """The per-call overhead of the client methods."""
+  ecg = structures.ECGWaveform(waveform_type=structures.ECGWaveformType.ECG, frequency=1.0, amplitude=1.0)
+  ppg = structures.PPGWaveForm(waveform_type=structures.PPGWaveformType.PPG, frequency=1.0, vol_dc=100.0)
+  ecg_scan = structures.ECGFrequencyScan(amplitude=1.0, frequency_start=0.5, frequency_finish=40.0, duration=10)
+  ppg_scan = structures.PPGFrequencyScan(amplitude=1.0, dc=100.0, frequency_start=0.5, frequency_finish=40.0,
+                                         duration=10)
+  samples = array.array('d', bytes(8 * 16))
+  channel = structures.PPGChannel.Channel1
+  sync_pulse = structures.SyncPulse.Off
+
+  methods = {
+      'play_ecg_waveform': lambda: client.play_ecg_waveform(ecg),
+      'play_ppg_waveform': lambda: client.play_ppg_waveform((channel, ppg)),
+      'play_ecg_ppg_waveform': lambda: client.play_ecg_ppg_waveform(0, ecg, ppg),
+      'play_ecg_rawdata': lambda: client.play_ecg_rawdata(1000, samples, samples, False),
+      'play_ppg_rawdata': lambda: client.play_ppg_rawdata(channel, 1000, samples, samples, sync_pulse, False),
+      'scan_ecg_frequency': lambda: client.scan_ecg_frequency(ecg_scan),
+      'scan_ppg_frequency': lambda: client.scan_ppg_frequency(ppg_scan),
+      'stop': client.stop,
+      'set_electrode': lambda: client.set_electrode(structures.Electrode.RightArm),
+      'enable_pacing': lambda: client.enable_pacing(False),
+      'module_info': lambda: client.module_info,
+      'ppg_module_info': lambda: client.ppg_module_info,
+      'device_info': lambda: client.device_info,
+      'ppg_device_info': lambda: client.ppg_device_info,
+  }
+  for method, func in methods.items():
+    runner.add('call_overhead', runner.time_per_call(func) * 1e9, 'ns/call', method=method)
+  client.stop()
+
+
+def bench_prototypes(runner: Runner, stub_path: Optional[str]) -> None:
+  """The SDK call cost without the generated prototypes and with them.
+
+  Without prototypes the structures are passed through ``ctypes.pointer`` and
+  every argument goes through the generic conversion, like the binding did
+  before ``aecg100.prototypes``.
+  """
+  if stub_path is None:
+    return
+  import ctypes
+
+  from aecg100 import base
+
+  bare = ctypes.CDLL(stub_path)
+  library = base._SdkLibrary(stub_path)
+  ecg = structures.ECGWaveform()
+  ppg = structures.PPGWaveForm()
+  raw = structures.RawData()
+  no_callback = structures.OutputSignalCallback(0)
+  calls = {
+      'WTQOutputECG': (lambda: bare.WTQOutputECG(ctypes.pointer(ecg), None),
+                       lambda: library.WTQOutputECG(ecg, no_callback)),
+      'WTQOutputPPGEx': (lambda: bare.WTQOutputPPGEx(ctypes.pointer(ppg), ctypes.pointer(ppg), None, None),
+                         lambda: library.WTQOutputPPGEx(ppg, ppg, no_callback, no_callback)),
+      'WTQWaveformPlayerOutputECG': (lambda: bare.WTQWaveformPlayerOutputECG(ctypes.pointer(raw)),
+                                     lambda: library.WTQWaveformPlayerOutputECG(raw)),
+      'WTQWaveformPlayerLoop': (lambda: bare.WTQWaveformPlayerLoop(ctypes.c_bool(False)),
+                                lambda: library.WTQWaveformPlayerLoop(False)),
+      'WTQConnect': (lambda: bare.WTQConnect(0, 15000), lambda: library.WTQConnect(0, 15000)),
+  }
+  for function, (legacy, prototyped) in calls.items():
+    runner.add('sdk_call', runner.time_per_call(legacy) * 1e9, 'ns/call', function=function, binding='legacy')
+    runner.add('sdk_call', runner.time_per_call(prototyped) * 1e9, 'ns/call', function=function, binding='prototyped')
+
+
+def bench_marshalling(runner: Runner, client: aecg100.Aecg100Client) -> None:
+  """The raw data throughput of play_ecg_rawdata versus the samples type."""
+  try:
+    import numpy
+  except ImportError:
+    numpy = None
+
+  sizes = (1000, 100000) if runner.quick else (1000, 10000, 100000, 1000000)
+  for size in sizes:
+    sources = {
+        'list': lambda: [0.0] * size,
+        'array': lambda: array.array('d', bytes(8 * size)),
+    }
+    if numpy is not None:
+      sources['numpy'] = lambda: numpy.zeros(size)
+      sources['numpy_float32'] = lambda: numpy.zeros(size, dtype=numpy.float32)
+
+    for kind, source in sources.items():
+      ac, dc = source(), source()
+      elapsed = runner.time_per_call(lambda: client.play_ecg_rawdata(1000, ac, dc, False))
+      runner.add('rawdata_marshalling', size / elapsed, 'samples/s', kind=kind, size=size)
+  client.stop()
+
+
+def bench_structures(runner: Runner) -> None:
+  """The cost of StructBase.update and dump."""
+  for struct_type in (structures.ECGWaveform, structures.PPGWaveForm, structures.ModelInformation):
+    struct = struct_type()
+    attributes = {name: value for name, value in struct.dump().items() if not isinstance(value, str)}
+    runner.add('struct_update', runner.time_per_call(lambda: struct.update(attributes)) * 1e9, 'ns/op',
+               struct=struct_type.__name__)
+    runner.add('struct_dump', runner.time_per_call(struct.dump) * 1e9, 'ns/op', struct=struct_type.__name__)
+
+  for name in ('ecg_1hz', 'ppg_60bpm'):
+    preset = presets.registry[name]
+    runner.add('preset_create', runner.time_per_call(lambda: preset.create(frequency=2)) * 1e9, 'ns/op', preset=name)
+
+
+def bench_resampling(runner: Runner) -> None:
+  """The throughput of the resampling modes."""
+  try:
+    from aecg100 import resample
+  except ImportError:
+    return
+
+  import numpy
+
+  samples = numpy.random.default_rng(0).standard_normal(36000 if runner.quick else 360000)
+  for mode in (resample.POLYPHASE, resample.LINEAR):
+    for source_rate, target_rate in ((360, 1000), (250, 1000), (2000, 1000)):
+      elapsed = runner.time_per_call(lambda: resample.resample(samples, source_rate, target_rate, mode))
+      runner.add('resample', samples.size / elapsed, 'samples/s', mode=mode, source=source_rate, target=target_rate)
+
+
+def bench_latency(runner: Runner) -> None:
+  """The throughput of the closed-loop latency measurement."""
+  try:
+    from aecg100 import latency
+  except ImportError:
+    return
+
+  import numpy
+
+  rng = numpy.random.default_rng(0)
+  size = 1 << 20 if runner.quick else 1 << 23
+  emitted = rng.standard_normal(size)
+  captured = numpy.concatenate([numpy.zeros(37), emitted[:-37]]) + 0.1 * rng.standard_normal(size)
+  for max_delay in (0.1, 1.0):
+    elapsed = runner.time_per_call(lambda: latency.measure_latency(emitted, captured, 1000, max_delay=max_delay))
+    runner.add('latency', size / elapsed, 'samples/s', max_delay=max_delay, size=size)
+
+
+def bench_container(runner: Runner) -> None:
+  """The cost of seeking into a container against parsing the text format."""
+  size = 100000 if runner.quick else 1000000
+  samples = array.array('d', (math.sin(i / 100) for i in range(size)))
+  zeros = array.array('d', bytes(size * 8))
+  with tempfile.TemporaryDirectory() as directory:
+    text_path = os.path.join(directory, 'raw.txt')
+    with open(text_path, 'w') as fp:
+      fp.write(f'1000\n{size}\n1\nECG\n')
+      fp.write('\n'.join(map(repr, samples)))
+    runner.add('rawfile_parse', runner.time_per_call(lambda: rawfile.parse(text_path)) * 1e3, 'ms/op', samples=size)
+
+    for compression in (container.NONE, container.ZLIB):
+      path = os.path.join(directory, f'raw{compression}{container.SUFFIX}')
+      with container.ContainerWriter(path, 1000, [container.Channel('ECG')], compression=compression) as writer:
+        writer.write([(samples, zeros)])
+
+      def seek() -> None:
+        with container.ContainerReader(path) as reader:
+          next(reader.chunks(start=reader.duration * 0.9))
+
+      runner.add('container_seek', runner.time_per_call(seek) * 1e6, 'us/op', samples=size, compression=compression)
+
+
+def _emitters(client: aecg100.Aecg100Client) -> Tuple[Callable[[Any, int], None], Callable[[Any, int], None]]:
+  """Returns functions invoking a callback ``count`` times from C code.
+
+  The stub SDK has its own loops; otherwise the callbacks are invoked through
+  their C function pointer from Python, which adds the Python loop.
+  """
+  handle = client.handle
+  if not isinstance(handle, simulator.SimulatedSdk):
+    return (lambda callback, count: handle.BenchEmitOutput(callback, count),
+            lambda callback, count: handle.BenchEmitSampling(callback, count, 1))
+
+  def emit_output(callback: Any, count: int) -> None:
+    for i in range(count):
+      callback(i / 1000, i, 0)
+
+  def emit_sampling(callback: Any, count: int) -> None:
+    for i in range(count):
+      callback(i & 1023, 1)
+
+  return emit_output, emit_sampling
+
+
+def bench_callbacks(runner: Runner, client: aecg100.Aecg100Client) -> None:
+  """The callback throughput of the SDK threads into Python."""
+  emit_output, emit_sampling = _emitters(client)
+  count = 20000 if runner.quick else 200000
+
+  def measure(emit: Callable[[Any, int], None], callback: Any) -> float:
+    start = time.perf_counter()
+    emit(callback, count)
+    return count / (time.perf_counter() - start)
+
+  noop = structures.OutputSignalCallback(lambda time, ac, dc: None)
+  runner.add('output_callback', measure(emit_output, noop), 'calls/s', handler='noop')
+
+  # The callback of a segment longer than the emitted samples, so the stream
+  # keeps counting them in the same segment.
+  outputs = []
+  samples = array.array('d', bytes(8 * (count + 1)))
+  stream = streaming.RawStream(lambda raw_data: outputs.append(raw_data) or True, 1000, [(samples, samples)], count + 1,
+                               client.buffer_pool)
+  stream.start()
+  stream_callback = outputs[0].output_signal_callback
+  runner.add('output_callback', measure(emit_output, stream_callback), 'calls/s', handler='raw_stream')
+  stream.close()
+
+  recorder = recording.OutputRecorder(lambda block: None, block_size=4096)
+  runner.add('output_callback', measure(emit_output, recorder.callback), 'calls/s', handler='recorder')
+  recorder.close()
+  runner.add('output_callback_drop', recorder.dropped_samples / count, 'ratio', handler='recorder')
+
+  ring = sampling.SamplingRing(count)
+  runner.add('sampling_callback', measure(emit_sampling, structures.SamplingCallback(ring.push)), 'calls/s',
+             handler='ring')
+  capture = sampling.SamplingCapture([structures.PPGSampling.Channel1PD], count, statistics=True, window=1000)
+  runner.add('sampling_callback', measure(emit_sampling, capture.callbacks[structures.PPGSampling.Channel1PD]),
+             'calls/s', handler='ring_stats')
+
+  # A burst into a small ring read by a concurrent consumer, as when the
+  # consumer is late: the drop ratio shows how much headroom the ring has.
+  ring = sampling.SamplingRing(4096)
+  done = threading.Event()
+
+  def consume() -> None:
+    while not done.is_set() or ring.available:
+      if ring.available:
+        ring.read()
+      else:
+        time.sleep(0.001)
+
+  consumer = threading.Thread(target=consume)
+  consumer.start()
+  emit_sampling(structures.SamplingCallback(ring.push), count)
+  done.set()
+  consumer.join()
+  runner.add('sampling_burst_drop', ring.dropped_samples / ring.total_samples, 'ratio', capacity=ring.capacity,
+             samples=count)
+
+
+def bench_connection(runner: Runner, stub_path: Optional[str]) -> None:
+  """The connect/disconnect cycle time."""
+  backends = {'simulator': simulator.SimulatedSdk(time_scale=math.inf)}
+  if stub_path is not None:
+    backends['stub'] = stub_path
+
+  for backend, sdk in backends.items():
+    client = aecg100.Aecg100Client(sdk)
+    cycles = 3 if runner.quick else 10
+    best = math.inf
+    for _ in range(cycles):
+      start = time.perf_counter()
+      client.connect()
+      client.disconnect()
+      best = min(best, time.perf_counter() - start)
+    runner.add('connect_cycle', best * 1e3, 'ms', backend=backend)
+
+
+def compare(report: Dict[str, Any], baseline_path: str, threshold: float) -> List[str]:
+  """Returns the descriptions of the results worse than the baseline."""
+  with open(baseline_path) as f:
+    baseline_report = json.load(f)
+  if baseline_report['meta']['backend'] != report['meta']['backend']:
+    print(f'warning: the baseline ran on the {baseline_report["meta"]["backend"]} backend', file=sys.stderr)
+  baseline = {(r['name'], json.dumps(r['params'], sort_keys=True)): r for r in baseline_report['results']}
+
+  regressions = []
+  for result in report['results']:
+    previous = baseline.get((result['name'], json.dumps(result['params'], sort_keys=True)))
+    if previous is None or not previous['value'] or previous['unit'] != result['unit']:
+      continue
+
+    change = result['value'] / previous['value'] - 1
+    if result['unit'] in _THROUGHPUT_UNITS:
+      change = -change
+    if result['unit'] != 'ratio' and change > threshold:
+      regressions.append(f'{result["name"]} {result["params"]}: {previous["value"]:.6g} -> '
+                         f'{result["value"]:.6g} {result["unit"]} ({change:+.0%})')
+  return regressions
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--output', help='the JSON file to write the results to')
+  parser.add_argument('--quick', action='store_true', help='run shorter benchmarks')
+  parser.add_argument('--compare', help='the JSON results of a previous run to compare with')
+  parser.add_argument('--threshold', type=float, default=0.2, help='the tolerated slowdown, 0.2 means 20%%')
+  parser.add_argument('--simulator', action='store_true', help='use the simulated SDK instead of the stub')
+  args = parser.parse_args()
+  # Messages logged by the hot paths, e.g. by streams, would flood the output.
+  logging.getLogger('aecg100').setLevel(logging.ERROR)
+
+  runner = Runner(args.quick)
+  with tempfile.TemporaryDirectory() as directory:
+    stub_path = None if args.simulator else build_stub(directory)
+    backend = 'stub' if stub_path is not None else 'simulator'
+    print(f'backend: {backend}')
+
+    client = aecg100.Aecg100Client(new_sdk(stub_path))
+    client.connect()
+    try:
+      bench_call_overhead(runner, client)
+      bench_prototypes(runner, stub_path)
+      bench_marshalling(runner, client)
+      bench_structures(runner)
+      bench_resampling(runner)
+      bench_latency(runner)
+      bench_container(runner)
+      bench_callbacks(runner, client)
+    finally:
+      client.disconnect()
+    bench_connection(runner, stub_path)
+
+  report = {
+      'meta': {
+          'backend': backend,
+          'python': platform.python_version(),
+          'implementation': platform.python_implementation(),
+          'machine': platform.machine(),
+          'platform': platform.platform(),
+          'quick': args.quick,
+          'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+      },
+      'results': runner.results,
+  }
+  if args.output:
+    with open(args.output, 'w') as f:
+      json.dump(report, f, indent=2)
+
+  if args.compare:
+    regressions = compare(report, args.compare, args.threshold)
+    for regression in regressions:
+      print(f'regression: {regression}')
+    return 1 if regressions else 0
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
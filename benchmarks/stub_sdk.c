@@ -0,0 +1,133 @@
+/*
+ * A stand-in of the AECG100 SDK library for benchmarking the Python binding.
+ *
+ * Every WTQ* entry point of sdk/AECG100.h returns immediately with success,
+ * so the measured time is the cost of the Python layer and of the ctypes
+ * calls. The Bench* functions invoke the callbacks from C like the SDK
+ * threads do.
+ */
+#include <stdbool.h>
+#include <stddef.h>
+
+typedef void (*ConnectedCallback)(bool connected);
+typedef void (*OutputSignalCallback)(double time, int ac, int dc);
+typedef void (*SamplingCallback)(int data, int number);
+
+static ConnectedCallback connected_callback = NULL;
+static char serial_number[] = "WAE0100-200001";
+static char ppg_serial_number[] = "WAP0205-200001";
+
+/* Initialization & Cleanup */
+bool WTQInit(ConnectedCallback cb) {
+  connected_callback = cb;
+  if (cb) {
+    cb(true);
+  }
+  return true;
+}
+
+bool WTQConnect(unsigned int portNumber, unsigned int millisecondsTimeout) { return true; }
+
+void WTQFree(void) {
+  ConnectedCallback cb = connected_callback;
+  connected_callback = NULL;
+  if (cb) {
+    cb(false);
+  }
+}
+
+/* Device Configurations */
+bool WTQGetDeviceInformation(void *modelInfo) { return true; }
+char *WTQGetSerialNumber(void) { return serial_number; }
+bool WTQGetPPGDeviceInformation(void *modelInfo) { return true; }
+char *WTQGetPPGSerialNumber(void) { return ppg_serial_number; }
+bool WTQGetHWInformation(void *hwInfo) { return true; }
+bool WTQGetPPGHWInformation(void *hwInfo) { return true; }
+unsigned int WTQGetVersion(void) { return 0x01000108; }
+
+/* PPG Module Sampling */
+bool WTQEnableSampling(int mode, SamplingCallback cb) { return true; }
+bool WTQStartSampling(void *cb) { return true; }
+void WTQDisableSampling(void) {}
+bool WTQEnableRLD(bool enable) { return true; }
+bool WTQReadRLD(double *n1, double *n2) { return true; }
+
+/* Signal Output Control */
+bool WTQDeviceEnableImpedance(int impedance) { return true; }
+bool WTQDeviceSetElectrode(int electrode) { return true; }
+bool WTQDeviceSetDCOffset(int dcOffset) { return true; }
+bool WTQDeviceEnablePacing(int pacing) { return true; }
+bool WTQDeviceEnableRespiration(int respiration) { return true; }
+bool WTQReadLEDPulseGroupSetting(void *setting) { return true; }
+bool WTQWriteLEDPulseGroupSetting(void *setting) { return true; }
+bool WTQOutputECG(void *waveform, void *cb) { return true; }
+bool WTQOutputECGAndPPG(int ptt, void *ecg, void *ppg, void *cb_ecg, void *cb_ppg) { return true; }
+bool WTQOutputECGAndPPGEx(int ptt, void *ecg, void *ppg1, void *ppg2, void *cb_ecg, void *cb1, void *cb2) {
+  return true;
+}
+bool WTQOutputECGAndPPG3(int ptt, void *ecg, void *ppg1, void *ppg2, void *ppg3, void *cb_ecg, void *cb1, void *cb2,
+                         void *cb3) {
+  return true;
+}
+bool WTQOutputPPG(int channel, void *waveform, void *cb) { return true; }
+bool WTQOutputPPGEx(void *ppg1, void *ppg2, void *cb1, void *cb2) { return true; }
+bool WTQOutputPPG3(void *ppg1, void *ppg2, void *ppg3, void *cb1, void *cb2, void *cb3) { return true; }
+bool WTQOutputFrequencyScan(void *scan, void *cb) { return true; }
+bool WTQOutputFrequencyScanPPG(int channel, void *scan, void *cb) { return true; }
+
+/* Play Raw Data */
+bool WTQWaveformPlayerOutputECG(void *data) { return true; }
+bool WTQWaveformPlayerOutputECGAndPPG(void *ecg, int channel, void *ppg) { return true; }
+bool WTQWaveformPlayerOutputECGAndPPGEx(void *ecg, void *ppg1, void *ppg2) { return true; }
+bool WTQWaveformPlayerOutputECGAndPPG3(void *ecg, void *ppg1, void *ppg2, void *ppg3) { return true; }
+bool WTQWaveformPlayerOutputPPG(int channel, void *data) { return true; }
+bool WTQWaveformPlayerOutputPPGEx(void *ppg1, void *ppg2) { return true; }
+bool WTQWaveformPlayerOutputPPG3(void *ppg1, void *ppg2, void *ppg3) { return true; }
+void WTQWaveformPlayerLoop(bool loop) {}
+void WTQStopOutputWaveform(void) {}
+void WTQStopPlayRawData(void) {}
+
+/* Standalone Mode Setting Control */
+int WTQReadStandaloneModeType(int mode) { return 1; }
+int WTQReadECGModeFromStandaloneMode(int mode, void *ecg) { return 0; }
+int WTQWriteECGModeToStandaloneMode(int mode, void *ecg) { return 0; }
+int WTQReadPWVModeFromStandaloneMode(int mode, int *ptt, void *ecg, void *ppg) { return 0; }
+int WTQWritePWVModeToStandaloneMode(int mode, int ptt, void *ecg, void *ppg) { return 0; }
+int WTQReadPWVModeExFromStandaloneMode(int mode, int *ptt, void *ecg, void *ppg1, void *ppg2) { return 0; }
+int WTQWritePWVModeExToStandaloneMode(int mode, int ptt, void *ecg, void *ppg1, void *ppg2) { return 0; }
+int WTQReadPWVModePPG3FromStandaloneMode(int mode, int *ptt, void *ecg, void *ppg1, void *ppg2, void *ppg3) {
+  return 0;
+}
+int WTQWritePWVModePPG3ToStandaloneMode(int mode, int ptt, void *ecg, void *ppg1, void *ppg2, void *ppg3) {
+  return 0;
+}
+int WTQReadSPO2ModeFromStandaloneMode(int mode, void *ppg1, void *ppg2) { return 0; }
+int WTQWriteSPO2ModeToStandaloneMode(int mode, void *ppg1, void *ppg2) { return 0; }
+int WTQReadSPO2ModePPG3FromStandaloneMode(int mode, void *ppg1, void *ppg2, void *ppg3) { return 0; }
+int WTQWriteSPO2ModePPG3ToStandaloneMode(int mode, void *ppg1, void *ppg2, void *ppg3) { return 0; }
+int WTQReadPPGModeFromStandaloneMode(int mode, void *ppg) { return 0; }
+int WTQWritePPGModeToStandaloneMode(int mode, void *ppg) { return 0; }
+int WTQReadPPGModeExFromStandaloneMode(int mode, void *ppg1, void *ppg2) { return 0; }
+int WTQWritePPGModeExToStandaloneMode(int mode, void *ppg1, void *ppg2) { return 0; }
+int WTQReadPPGModePPG3FromStandaloneMode(int mode, void *ppg1, void *ppg2, void *ppg3) { return 0; }
+int WTQWritePPGModePPG3ToStandaloneMode(int mode, void *ppg1, void *ppg2, void *ppg3) { return 0; }
+
+/* PPG calibration */
+bool WTQRestoreFactorySetting(void) { return true; }
+bool WTQReadPPGLedCalibrationSetting(int channel, unsigned char *level) { return true; }
+bool WTQWritePPGLedCalibrationSetting(int channel, unsigned char level) { return true; }
+bool WTQReadPPGTriggerLevelCalibrationSetting(int channel, unsigned char *level) { return true; }
+bool WTQWritePPGTriggerLevelCalibrationSetting(int channel, unsigned char level) { return true; }
+
+/* Benchmark helpers, invoking the callbacks from C */
+void BenchEmitOutput(OutputSignalCallback cb, int count) {
+  for (int i = 0; i < count; i++) {
+    cb(i / 1000.0, i, 0);
+  }
+}
+
+void BenchEmitSampling(SamplingCallback cb, int count, int number) {
+  for (int i = 0; i < count; i++) {
+    cb(i & 1023, number);
+  }
+}
@@ -1,21 +1,13 @@
+import array
 import ctypes
-import platform
 import time
 
 import aecg100
 
 
 def get_aecg_client():
-  if platform.machine() == 'aarch64':
-    client = aecg100.Aecg100Client("sdk/libaecgrpix64.so")
-  elif platform.machine() == 'armv7l':
-    client = aecg100.Aecg100Client("sdk/libaecgrpix86.so")
-  elif platform.machine() == 'x86_64':
-    client = aecg100.Aecg100Client("sdk/libaecgx64.so")
-  else:
-    client = aecg100.Aecg100Client("sdk/libaecgx86.so")
-
-  return client
+  # The SDK library bundled for platform.machine() is loaded on first use.
+  return aecg100.Aecg100Client()
 
 
 def test_get_main_module_model_information(client: aecg100.Aecg100Client):
@@ -199,20 +191,16 @@ def test_output_ecg_frequency_scan(aecg: aecg100.Aecg100Client):
           'frequency_finish': 150,
           'duration': 30,
       })
-  aecg.scan_ecg_frequency(scan)
-  time.sleep(30)
-  aecg.stop()
+  aecg.scan_ecg_frequency(scan).wait()
 
 
 def test_ecg_play_raw(aecg: aecg100.Aecg100Client):
   print('ecg play raw (1Hz, 5mV)...')
-  with open('ecg-1hz-5mv.txt') as fp:
-    data = fp.readlines()
-  sample_rate = int(data[0])
-  ac = [float(d) for d in data[4:]]
-  dc = [0] * len(ac)
+  raw = aecg100.rawfile.load('ecg-1hz-5mv.txt')
+  ac = raw.channel(0)
+  dc = array.array('d', bytes(ac.nbytes))
 
-  aecg.play_ecg_rawdata(sample_rate, ac, dc, True)
+  aecg.play_ecg_rawdata(int(raw.sample_rate), ac, dc, True)
   time.sleep(10)
   aecg.stop()
 
@@ -304,6 +292,18 @@ def test_output_ppg60bpm_noise(aecg: aecg100.Aecg100Client):
   aecg.stop()
 
 
+def test_ppg_pd_sampling(aecg: aecg100.Aecg100Client):
+  print('ppg channel-1 pd sampling...')
+  capture = aecg.start_sampling(aecg100.structures.PPGSampling.Channel1PD)
+  ring = capture[aecg100.structures.PPGSampling.Channel1PD]
+  for _ in range(10):
+    time.sleep(1)
+    samples = ring.read_samples()
+    if len(samples):
+      print(f'ppg channel-1 pd sampling average: {samples.mean()}')
+  aecg.stop_sampling()
+
+
 def test_output_ppg_frequency_scan(aecg: aecg100.Aecg100Client):
   print('output PPG frequency scan (1Hz-30Hz, 30sec) ...')
   scan = aecg100.structures.PPGFrequencyScan(
@@ -315,9 +315,7 @@ def test_output_ppg_frequency_scan(aecg: aecg100.Aecg100Client):
           'frequency_finish': 30,
           'duration': 30,
       })
-  aecg.scan_ppg_frequency(scan)
-  time.sleep(30)
-  aecg.stop()
+  aecg.scan_ppg_frequency(scan).wait()
 
 
 def test_ppg_play_raw(aecg: aecg100.Aecg100Client):
@@ -469,6 +467,7 @@ if __name__ == '__main__':
       test_output_ppg60bpm,
       test_output_ppg60bpm_ac_offset_added,
       test_output_ppg60bpm_noise,
+      test_ppg_pd_sampling,
       test_output_ppg_frequency_scan,
       test_ppg_play_raw,
       test_output_pwtt60bpm,
@@ -13,5 +13,10 @@ if __name__ == "__main__":
     package_data={
         '': ['sdk/*.so', 'sdk/*.h', 'sample/python/*.txt']       
     },
+    # NumPy is only needed by the synthesis, resampling and latency modules
+    # and by the NumPy views of sampled and recorded data.
+    extras_require={
+        'numpy': ['numpy>=1.20'],
+    },
 )
 
@@ -0,0 +1,40 @@
+import asyncio
+import inspect
+
+from aecg100 import Aecg100Client, aio, simulator, streaming, structures
+
+
+def test_wrappers_keep_signatures():
+  method = aio.AsyncAecg100Client.play_ecg_rawdata
+  assert asyncio.iscoroutinefunction(method)
+  assert method.__doc__ == Aecg100Client.play_ecg_rawdata.__doc__
+  assert inspect.signature(method) == inspect.signature(Aecg100Client.play_ecg_rawdata)
+
+
+def test_output_signals_drop_when_full():
+
+  async def collect():
+    signals = aio.OutputSignals(asyncio.get_running_loop(), maxsize=3)
+    for index in range(5):
+      signals._on_output(float(index), index, 0)
+    signals._on_output(5.0, streaming.OUTPUT_END, 0)
+    return [sample async for sample in signals], signals.dropped_samples
+
+  samples, dropped = asyncio.run(collect())
+  assert [ac for _, ac, _ in samples] == [0, 1, 2] and dropped == 2
+
+
+def test_sampling_batches_end_on_stop():
+
+  async def collect():
+    async with aio.AsyncAecg100Client(simulator.SimulatedSdk()) as client:
+      await client.connect(0, 5)
+      await client.start_sampling(structures.PPGSampling.Channel1PD)
+      total = 0
+      async for _, number in client.sampling_batches(structures.PPGSampling.Channel1PD):
+        total += int(number.sum())
+        if total >= 50:
+          await client.stop_sampling()
+      return total
+
+  assert asyncio.run(asyncio.wait_for(collect(), 10)) >= 50
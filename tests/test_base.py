@@ -0,0 +1,131 @@
+import array
+import math
+import subprocess
+import sys
+import time
+
+import pytest
+
+from aecg100 import Aecg100Client, base, simulator
+
+
+class _RecordingSdk(simulator.SimulatedSdk):
+
+  def __init__(self, events):
+    super().__init__(time_scale=math.inf)
+    self.events = events
+
+  def WTQStopPlayRawData(self):
+    self.events.append('WTQStopPlayRawData')
+    super().WTQStopPlayRawData()
+
+  def WTQStopOutputWaveform(self):
+    self.events.append('WTQStopOutputWaveform')
+    super().WTQStopOutputWaveform()
+
+
+def _client(events):
+  client = Aecg100Client(_RecordingSdk(events))
+  client.connect(0, 5)
+  release = client.buffer_pool.release
+
+  def record_release(samples):
+    events.append('release')
+    release(samples)
+
+  client.buffer_pool.release = record_release
+  return client
+
+
+def test_stop_raw_data_before_releasing_buffers():
+  events = []
+  client = _client(events)
+  try:
+    client.play_ecg_rawdata(1000, [1.0] * 100, [0.0] * 100, True)
+    client.stop()
+    assert 'WTQStopPlayRawData' in events and 'release' in events
+    assert events.index('WTQStopPlayRawData') < events.index('release')
+  finally:
+    client.disconnect()
+
+
+def test_stop_stream_before_releasing_segments():
+  events = []
+  client = _client(events)
+  try:
+    samples = array.array('d', [1.0] * 100)
+    client.play_ecg_stream(1000, [(samples, samples)] * 100, segment_size=64)
+    client.stop()
+    assert events.index('WTQStopPlayRawData') < events.index('release')
+  finally:
+    client.disconnect()
+
+
+def test_stop_waveform_without_raw_data_stop():
+  events = []
+  client = _client(events)
+  try:
+    client.stop()
+    assert events == ['WTQStopOutputWaveform']
+  finally:
+    client.disconnect()
+
+
+def test_disconnection_event_clears_connected():
+  client = Aecg100Client(simulator.SimulatedSdk(time_scale=math.inf))
+  client.connect()
+  assert client.is_connected
+  # The device is unplugged.
+  client._on_connection(False)
+  assert not client.is_connected and client.is_initialized
+  with pytest.raises(RuntimeError):
+    client.handle
+
+  client.connect()
+  assert client.is_connected
+  start = time.monotonic()
+  client.disconnect()
+  # The disconnection event is waited for instead of the fixed delay.
+  assert time.monotonic() - start < base._DISCONNECT_DELAY
+  assert not client.is_initialized
+
+
+def test_bundled_library_does_not_import_simulator():
+  code = 'import sys; from aecg100 import client; client.Aecg100Client(); assert "aecg100.simulator" not in sys.modules'
+  subprocess.run([sys.executable, '-c', code], check=True)
+
+
+class _CountingSdk(simulator.SimulatedSdk):
+
+  def __init__(self):
+    super().__init__(time_scale=math.inf)
+    self.reads = 0
+
+  def WTQGetSerialNumber(self):
+    self.reads += 1
+    return super().WTQGetSerialNumber()
+
+
+def test_info_cache_invalidation():
+  sdk = _CountingSdk()
+  client = Aecg100Client(sdk)
+  client.connect()
+  info = client.module_info
+  info['serial'] = 'changed'
+  assert client.module_info['serial'] != 'changed'
+  assert sdk.reads == 1
+
+  # A connection event, e.g. the device reconnected, drops the cache.
+  client._on_connection(True)
+  client.module_info
+  assert sdk.reads == 2
+  client.refresh_info()
+  assert sdk.reads == 3
+
+  client.disconnect()
+  client.connect(0, 5)
+  try:
+    client.module_info
+    assert sdk.reads == 4
+  finally:
+    client.disconnect()
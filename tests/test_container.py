@@ -0,0 +1,30 @@
+import array
+
+import pytest
+
+from aecg100 import container
+
+
+def _write(path, size, compression=container.NONE):
+  channels = [container.Channel('ECG'), container.Channel('PPG1', signal_type='PPG')]
+  with container.ContainerWriter(str(path), 1000, channels, block_size=4, compression=compression) as writer:
+    if size:
+      samples = array.array('d', range(size))
+      writer.write([(samples, samples), (samples, samples)])
+  return container.ContainerReader(str(path))
+
+
+@pytest.mark.parametrize('compression', [container.NONE, container.ZLIB])
+def test_read_empty_container(tmp_path, compression):
+  with _write(tmp_path / 'empty.aecg', 0, compression) as reader:
+    data = reader.read()
+    assert data.shape == (2, 2, 0) and data.nbytes == 0
+    assert list(reader.chunks()) == [] and list(reader.frames()) == []
+
+
+def test_read_empty_range(tmp_path):
+  with _write(tmp_path / 'data.aecg', 10) as reader:
+    assert reader.read(reader.duration).shape == (2, 2, 0)
+    assert reader.read(1.0).shape == (2, 2, 0)
+    assert reader.read(0.005, 0.002).shape == (2, 2, 0)
+    assert reader.read(0.002, 0.007).tolist()[1][0] == [2.0, 3.0, 4.0, 5.0, 6.0]
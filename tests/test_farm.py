@@ -0,0 +1,17 @@
+import time
+
+from aecg100 import base, farm, simulator
+
+
+def test_close_disconnects_devices_in_parallel():
+  ports = [0, 1, 2]
+  devices = farm.DeviceFarm(simulator.SDK_NAME, ports, timeout=5)
+  devices.start()
+  try:
+    assert devices.broadcast('play_ecg_rawdata', 1000, [1.0] * 10, [0.0] * 10, False) == [True] * 3
+  finally:
+    start = time.monotonic()
+    devices.close()
+  # Each worker sleeps the fixed delay after disconnecting its given port.
+  assert time.monotonic() - start < base._DISCONNECT_DELAY * len(ports)
+  assert len(devices) == 0
@@ -0,0 +1,35 @@
+import numpy
+import pytest
+
+from aecg100 import latency
+
+_RATE = 1000
+
+
+def _signal(t):
+  # Incommensurate components, so the delay is unambiguous within a second.
+  components = ((1.0, 1.3, 0.0), (0.5, 3.7, 1.0), (0.3, 7.1, 2.0))
+  return sum(amplitude * numpy.sin(2 * numpy.pi * frequency * t + phase) for amplitude, frequency, phase in components)
+
+
+@pytest.mark.parametrize('delay', [0.0, 0.0123, 0.2504, -0.031])
+def test_recovers_delay_gain_and_offset(delay):
+  t = numpy.arange(4 * _RATE) / _RATE
+  result = latency.measure_latency(_signal(t), 2.5 * _signal(t - delay) + 100.0, _RATE)
+  assert result.delay == pytest.approx(delay, abs=5e-5)
+  assert result.gain == pytest.approx(2.5, rel=1e-3)
+  assert result.offset == pytest.approx(100.0, abs=1e-2)
+  assert result.residual < 1e-2 and result.correlation > 0.999
+
+
+def test_inverted_and_resampled_capture():
+  t = numpy.arange(4 * _RATE) / _RATE
+  captured_t = numpy.arange(2 * _RATE) / (_RATE / 2)
+  result = latency.measure_latency(_signal(t), -0.5 * _signal(captured_t - 0.05), _RATE, captured_rate=_RATE / 2)
+  assert result.delay == pytest.approx(0.05, abs=1e-3)
+  assert result.gain == pytest.approx(-0.5, rel=1e-2)
+
+
+def test_constant_signal():
+  with pytest.raises(ValueError):
+    latency.measure_latency(numpy.ones(100), numpy.ones(100), _RATE)
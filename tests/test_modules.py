@@ -0,0 +1,76 @@
+import array
+import ctypes
+import math
+
+import pytest
+
+from aecg100 import Aecg100Client, buffers, modules, simulator, structures
+
+_CHANNELS = [structures.RawChannel.ECG, structures.RawChannel.PPG1]
+
+
+def _make(data, dc=None):
+  return modules._make_raw_channels(1000, data, dc, _CHANNELS, {}, buffers.BufferPool(), structures.SyncPulse.LEDOff)
+
+
+def _samples(address, size):
+  return list((ctypes.c_double * size).from_address(address))
+
+
+def test_raw_channels_rows():
+  raw_data = _make([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+  ppg = raw_data[structures.RawChannel.PPG1]
+  assert ppg.size == 3
+  assert _samples(ppg.ac, 3) == [4.0, 5.0, 6.0]
+  assert _samples(ppg.dc, 3) == [0.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize('data', [
+    [[1.0, 2.0, 3.0], [4.0, 5.0]],
+    [[1.0, 2.0], [3.0, 4.0, 5.0]],
+    [[1.0, 2.0, 3.0], []],
+])
+def test_raw_channels_ragged_rows(data):
+  with pytest.raises(ValueError):
+    _make(data)
+
+
+@pytest.mark.parametrize('dc', [
+    [[0.5, 0.5, 0.5], [0.5, 0.5]],
+    [[0.5, 0.5], [0.5, 0.5], [0.5, 0.5]],
+    array.array('d', [0.5] * 4),
+])
+def test_raw_channels_mismatched_dc(dc):
+  with pytest.raises(ValueError):
+    _make([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]], dc)
+
+
+def test_raw_channels_mismatched_rows():
+  with pytest.raises(ValueError):
+    _make([[1.0, 2.0, 3.0]])
+
+
+def test_play_rawdata_reports_copies():
+  client = Aecg100Client(simulator.SimulatedSdk(time_scale=math.inf))
+  client.connect(0, 5)
+  try:
+    assert not client.play_ecg_rawdata(1000, array.array('d', [1.0] * 10), array.array('d', [0.0] * 10), False)
+    assert client.play_ecg_rawdata(1000, [1.0] * 10, [0.0] * 10, False)
+    rows = memoryview(array.array('d', [1.0] * 20)).cast('B').cast('d', (2, 10))
+    assert not client.play_rawdata(1000, rows, _CHANNELS)
+    assert client.play_rawdata(1000, [[1.0] * 10, [2.0] * 10], _CHANNELS)
+  finally:
+    client.disconnect()
+
+
+def test_play_rawdata_failure_releases_buffers():
+  sdk = simulator.SimulatedSdk(time_scale=math.inf)
+  sdk.WTQWaveformPlayerOutputECG = lambda data: False
+  client = Aecg100Client(sdk)
+  client.connect(0, 5)
+  try:
+    with pytest.raises(RuntimeError):
+      client.play_ecg_rawdata(1000, [1.0] * 10, [0.0] * 10, False)
+    assert client.buffer_pool.free_blocks == 2
+  finally:
+    client.disconnect()
@@ -0,0 +1,68 @@
+import math
+
+from aecg100 import Aecg100Client, output, presets, simulator, structures
+
+
+class _CountingSdk(simulator.SimulatedSdk):
+
+  def __init__(self):
+    super().__init__(time_scale=math.inf)
+    self.calls = []
+
+  def WTQOutputECG(self, waveform, cb):
+    self.calls.append('WTQOutputECG')
+    return super().WTQOutputECG(waveform, cb)
+
+  def WTQDeviceSetElectrode(self, electrode):
+    self.calls.append('WTQDeviceSetElectrode')
+    return super().WTQDeviceSetElectrode(electrode)
+
+
+def test_state_compares_waveform_bytes():
+  waveform = presets.registry['ecg_1hz'].create()
+  state = output.OutputState().with_output(ecg_waveform=waveform)
+  assert state.is_output(ecg_waveform=presets.registry['ecg_1hz'].create())
+  # The state holds a copy, so changing the waveform afterwards is seen.
+  waveform.amplitude = 2.0
+  assert not state.is_output(ecg_waveform=waveform)
+  assert not state.without_output().is_output(ecg_waveform=waveform)
+
+
+def test_client_skips_redundant_writes():
+  sdk = _CountingSdk()
+  client = Aecg100Client(sdk)
+  client.connect(0, 5)
+  try:
+    # The right arm is the default lead on connection.
+    assert not client.set_electrode(structures.Electrode.RightArm)
+    assert client.set_electrode(structures.Electrode.LeftArm)
+    assert not client.set_electrode(structures.Electrode.LeftArm)
+    assert sdk.calls == ['WTQDeviceSetElectrode']
+
+    waveform = presets.registry['ecg_1hz'].create()
+    client.play_ecg_waveform(waveform)
+    client.play_ecg_waveform(presets.registry['ecg_1hz'].create())
+    assert sdk.calls.count('WTQOutputECG') == 1
+
+    # An ECG waveform carries the lead, which becomes unknown.
+    assert client.output_state.electrode is None
+    assert client.set_electrode(structures.Electrode.LeftArm)
+    assert sdk.calls.count('WTQDeviceSetElectrode') == 2
+
+    client.stop()
+    client.play_ecg_waveform(waveform)
+    assert sdk.calls.count('WTQOutputECG') == 2
+  finally:
+    client.disconnect()
+
+
+def test_invalidated_state_reaches_device():
+  sdk = _CountingSdk()
+  client = Aecg100Client(sdk)
+  client.connect(0, 5)
+  try:
+    client.invalidate_output_state()
+    assert client.set_electrode(structures.Electrode.RightArm)
+    assert sdk.calls == ['WTQDeviceSetElectrode']
+  finally:
+    client.disconnect()
@@ -0,0 +1,69 @@
+import math
+import threading
+import time
+
+import pytest
+
+from aecg100 import Aecg100Client, playlist, simulator, structures
+
+
+class _SlowStep(playlist.Step):
+  """A step whose play call takes ``call_time`` seconds."""
+
+  def __init__(self, duration, call_time, name=None):
+    super().__init__(duration, name)
+    self.call_time = call_time
+
+  def play(self, client):
+    time.sleep(self.call_time)
+
+
+class _Client:
+
+  def __init__(self):
+    self.stopped = 0
+
+  def stop(self):
+    self.stopped += 1
+
+
+def test_step_is_abstract():
+  with pytest.raises(TypeError):
+    playlist.Step(1.0)
+
+
+def test_late_call_does_not_drift():
+  client = _Client()
+  steps = [_SlowStep(0.1, 0.03, f'step{index}') for index in range(4)]
+  timings = playlist.Scheduler(client).run(steps)
+
+  assert [timing.name for timing in timings] == ['step0', 'step1', 'step2', 'step3']
+  assert [timing.scheduled for timing in timings] == pytest.approx([0.0, 0.1, 0.2, 0.3])
+  # The deadlines follow the start of the playlist, so the call times do
+  # not add up into the lateness of the last step.
+  assert all(timing.late >= 0 for timing in timings) and timings[-1].late < 0.05
+  assert all(timing.call_time >= 0.03 for timing in timings)
+  assert client.stopped == 1
+  assert 'step3' in playlist.format_report(timings)
+
+
+def test_cancel():
+  client = _Client()
+  scheduler = playlist.Scheduler(client)
+  threading.Timer(0.05, scheduler.cancel).start()
+  timings = scheduler.run([_SlowStep(10.0, 0.0), _SlowStep(10.0, 0.0)])
+  assert len(timings) == 1 and timings[0].duration < 1.0
+  assert client.stopped == 1
+
+
+def test_steps_on_simulator():
+  client = Aecg100Client(simulator.SimulatedSdk(time_scale=math.inf))
+  client.connect(0, 5)
+  try:
+    timings = playlist.Scheduler(client).run([
+        playlist.EcgWaveform(structures.ECGWaveform(), 0.05),
+        playlist.EcgRawData(1000, [1.0] * 10, [0.0] * 10, 0.05),
+    ])
+  finally:
+    client.disconnect()
+  assert [timing.name for timing in timings] == ['EcgWaveform', 'EcgRawData']
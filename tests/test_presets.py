@@ -0,0 +1,37 @@
+import pytest
+
+from aecg100 import presets, structures
+
+
+def test_create_copies_template():
+  preset = presets.registry['ecg_1hz']
+  waveform = preset.create(amplitude=2.0)
+  assert isinstance(waveform, structures.ECGWaveform)
+  assert waveform.amplitude == 2.0 and waveform.frequency == 1
+  assert preset.create().amplitude == 1.0
+  with pytest.raises(KeyError):
+    preset.create(unknown=1)
+
+
+def test_derive_is_cached_and_interned():
+  registry = presets.PresetRegistry()
+  base = registry.register('base', structures.ECGWaveform, frequency=1, amplitude=1.0)
+  derived = base.derive(amplitude=2.0)
+  assert base.derive(amplitude=2.0) is derived
+  assert derived.values['amplitude'] == 2.0 and derived.name is None
+
+  # The same bytes built another way are the same preset.
+  assert registry.intern(structures.ECGWaveform(frequency=1, amplitude=2.0)) is derived
+  assert base.derive(amplitude=1.0) is base
+  assert base.derive('double', amplitude=2.0) is registry['double'] is derived
+
+
+def test_derive_validates():
+  registry = presets.PresetRegistry()
+  base = registry.register('base', structures.ECGWaveform, frequency=1)
+  with pytest.raises(KeyError):
+    base.derive(unknown=1)
+  with pytest.raises(ValueError):
+    base.derive(waveform_type=1000)
+  with pytest.raises(ValueError):
+    registry.register('base', structures.ECGWaveform)
@@ -0,0 +1,22 @@
+import os
+
+from aecg100 import rawfile
+
+
+def _write_text(path, samples):
+  path.write_text('\n'.join(['1000', str(len(samples)), '1', 'ECG'] + [f'{sample:.3f}' for sample in samples]) + '\n')
+  return str(path)
+
+
+def test_load_truncated_sidecar(tmp_path):
+  path = _write_text(tmp_path / 'ecg.txt', [float(i) for i in range(100)])
+  assert list(rawfile.load(path).channel(0)) == [float(i) for i in range(100)]
+  sidecar = path + rawfile.SIDECAR_SUFFIX
+  # The header is valid but half of the samples are missing.
+  with open(sidecar, 'r+b') as fp:
+    fp.truncate(os.path.getsize(sidecar) - 50 * 8)
+
+  raw = rawfile.load(path)
+  assert raw.size == 100
+  assert list(raw.channel(0)) == [float(i) for i in range(100)]
+  assert os.path.getsize(sidecar) == rawfile._DATA_OFFSET + 100 * 8
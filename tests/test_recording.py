@@ -0,0 +1,38 @@
+import math
+
+from aecg100 import Aecg100Client, recording, simulator, streaming
+
+
+def test_recorder_ends_on_int_min():
+  recorder = recording.OutputRecorder(block_size=4, max_blocks=2)
+  for index in range(6):
+    recorder.callback(index / 1000, index, -index)
+  assert not recorder.is_finished
+  recorder.callback(0.0, streaming.OUTPUT_END, streaming.OUTPUT_END)
+  assert recorder.is_finished and recorder.wait(0)
+
+  blocks = [(list(block.ac[:len(block)]), list(block.dc[:len(block)])) for block in recorder]
+  assert blocks == [([0, 1, 2, 3], [0, -1, -2, -3]), ([4, 5], [-4, -5])]
+  assert recorder.samples_recorded == 6 and recorder.dropped_samples == 0
+
+
+def test_recorder_drops_without_free_block():
+  recorder = recording.OutputRecorder(block_size=2, max_blocks=1)
+  for index in range(5):
+    recorder(0.0, index, 0)
+  recorder(0.0, streaming.OUTPUT_END, 0)
+  assert recorder.samples_recorded == 2 and recorder.dropped_samples == 3
+  recorder.close()
+
+
+def test_recorder_of_raw_data_playback():
+  blocks = []
+  recorder = recording.OutputRecorder(lambda block: blocks.append(len(block)), block_size=8)
+  client = Aecg100Client(simulator.SimulatedSdk(time_scale=math.inf))
+  client.connect(0, 5)
+  try:
+    client.play_ecg_rawdata(1000, [1.0] * 20, [0.0] * 20, False, recorder)
+    assert recorder.wait(5)
+  finally:
+    client.disconnect()
+  assert blocks == [8, 8, 4]
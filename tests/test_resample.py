@@ -0,0 +1,60 @@
+import numpy
+import pytest
+
+from aecg100 import rawfile, resample
+
+
+def _sine(rate, size, frequency=5.0):
+  return numpy.sin(2 * numpy.pi * frequency * numpy.arange(size) / rate)
+
+
+@pytest.mark.parametrize('source_rate, target_rate', [(360, 1000), (1000, 250), (500, 1000)])
+def test_polyphase_accuracy(source_rate, target_rate):
+  output = resample.resample(_sine(source_rate, 2 * source_rate), source_rate, target_rate)
+  assert output.size == 2 * target_rate
+  expected = _sine(target_rate, output.size)
+  # The edges are filtered against the zero history.
+  middle = slice(target_rate // 10, -target_rate // 10)
+  assert numpy.max(numpy.abs(output[middle] - expected[middle])) < 1e-2
+
+
+def test_linear_accuracy():
+  output = resample.resample(_sine(360, 720), 360, 1000, resample.LINEAR)
+  assert output.size == 2000
+  # The last samples hold the last input sample.
+  assert numpy.max(numpy.abs(output - _sine(1000, 2000))[:-3]) < 1e-3
+
+
+@pytest.mark.parametrize('mode', [resample.POLYPHASE, resample.LINEAR])
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 1000])
+def test_chunk_invariance(mode, chunk_size):
+  samples = numpy.random.default_rng(0).standard_normal(1000)
+  expected = resample.resample(samples, 360, 1000, mode)
+  resampler = resample.Resampler(360, 1000, mode)
+  chunks = [resampler.process(samples[offset:offset + chunk_size]) for offset in range(0, samples.size, chunk_size)]
+  output = numpy.concatenate(chunks + [resampler.flush()])
+  numpy.testing.assert_allclose(output, expected, rtol=0, atol=1e-12)
+
+
+def test_resample_file_cache(tmp_path):
+  path = tmp_path / 'ecg.txt'
+  samples = _sine(360, 360)
+  path.write_text('\n'.join(['360', '360', '1', 'ECG'] + [repr(float(sample)) for sample in samples]) + '\n')
+  cache_dir = str(tmp_path / 'cache')
+
+  raw = resample.resample_file(str(path), 1000, cache_dir=cache_dir)
+  assert (raw.sample_rate, raw.size, raw.signal_type) == (1000, 1000, 'ECG')
+  numpy.testing.assert_allclose(numpy.asarray(raw.channel(0)), resample.resample(samples, 360, 1000))
+  cached = resample.resample_file(str(path), 1000, cache_dir=cache_dir)
+  assert bytes(cached.samples) == bytes(raw.samples)
+
+
+def test_keyed_sidecar(tmp_path):
+  sidecar = str(tmp_path / 'data.aecgraw')
+  samples = numpy.arange(6, dtype='<f8')
+  raw = rawfile.write_keyed(sidecar, b'key', 100, 3, 2, 'PPG', [samples[:4].tobytes(), samples[4:].tobytes()])
+  assert list(raw.channel(1)) == [3.0, 4.0, 5.0]
+  assert list(rawfile.load_keyed(sidecar, b'key').samples) == list(samples)
+  assert rawfile.load_keyed(sidecar, b'other') is None
+  with pytest.raises(ValueError):
+    rawfile.write_keyed(sidecar, b'key', 100, 4, 2, 'PPG', [samples.tobytes()])
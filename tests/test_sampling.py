@@ -0,0 +1,33 @@
+import pytest
+
+from aecg100 import sampling, structures
+
+
+def test_ring_reads_across_wrap():
+  ring = sampling.SamplingRing(4)
+  for data in range(3):
+    ring.push(data, 1)
+  assert ring.read()[0].tolist() == [0, 1, 2]
+
+  # The next pairs are stored at the end and then at the start of the ring.
+  for data, number in ((10, 1), (11, 2), (12, 3), (13, 4)):
+    ring.push(data, number)
+  assert ring.available == 4
+  data, number = ring.read(3)
+  assert data.tolist() == [10, 11, 12] and number.tolist() == [1, 2, 3]
+  assert ring.read_samples().tolist() == [13] * 4
+  assert ring.available == 0
+
+
+def test_ring_drops_when_full():
+  ring = sampling.SamplingRing(3)
+  assert ring.capacity == 4
+  for data in range(6):
+    ring.push(data, 2)
+  assert ring.total_samples == 12 and ring.dropped_samples == 4
+  assert ring.read_samples().tolist() == [0, 0, 1, 1, 2, 2, 3, 3]
+
+
+def test_capture_rejects_max_mode():
+  with pytest.raises(ValueError):
+    sampling.SamplingCapture([structures.PPGSampling.Max])
@@ -0,0 +1,49 @@
+import math
+
+from aecg100 import Aecg100Client, scan, simulator, streaming, structures
+
+
+def _scan(duration=10, stop=lambda: None):
+  return scan.FrequencyScan(1.0, 11.0, duration, stop)
+
+
+def test_wait_for_reported_end():
+  handle = _scan()
+  assert not handle.wait(0.01) and handle.is_running
+  handle.signal_callback(0.0, 1, 0)
+  handle.signal_callback(0.0, streaming.OUTPUT_END, 0)
+  assert handle.wait(0) and handle.completed
+  assert handle.samples_output == 1
+  assert handle.progress == 1.0 and handle.frequency == 11.0
+
+
+def test_wait_without_reported_end():
+  handle = _scan(duration=0)
+  assert handle.wait(5)
+  assert not handle.is_running and not handle.completed
+
+
+def test_cancel_stops_output():
+  stops = []
+  handle = _scan(stop=lambda: stops.append(True))
+  handle.cancel()
+  # The end reported for the stop is not a completion.
+  handle.signal_callback(0.0, streaming.OUTPUT_END, 0)
+  assert handle.wait(0) and not handle.completed and stops == [True]
+  handle.cancel()
+  assert stops == [True]
+
+
+def test_scan_on_simulator():
+  client = Aecg100Client(simulator.SimulatedSdk(time_scale=math.inf))
+  client.connect(0, 5)
+  try:
+    frequency_scan = structures.ECGFrequencyScan(amplitude=1.0, frequency_start=0.5, frequency_finish=40.0,
+                                                 duration=1)
+    handle = client.scan_ecg_frequency(frequency_scan)
+    assert handle.wait(5) and handle.completed and handle.samples_output
+    handle = client.scan_ecg_frequency(frequency_scan)
+    handle.cancel()
+    assert handle.wait(0) and not handle.completed
+  finally:
+    client.disconnect()
@@ -0,0 +1,51 @@
+import math
+
+from aecg100 import Aecg100Client, presets, simulator, standalone, structures
+
+
+def _ecg_slot(mode, amplitude):
+  return standalone.StandaloneSlot(mode, structures.ModeType.ECG,
+                                   (presets.registry['ecg_1hz'].create(amplitude=amplitude),))
+
+
+def test_changed_slots():
+  current = {
+      structures.StandaloneMode.A: _ecg_slot(structures.StandaloneMode.A, 1.0),
+      structures.StandaloneMode.B: _ecg_slot(structures.StandaloneMode.B, 1.0),
+  }
+  profile = [
+      _ecg_slot(structures.StandaloneMode.A, 1.0),
+      _ecg_slot(structures.StandaloneMode.B, 2.0),
+      _ecg_slot(structures.StandaloneMode.C, 1.0),
+  ]
+  changed = standalone.changed_slots(profile, current)
+  assert [slot.mode for slot in changed] == [structures.StandaloneMode.B, structures.StandaloneMode.C]
+
+
+class _CountingSdk(simulator.SimulatedSdk):
+
+  def __init__(self):
+    super().__init__(time_scale=math.inf)
+    self.writes = []
+
+  def WTQWriteECGModeToStandaloneMode(self, mode, waveform):
+    self.writes.append(mode)
+    return super().WTQWriteECGModeToStandaloneMode(mode, waveform)
+
+
+def test_apply_writes_only_changed_slots():
+  sdk = _CountingSdk()
+  client = Aecg100Client(sdk)
+  client.connect(0, 5)
+  try:
+    profile = [_ecg_slot(structures.StandaloneMode.A, 2.0), _ecg_slot(structures.StandaloneMode.B, 3.0)]
+    assert client.apply_standalone(profile) == [structures.StandaloneMode.A, structures.StandaloneMode.B]
+    assert len(sdk.writes) == 2
+    slots = client.read_standalone()
+    assert not slots[structures.StandaloneMode.A].differs(profile[0])
+
+    profile[1] = _ecg_slot(structures.StandaloneMode.B, 4.0)
+    assert client.apply_standalone(profile, current=slots) == [structures.StandaloneMode.B]
+    assert len(sdk.writes) == 3
+  finally:
+    client.disconnect()
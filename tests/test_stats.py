@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from aecg100 import stats
+
+
+def test_percentiles():
+  samples = stats.SamplingStats()
+  for value in range(1, 101):
+    samples.push(value, 1)
+  snapshot = samples.snapshot()
+  assert snapshot.count == 100 and snapshot.mean == 50.5
+  assert snapshot.percentiles(0, 1, 50, 95, 100) == [1, 1, 50, 95, 100]
+  with pytest.raises(ValueError):
+    snapshot.percentile(101)
+
+
+def test_window_keeps_last_samples():
+  samples = stats.SamplingStats(window=5)
+  samples.push(10, 3)
+  samples.push(20, 4)
+  snapshot = samples.snapshot()
+  assert snapshot.count == 5 and snapshot.total_samples == 7
+  assert snapshot.histogram[10] == 1 and snapshot.histogram[20] == 4
+  assert snapshot.mean == 18.0 and snapshot.variance == 16.0
+  assert (snapshot.minimum, snapshot.maximum) == (10, 20)
+
+  # Only the end of a run longer than the window stays in it.
+  samples.push(30, 100)
+  snapshot = samples.snapshot()
+  assert snapshot.count == 5 and snapshot.mean == 30.0 and snapshot.variance == 0.0
+
+
+def test_values_out_of_range_are_clamped():
+  samples = stats.SamplingStats()
+  samples.push(-5, 1)
+  samples.push(2000, 1)
+  snapshot = samples.snapshot()
+  assert (snapshot.minimum, snapshot.maximum) == (0, stats.HISTOGRAM_BINS - 1)
+  assert snapshot.mean == 997.5
+
+
+def test_reset():
+  samples = stats.SamplingStats()
+  samples.push(1, 10)
+  samples.reset()
+  snapshot = samples.snapshot()
+  assert snapshot.count == 0 and math.isnan(snapshot.mean) and snapshot.percentile(50) is None
+  samples.push(2, 1)
+  assert samples.snapshot().total_samples == 1
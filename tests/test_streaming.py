@@ -0,0 +1,129 @@
+import array
+import time
+
+import pytest
+
+from aecg100 import buffers, recording, streaming
+
+
+def _chunks(total, size):
+  for start in range(0, total, size):
+    samples = array.array('d', range(start, min(start + size, total)))
+    yield samples, samples
+
+
+def _wait_for(condition, timeout=5.0):
+  deadline = time.monotonic() + timeout
+  while not condition():
+    assert time.monotonic() < deadline
+    time.sleep(0.001)
+
+
+def _output(outputs):
+
+  def output(raw_data):
+    outputs.append(raw_data)
+    return True
+
+  return output
+
+
+def _emit(raw_data, count, interval=0.0):
+  for _ in range(count):
+    raw_data.output_signal_callback(0.0, 0, 0)
+    time.sleep(interval)
+
+
+def test_stream_outputs_first_segment_on_start():
+  outputs = []
+  stream = streaming.RawStream(_output(outputs), 1000, _chunks(6, 4), 2, buffers.BufferPool())
+  assert stream.start()
+  assert len(outputs) == 1 and outputs[0].size == 2
+  stream.close()
+
+
+def test_stream_without_samples():
+  outputs = []
+  stream = streaming.RawStream(_output(outputs), 1000, (), 2, buffers.BufferPool())
+  assert not stream.start()
+  assert stream.wait(0) and not outputs
+  stream.close()
+
+
+def test_stream_ignores_end_of_replaced_segment():
+  outputs = []
+  stream = streaming.RawStream(_output(outputs), 1000, _chunks(6, 4), 2, buffers.BufferPool())
+  stream.start()
+  _emit(outputs[0], 2)
+  _wait_for(lambda: len(outputs) == 2)
+  # The end of the first segment is reported after the second one started.
+  outputs[0].output_signal_callback(0.0, streaming.OUTPUT_END, 0)
+  time.sleep(0.05)
+  assert len(outputs) == 2
+
+  _emit(outputs[1], 2)
+  _wait_for(lambda: len(outputs) == 3)
+  _emit(outputs[2], 2)
+  assert stream.wait(5)
+  assert stream.samples_played == 6
+  stream.close()
+
+
+def test_stream_outputs_next_segment_after_current_one():
+  outputs = []
+  stream = streaming.RawStream(_output(outputs), 1000, _chunks(6, 4), 3, buffers.BufferPool())
+  stream.start()
+  # The SDK has no queue, so the next segment waits for the last sample.
+  _emit(outputs[0], 2)
+  time.sleep(0.05)
+  assert len(outputs) == 1
+  _emit(outputs[0], 1)
+  _wait_for(lambda: len(outputs) == 2)
+  _emit(outputs[1], 3)
+  assert stream.wait(5)
+  stream.close()
+
+
+def test_stream_fails_without_end_of_segment():
+  outputs = []
+  stream = streaming.RawStream(_output(outputs), 1000, _chunks(6, 4), 2, buffers.BufferPool(), stall_timeout=0.1)
+  stream.start()
+  with pytest.raises(RuntimeError):
+    stream.wait(5)
+  assert len(outputs) == 1
+  stream.close()
+
+
+def test_stream_waits_for_slow_output():
+  outputs = []
+  stream = streaming.RawStream(_output(outputs), 1000, _chunks(8, 4), 4, buffers.BufferPool(), stall_timeout=0.1)
+  stream.start()
+  # The segment takes longer than the stall timeout, but samples go on.
+  _emit(outputs[0], 4, interval=0.05)
+  _wait_for(lambda: len(outputs) == 2)
+  _emit(outputs[1], 4)
+  assert stream.wait(5)
+  stream.close()
+
+
+def test_stream_finishes_recorder():
+  outputs = []
+  recorder = recording.OutputRecorder(block_size=4)
+  stream = streaming.RawStream(_output(outputs), 1000, _chunks(6, 4), 3, buffers.BufferPool(), callback=recorder)
+  stream.start()
+  _emit(outputs[0], 3)
+  _wait_for(lambda: len(outputs) == 2)
+  _emit(outputs[1], 3)
+  assert stream.wait(5) and recorder.wait(5)
+  assert [len(block) for block in recorder] == [4, 2]
+  stream.close()
+  recorder.close()
+
+
+def test_stream_fails_to_output():
+  pool = buffers.BufferPool()
+  stream = streaming.RawStream(lambda raw_data: False, 1000, _chunks(6, 4), 2, pool)
+  with pytest.raises(RuntimeError):
+    stream.start()
+  stream.close()
+  assert pool.free_blocks == 4
@@ -0,0 +1,42 @@
+import numpy
+import pytest
+
+from aecg100 import presets, structures, synth
+
+
+def test_ecg_shape_and_peak():
+  waveform = presets.registry['ecg_1hz'].create()
+  ac, dc = synth.ecg(waveform, duration=3)
+  assert ac.shape == dc.shape == (3 * synth.SAMPLE_RATE,)
+  assert ac.flags.c_contiguous and ac.dtype == numpy.float64
+  # One R wave of the amplitude in mV, given in uV, per second.
+  assert ac.max() == pytest.approx(waveform.amplitude * 1000, rel=0.05)
+  peaks = [int(numpy.argmax(ac[start:start + synth.SAMPLE_RATE])) for start in range(0, ac.size, synth.SAMPLE_RATE)]
+  assert len(set(peaks)) == 1
+
+
+def test_sequence_matches_single_waveforms():
+  ecg_1hz = presets.registry['ecg_1hz']
+  waveforms = [ecg_1hz.create(), ecg_1hz.create(amplitude=2.0)]
+  ac, dc = synth.ecg(waveforms, beats=2)
+  assert ac.shape == (2, 2 * synth.SAMPLE_RATE)
+  for row, waveform in enumerate(waveforms):
+    single_ac, single_dc = synth.ecg(waveform, beats=2)
+    numpy.testing.assert_allclose(ac[row], single_ac)
+    numpy.testing.assert_allclose(dc[row], single_dc)
+
+
+def test_ppg_inversion_and_dc():
+  waveform = presets.registry['ppg_60bpm'].create(inverted=structures.PPGInverted.Off)
+  ac, dc = synth.ppg(waveform, duration=2)
+  inverted_ac, _ = synth.ppg(presets.registry['ppg_60bpm'].create(inverted=structures.PPGInverted.On), duration=2)
+  numpy.testing.assert_allclose(inverted_ac - waveform.ac_offset * 1000, -(ac - waveform.ac_offset * 1000))
+  assert numpy.all(dc == waveform.vol_dc * 1000)
+
+
+def test_duration_or_beats():
+  waveform = presets.registry['ecg_1hz'].create()
+  with pytest.raises(ValueError):
+    synth.ecg(waveform)
+  with pytest.raises(ValueError):
+    synth.ecg(waveform, duration=1, beats=1)
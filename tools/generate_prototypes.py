@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""Generates aecg100/prototypes.py from sdk/AECG100.h.
+
+  Every WTQ* function of the header gets its restype and argtypes, callbacks
+  map to the CFUNCTYPE types and structures to the classes of
+  ``aecg100.structures``; the C layout of every structure is written too and
+  checked against those classes, which fails the generation if they differ.
+
+  Usage:
+    python tools/generate_prototypes.py           # rewrites the module
+    python tools/generate_prototypes.py --check   # fails if it is outdated
+"""
+import argparse
+import ctypes
+import os
+import re
+import sys
+
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aecg100 import structures  # NOQA: E402
+
+HEADER = os.path.join(ROOT, 'sdk', 'AECG100.h')
+OUTPUT = os.path.join(ROOT, 'aecg100', 'prototypes.py')
+
+# The C scalar types.
+SCALARS = {
+    'void': 'None',
+    'bool': 'ctypes.c_bool',
+    'char': 'ctypes.c_char',
+    'unsigned char': 'ctypes.c_ubyte',
+    'unsigned short': 'ctypes.c_ushort',
+    'int': 'ctypes.c_int',
+    'unsigned int': 'ctypes.c_uint',
+    'double': 'ctypes.c_double',
+}
+
+# The structures classes of the SDK typedefs.
+STRUCTURES = {
+    'HW_INFORMATION': 'HWInformation',
+    'MODEL_INFORMATION': 'ModelInformation',
+    'ECG_WAVEFORM': 'ECGWaveform',
+    'PPG_WAVEFORM': 'PPGWaveForm',
+    'FREQUENCY_SCAN': 'ECGFrequencyScan',
+    'FREQUENCY_SCAN2': 'PPGFrequencyScan',
+    'PLAY_RAW_DATA': 'RawData',
+    'PPG_LED_PULSE': 'LEDPulseSetting',
+    'PPG_LED_PULSE_GROUP_SETTING': 'LEDPulseGroupSetting',
+}
+
+TEMPLATE = '''"""The ctypes prototypes of the SDK functions and structures.
+
+  Generated from sdk/AECG100.h by tools/generate_prototypes.py, do not edit.
+"""
+import ctypes
+
+from aecg100 import structures
+
+# The (restype, argtypes) of every SDK function.
+PROTOTYPES = {{
+{prototypes}
+}}
+
+# The C fields of the SDK structures, (name, type) in the header order.
+LAYOUTS = {{
+{layouts}
+}}
+'''
+
+
+def strip_comments(text: str) -> str:
+  text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+  return re.sub(r'//[^\n]*', '', text)
+
+
+def normalize(ctype: str) -> str:
+  """Normalizes the spaces of a C type, e.g. ``char*`` to ``char *``."""
+  return ' '.join(ctype.replace('*', ' * ').split())
+
+
+class Header:
+  """The typedefs and functions of the SDK header."""
+
+  def __init__(self, text: str):
+    text = strip_comments(text)
+    self.callbacks = re.findall(r'typedef\s+void\s*\(\s*\*\s*(\w+)\s*\)', text)
+    self.enums = re.findall(r'typedef\s+enum\s*\{[^}]*\}\s*(\w+)\s*;', text)
+    self.structs: Dict[str, List[Tuple[str, str]]] = {}
+    for body, name in re.findall(r'typedef\s+struct\s*\{(.*?)\}\s*(\w+)\s*;', text, flags=re.S):
+      self.structs[name] = self._fields(body)
+    self.functions: Dict[str, Tuple[str, List[str]]] = {}
+    for restype, name, params in re.findall(r'WHALETEQ_API\s+([\w\s\*]+?)\s*\b(WTQ\w+)\s*\((.*?)\)\s*;', text,
+                                            flags=re.S):
+      params = [param.strip() for param in params.split(',')]
+      if params == ['void']:
+        params = []
+      self.functions[name] = (normalize(restype), [self._split(param)[0] for param in params])
+
+  @staticmethod
+  def _split(declaration: str) -> Tuple[str, str]:
+    """Splits a declaration into its type and its name."""
+    match = re.fullmatch(r'(.*?)\s*(\w+)\s*', declaration)
+    if match is None:
+      raise ValueError(f'cannot parse {declaration!r}')
+    return normalize(match.group(1)), match.group(2)
+
+  def _fields(self, body: str) -> List[Tuple[str, str]]:
+    # The members of an anonymous union have the same type, the first one
+    # stands for the union.
+    body = re.sub(r'union\s*\{\s*([^;]*;)[^}]*\}\s*;', r'\1', body, flags=re.S)
+    fields = []
+    for declaration in body.split(';'):
+      declaration = declaration.strip()
+      if not declaration:
+        continue
+      count = None
+      array = re.fullmatch(r'(.*)\[(\d+)\]', declaration)
+      if array:
+        declaration, count = array.group(1), array.group(2)
+      ctype, name = self._split(declaration)
+      fields.append((name, f'{ctype}[{count}]' if count else ctype))
+    return fields
+
+  def ctype(self, declaration: str) -> str:
+    """Returns the Python expression of the ctypes type of a C type."""
+    array = re.fullmatch(r'(.*)\[(\d+)\]', declaration)
+    if array:
+      return f'{self.ctype(array.group(1))} * {array.group(2)}'
+    if declaration == 'char *':
+      return 'ctypes.c_char_p'
+    if declaration.endswith(' *'):
+      return f'ctypes.POINTER({self.ctype(declaration[:-2])})'
+    if declaration in SCALARS:
+      return SCALARS[declaration]
+    if declaration in self.enums:
+      return 'ctypes.c_int'
+    if declaration in self.callbacks:
+      return f'structures.{declaration}'
+    if declaration in STRUCTURES:
+      return f'structures.{STRUCTURES[declaration]}'
+    raise ValueError(f'unknown C type {declaration!r}')
+
+
+def check_layouts(header: Header) -> List[str]:
+  """Returns the differences of the header and the structures classes."""
+  namespace = {'ctypes': ctypes, 'structures': structures}
+  errors = []
+  for name, fields in header.structs.items():
+    struct_type = getattr(structures, STRUCTURES[name])
+    expected = type(name, (ctypes.Structure,), {
+        '_fields_': [(field, eval(header.ctype(ctype), namespace)) for field, ctype in fields],
+    })
+    if ctypes.sizeof(expected) != ctypes.sizeof(struct_type):
+      errors.append(f'{name}: size {ctypes.sizeof(expected)} but {struct_type.__name__} has '
+                    f'{ctypes.sizeof(struct_type)}')
+    for (field, _), (attribute, _) in zip(fields, struct_type._fields_):
+      c_field, py_field = getattr(expected, field), getattr(struct_type, attribute)
+      if (c_field.offset, c_field.size) != (py_field.offset, py_field.size):
+        errors.append(f'{name}.{field}: offset {c_field.offset} size {c_field.size} but '
+                      f'{struct_type.__name__}.{attribute} has offset {py_field.offset} size {py_field.size}')
+  return errors
+
+
+def generate(header: Header) -> str:
+  prototypes = []
+  for name, (restype, argtypes) in header.functions.items():
+    args = [header.ctype(argtype) for argtype in argtypes]
+    line = f"    '{name}': ({header.ctype(restype)}, [{', '.join(args)}]),"
+    if len(line) > 120:
+      line = '\n'.join([f"    '{name}': ({header.ctype(restype)}, [", *(f'        {arg},' for arg in args), '    ]),'])
+    prototypes.append(line)
+  layouts = []
+  for name, fields in header.structs.items():
+    layouts.append(f'    structures.{STRUCTURES[name]}: [')
+    layouts.extend(f"        ('{field}', {header.ctype(ctype)})," for field, ctype in fields)
+    layouts.append('    ],')
+  return TEMPLATE.format(prototypes='\n'.join(prototypes), layouts='\n'.join(layouts))
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+  parser.add_argument('--check', action='store_true', help='fails if the module is not up to date')
+  args = parser.parse_args()
+
+  with open(HEADER, encoding='latin-1') as fp:
+    header = Header(fp.read())
+  errors = check_layouts(header)
+  for error in errors:
+    print(f'layout mismatch: {error}', file=sys.stderr)
+  if errors:
+    return 1
+
+  source = generate(header)
+  if args.check:
+    with open(OUTPUT) as fp:
+      if fp.read() != source:
+        print(f'{OUTPUT} is outdated, run {sys.argv[0]}', file=sys.stderr)
+        return 1
+    return 0
+
+  with open(OUTPUT, 'w') as fp:
+    fp.write(source)
+  print(f'wrote {len(header.functions)} functions and {len(header.structs)} structures to {OUTPUT}')
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())